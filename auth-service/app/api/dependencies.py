@@ -1,6 +1,6 @@
 from fastapi import Depends, HTTPException, status, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.services import SecurityService, user_service
+from app.services import SecurityService, user_service, token_revocation_service
 from app.models import TokenData, UserInDB, Permission
 from typing import Optional, List, Tuple
 
@@ -49,6 +49,8 @@ async def get_current_user(
         
         # Verify the token
         token_data = security_service.verify_token(token)
+        if token_data and await token_revocation_service.is_revoked(token_data):
+            token_data = None
         
         if token_data is None:
             # If token is invalid, try to refresh using refresh token
@@ -56,6 +58,8 @@ async def get_current_user(
             if refresh_token:
                 # Verify refresh token
                 refresh_data = security_service.verify_token(refresh_token, token_type="refresh")
+                if refresh_data and await token_revocation_service.is_revoked(refresh_data):
+                    refresh_data = None
                 if not refresh_data:
                     # Clear invalid cookies
                     response.delete_cookie(key="access_token", path="/")
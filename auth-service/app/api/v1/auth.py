@@ -1,13 +1,15 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Response, Request
+from fastapi import APIRouter, HTTPException, status, Depends, Response, Request, Query
 from fastapi.security import OAuth2PasswordRequestForm
 from app.models import (
     UserLogin, UserCreate, UserResponse, Token, 
     RefreshTokenRequest, ChangePasswordRequest,
-    ResetPasswordRequest, ResetPasswordConfirm
+    ResetPasswordRequest, ResetPasswordConfirm, UserRole
 )
-from app.services import user_service, SecurityService
-from app.api.dependencies import get_current_active_user
-from datetime import timedelta
+from app.services import user_service, SecurityService, token_revocation_service
+from app.api.dependencies import get_current_active_user, get_authorization_scheme_param, require_role
+from app.database import get_database
+from datetime import datetime, timedelta
+from typing import Optional
 from app.config import settings
 import logging
 
@@ -185,6 +187,8 @@ async def refresh_token(request: Request, response: Response, refresh_request: R
             
         # Verify refresh token
         token_data = security_service.verify_token(refresh_token, "refresh")
+        if token_data and await token_revocation_service.is_revoked(token_data):
+            token_data = None
         
         if not token_data:
             # Clear invalid cookies
@@ -357,13 +361,23 @@ async def reset_password(request: ResetPasswordConfirm):
 
 
 @router.post("/logout")
-async def logout(response: Response, current_user=Depends(get_current_active_user)):
-    """Logout user (token invalidation would be handled by client or token blacklist)"""
+async def logout(request: Request, response: Response, current_user=Depends(get_current_active_user)):
+    """Logout user and revoke the access and refresh tokens presented with the request"""
     try:
-        # In a real implementation, you might:
-        # 1. Add token to blacklist
-        # 2. Clear session data
-        # 3. Update last activity
+        access_token = request.cookies.get("access_token")
+        if not access_token:
+            scheme, access_token = get_authorization_scheme_param(request.headers.get("Authorization"))
+            if scheme.lower() != "bearer":
+                access_token = None
+        refresh_token = request.cookies.get("refresh_token")
+        
+        # Revoke both tokens so they stop working before they expire
+        if access_token:
+            token_data = security_service.verify_token(access_token)
+            await token_revocation_service.revoke_token(token_data, reason="logout")
+        if refresh_token:
+            token_data = security_service.verify_token(refresh_token, token_type="refresh")
+            await token_revocation_service.revoke_token(token_data, reason="logout")
         
         # Clear cookies
         response.delete_cookie(key="access_token", path="/")
@@ -377,3 +391,36 @@ async def logout(response: Response, current_user=Depends(get_current_active_use
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
+
+
+@router.get("/revocations")
+async def get_revocations(
+    since: Optional[datetime] = Query(None, description="Only return revocations recorded at or after this time"),
+    current_user=Depends(require_role([UserRole.SUPER_ADMIN, UserRole.ADMIN]))
+):
+    """Revoked token ids and user watermarks, for services that verify tokens in-process (admin only)"""
+    try:
+        db = get_database()
+        
+        token_filter = {"revoked_at": {"$gte": since}} if since else {}
+        watermark_filter = {"updated_at": {"$gte": since}} if since else {}
+        
+        revoked_tokens = await db.revoked_tokens.find(
+            token_filter, {"_id": 0, "jti": 1, "expires_at": 1}
+        ).to_list(length=None)
+        watermarks = await db.token_watermarks.find(
+            watermark_filter, {"_id": 0, "user_id": 1, "not_before": 1}
+        ).to_list(length=None)
+        
+        return {
+            "revoked_tokens": revoked_tokens,
+            "user_watermarks": watermarks,
+            "server_time": datetime.utcnow()
+        }
+
+    except Exception as e:
+        logger.error(f"Get revocations error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
@@ -1,15 +1,18 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
 from app.models import (
-    UserCreate, UserUpdate, UserResponse, UserRole, UserStatus, Permission
+    UserCreate, UserUpdate, UserResponse, UserBatchRequest, UserSummary,
+    UserRole, UserStatus, Permission, GrantAccessRequest
 )
-from app.services import user_service
-from app.database import get_database
+from app.services import user_service, user_import_service, access_control_service, permission_dataset_loader
+from app.services.user_import import IMPORT_FORMATS, read_user_rows
 from app.api.dependencies import (
     get_current_active_user, require_permissions, require_any_permission
 )
 from typing import List, Optional
 from datetime import datetime
-from bson import ObjectId
+import codecs
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -63,6 +66,62 @@ async def get_users(
         )
 
 
+@router.post("/batch", response_model=List[UserSummary])
+async def get_users_batch(
+    batch_request: UserBatchRequest,
+    current_user=Depends(require_permissions([Permission.USER_READ]))
+):
+    """Get directory fields for up to 500 users by ID
+
+    Unknown or malformed IDs are left out of the response rather than
+    failing the whole batch.
+    """
+    try:
+        return await user_service.get_users_by_ids(batch_request.ids)
+    except Exception as e:
+        logger.error(f"Batch get users error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.post("/import")
+async def import_users(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or jsonl; inferred from the file name if omitted"),
+    current_user=Depends(require_permissions([Permission.USER_CREATE]))
+):
+    """Bulk create users from a CSV or JSONL file (Admin only)
+
+    Responds with NDJSON: one result line per input row, followed by a
+    summary line. Rows are processed in batches while the response
+    streams, so large files are never held in memory.
+    """
+    import_format = (format or (file.filename or "").rsplit(".", 1)[-1]).lower()
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported import format, expected one of: {', '.join(IMPORT_FORMATS)}"
+        )
+
+    async def report():
+        summary = {"total": 0, "created": 0, "duplicate": 0, "invalid": 0, "failed": 0, "error": None}
+        try:
+            lines = codecs.iterdecode(file.file, "utf-8-sig")
+            async for result in user_import_service.import_users(read_user_rows(lines, import_format)):
+                summary["total"] += 1
+                summary[result["status"]] += 1
+                yield json.dumps(result) + "\n"
+        except Exception as e:
+            # Headers are already sent; report the abort in the summary line
+            logger.error(f"User import error: {e}")
+            summary["error"] = str(e)
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return StreamingResponse(report(), media_type="application/x-ndjson")
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: str,
@@ -288,22 +347,58 @@ async def update_role_permissions(
         )
 
 
+@router.get("/roles/assignments")
+async def get_role_assignment_recommendations(
+    required_level: int = Query(..., ge=1, le=10, description="Permission level (1 read ... 5 super admin) users need"),
+    current_user=Depends(require_permissions([Permission.USER_READ]))
+):
+    """Active users whose roles fall short of a permission level, with the smallest role pair that reaches it"""
+    try:
+        return await permission_dataset_loader.optimize_role_assignments(required_level)
+    except Exception as e:
+        logger.error(f"Get role assignment recommendations error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.get("/roles/gaps")
+async def get_permission_gaps(
+    permissions: List[Permission] = Query(..., description="Permissions every user should hold"),
+    current_user=Depends(require_permissions([Permission.USER_READ]))
+):
+    """Additional roles each active user would need to hold the given permissions"""
+    try:
+        return await permission_dataset_loader.analyze_permission_gaps([p.value for p in permissions])
+    except Exception as e:
+        logger.error(f"Get permission gaps error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
 # ==================== Access Control Endpoints ====================
 
 @router.get("/access-control/")
 async def get_access_control_entries(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    user_id: Optional[str] = None,
+    resource: Optional[str] = None,
+    include_expired: bool = False,
     current_user=Depends(require_permissions([Permission.USER_READ]))
 ):
-    """Get all access control entries"""
+    """Get access control entries with pagination and filters"""
     try:
-        db = get_database()
-        entries = await db.access_control.find().to_list(length=1000)
-        
-        # Convert ObjectId to string
-        for entry in entries:
-            entry['id'] = str(entry.pop('_id'))
-        
-        return entries
+        return await access_control_service.list_entries(
+            skip=skip,
+            limit=limit,
+            user_id=user_id,
+            resource=resource,
+            include_expired=include_expired
+        )
     except Exception as e:
         logger.error(f"Get access control error: {e}")
         raise HTTPException(
@@ -312,14 +407,40 @@ async def get_access_control_entries(
         )
 
 
-from pydantic import BaseModel
+@router.get("/access-control/check")
+async def check_access(
+    user_id: str,
+    resource: str,
+    permission: str,
+    current_user=Depends(require_permissions([Permission.USER_READ]))
+):
+    """Check whether a user may perform `permission` on `resource`
+
+    Allowed if the user's role grants the permission or an active access
+    control entry grants it on the resource.
+    """
+    try:
+        target_user = await user_service.get_user_by_id(user_id)
+        if not target_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+
+        allowed = (
+            permission in [p.value for p in target_user.permissions]
+            or await access_control_service.has_access(user_id, resource, permission)
+        )
+        return {"user_id": user_id, "resource": resource, "permission": permission, "allowed": allowed}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Check access error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
 
-class GrantAccessRequest(BaseModel):
-    user_id: str
-    resource: str
-    permissions: List[str]
-    expires_at: Optional[str] = None
-    notes: Optional[str] = None
 
 @router.post("/access-control/")
 async def grant_access(
@@ -328,11 +449,6 @@ async def grant_access(
 ):
     """Grant resource access to a user"""
     try:
-        db = get_database()
-        
-        # Get user email
-        from app.services.user_service import UserService
-        user_service = UserService()
         target_user = await user_service.get_user_by_id(request.user_id)
         
         if not target_user:
@@ -341,25 +457,16 @@ async def grant_access(
                 detail="User not found"
             )
         
-        # Create access control entry
-        entry = {
-            "user_id": request.user_id,
-            "user_email": target_user.email,
-            "resource": request.resource,
-            "permissions": request.permissions,
-            "granted_by": str(getattr(current_user, 'id', '')),
-            "granted_by_email": getattr(current_user, 'email', 'unknown'),
-            "granted_at": datetime.utcnow(),
-            "expires_at": datetime.fromisoformat(request.expires_at.replace('Z', '+00:00')) if request.expires_at else None,
-            "notes": request.notes,
-            "is_active": True
-        }
-        
-        result = await db.access_control.insert_one(entry)
-        entry['id'] = str(result.inserted_id)
-        entry.pop('_id', None)
-        
-        return entry
+        return await access_control_service.grant_access(
+            user_id=request.user_id,
+            user_email=target_user.email,
+            resource=request.resource,
+            permissions=request.permissions,
+            granted_by=str(getattr(current_user, 'id', '')),
+            granted_by_email=getattr(current_user, 'email', 'unknown'),
+            expires_at=datetime.fromisoformat(request.expires_at.replace('Z', '+00:00')) if request.expires_at else None,
+            notes=request.notes
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -379,12 +486,9 @@ async def revoke_access(
 ):
     """Revoke access control entry"""
     try:
-        db = get_database()
-        from bson import ObjectId
-        
-        result = await db.access_control.delete_one({"_id": ObjectId(entry_id)})
+        revoked = await access_control_service.revoke_access(entry_id)
         
-        if result.deleted_count == 0:
+        if not revoked:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Access entry not found"
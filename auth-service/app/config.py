@@ -10,12 +10,53 @@ class Settings(BaseSettings):
     mongodb_url: str = "mongodb://localhost:27017"
     database_name: str = "erp_auth"
     
+    # Connection pool and wire options (see app/database/connection.py)
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 0
+    mongodb_max_idle_time_ms: Optional[int] = None
+    mongodb_wait_queue_timeout_ms: Optional[int] = 5000
+    mongodb_server_selection_timeout_ms: int = 5000
+    mongodb_connect_timeout_ms: int = 10000
+    mongodb_compressors: str = "zstd,snappy,zlib"  # codecs whose module is missing are skipped
+    
+    # Analytics handle: heavy reads routed off the primary when a secondary is available
+    mongodb_analytics_read_preference: str = "secondaryPreferred"
+    mongodb_analytics_tags: str = "workload:analytics"  # "key:value,..."; any secondary if none match
+    mongodb_analytics_max_staleness_seconds: int = -1  # -1 = no limit, otherwise >= 90
+    
     # JWT Settings
     secret_key: str = "your-super-secret-key-change-this-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
     
+    # Token revocation
+    revocation_sync_interval_seconds: int = 5
+    revocation_full_resync_minutes: int = 60
+    revocation_bloom_capacity: int = 100000
+    revocation_bloom_error_rate: float = 0.001
+    
+    # Login bookkeeping (batch last_login writes instead of one per login)
+    last_login_batching_enabled: bool = False
+    last_login_flush_interval_seconds: float = 2.0
+    last_login_batch_size: int = 500
+    
+    # Access control entries (per-user compiled ACL cache)
+    acl_cache_ttl_seconds: int = 60
+    acl_cache_max_users: int = 10000
+    
+    # Bulk user import
+    user_import_batch_size: int = 1000
+    user_import_hash_workers: Optional[int] = None  # defaults to CPU count
+    
+    # Permission optimizer dataset (streamed from users)
+    permission_loader_batch_size: int = 2000
+    permission_refresh_interval_seconds: int = 60
+    
+    # Index migrations (spec in app/database/indexes.py, applied version in schema_migrations)
+    index_build_mode: str = "background"  # background | blocking | off
+    index_build_lease_seconds: int = 300
+    
     # Service
     service_name: str = "auth-service"
     service_port: int = 8001
@@ -1 +1,3 @@
-from .connection import get_database, connect_to_mongo, close_mongo_connection
+from .connection import get_database, get_analytics_database, connect_to_mongo, close_mongo_connection
+from .indexes import INDEX_SPECS, RETIRED_INDEXES, IndexSpec
+from .schema_migrations import index_migrator
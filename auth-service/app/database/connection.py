@@ -1,32 +1,81 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ConnectionFailure
+from pymongo.read_preferences import Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
 from app.config import settings
+from typing import Dict, Any, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
 class Database:
     client: AsyncIOMotorClient = None
     database = None
+    analytics_database = None
 
 
 database = Database()
 
 
+def client_options() -> Dict[str, Any]:
+    """Pool, timeout and compression options for the Mongo client"""
+    options: Dict[str, Any] = {
+        "appname": settings.service_name,
+        "maxPoolSize": settings.mongodb_max_pool_size,
+        "minPoolSize": settings.mongodb_min_pool_size,
+        "serverSelectionTimeoutMS": settings.mongodb_server_selection_timeout_ms,
+        "connectTimeoutMS": settings.mongodb_connect_timeout_ms,
+    }
+    if settings.mongodb_max_idle_time_ms is not None:
+        options["maxIdleTimeMS"] = settings.mongodb_max_idle_time_ms
+    if settings.mongodb_wait_queue_timeout_ms is not None:
+        options["waitQueueTimeoutMS"] = settings.mongodb_wait_queue_timeout_ms
+    if settings.mongodb_compressors:
+        options["compressors"] = settings.mongodb_compressors
+    return options
+
+
+def _tag_sets(tags: str) -> Optional[List[Dict[str, str]]]:
+    """Parse 'k:v,k:v' into [{k: v, ...}, {}]; the trailing {} falls back to any eligible member"""
+    pairs = [pair.split(":", 1) for pair in tags.split(",") if pair.strip()]
+    if not pairs:
+        return None
+    return [{key.strip(): value.strip() for key, value in pairs}, {}]
+
+
+def analytics_read_preference():
+    """Read preference of the analytics handle"""
+    mode = READ_PREFERENCES[settings.mongodb_analytics_read_preference]
+    if mode is Primary:
+        return Primary()
+    return mode(
+        tag_sets=_tag_sets(settings.mongodb_analytics_tags),
+        max_staleness=settings.mongodb_analytics_max_staleness_seconds
+    )
+
+
 async def connect_to_mongo():
     """Create database connection"""
     try:
-        database.client = AsyncIOMotorClient(settings.mongodb_url)
+        database.client = AsyncIOMotorClient(settings.mongodb_url, **client_options())
         database.database = database.client[settings.database_name]
+        database.analytics_database = database.client.get_database(
+            settings.database_name, read_preference=analytics_read_preference()
+        )
         
         # Test the connection
         await database.client.admin.command('ping')
         logger.info(f"Successfully connected to MongoDB: {settings.database_name}")
         
-        # Create indexes
-        await create_indexes()
-        
     except ConnectionFailure as e:
         logger.error(f"Failed to connect to MongoDB: {e}")
         raise
@@ -39,33 +88,11 @@ async def close_mongo_connection():
         logger.info("Disconnected from MongoDB")
 
 
-async def create_indexes():
-    """Create database indexes for better performance"""
-    try:
-        # Users collection indexes
-        users_collection = database.database.users
-        
-        # Email index (unique)
-        await users_collection.create_index("email", unique=True)
-        
-        # Role index
-        await users_collection.create_index("role")
-        
-        # Status index
-        await users_collection.create_index("status")
-        
-        # Created at index
-        await users_collection.create_index("created_at")
-        
-        # Compound index for common queries
-        await users_collection.create_index([("role", 1), ("status", 1)])
-        
-        logger.info("Database indexes created successfully")
-        
-    except Exception as e:
-        logger.error(f"Failed to create indexes: {e}")
-
-
 def get_database():
-    """Get database instance"""
+    """Get database instance (primary; use for writes and read-your-writes)"""
     return database.database
+
+
+def get_analytics_database():
+    """Database handle for report and analytics scans, routed per the analytics read preference"""
+    return database.analytics_database if database.analytics_database is not None else database.database
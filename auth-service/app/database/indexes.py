@@ -0,0 +1,60 @@
+from pymongo import IndexModel, ASCENDING
+from dataclasses import dataclass
+from typing import Tuple, Dict, Any, Optional, List
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """One index, named explicitly so it can be compared with what the server has"""
+    name: str
+    keys: Tuple[Tuple[str, int], ...]
+    unique: bool = False
+    ttl_seconds: Optional[int] = None
+    note: str = ""
+
+    def model(self) -> IndexModel:
+        options: Dict[str, Any] = {"name": self.name}
+        if self.unique:
+            options["unique"] = True
+        if self.ttl_seconds is not None:
+            options["expireAfterSeconds"] = self.ttl_seconds
+        return IndexModel(list(self.keys), **options)
+
+
+def _index(name: str, *keys: Tuple[str, int], unique: bool = False,
+           ttl_seconds: Optional[int] = None, note: str = "") -> IndexSpec:
+    return IndexSpec(name, tuple(keys), unique, ttl_seconds, note)
+
+
+# Names are the server defaults, so indexes created by earlier versions are reused as-is
+INDEX_SPECS: Dict[str, List[IndexSpec]] = {
+    "users": [
+        _index("email_1", ("email", ASCENDING), unique=True),
+        _index("role_1", ("role", ASCENDING)),
+        _index("status_1", ("status", ASCENDING)),
+        _index("created_at_1", ("created_at", ASCENDING)),
+        _index("role_1_status_1", ("role", ASCENDING), ("status", ASCENDING), note="user list filters"),
+        _index("updated_at_1", ("updated_at", ASCENDING), note="permission loader watermark"),
+    ],
+    # TTL indexes remove entries once the tokens they cover have expired
+    "revoked_tokens": [
+        _index("jti_1", ("jti", ASCENDING), unique=True),
+        _index("revoked_at_1", ("revoked_at", ASCENDING)),
+        _index("expires_at_1", ("expires_at", ASCENDING), ttl_seconds=0),
+    ],
+    "token_watermarks": [
+        _index("user_id_1", ("user_id", ASCENDING), unique=True),
+        _index("updated_at_1", ("updated_at", ASCENDING)),
+        _index("expires_at_1", ("expires_at", ASCENDING), ttl_seconds=0),
+    ],
+    # TTL deletes grants once expires_at passes; entries without expires_at never expire
+    "access_control": [
+        _index("user_id_1_resource_1", ("user_id", ASCENDING), ("resource", ASCENDING)),
+        _index("resource_1", ("resource", ASCENDING)),
+        _index("granted_at_1", ("granted_at", ASCENDING)),
+        _index("expires_at_1", ("expires_at", ASCENDING), ttl_seconds=0),
+    ],
+}
+
+# Indexes created by earlier versions and no longer in the spec
+RETIRED_INDEXES: Dict[str, List[str]] = {}
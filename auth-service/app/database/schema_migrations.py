@@ -0,0 +1,205 @@
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import socket
+
+from .indexes import INDEX_SPECS, RETIRED_INDEXES, IndexSpec
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_ID = "indexes"
+
+
+def spec_hash(specs: Dict[str, List[IndexSpec]] = INDEX_SPECS,
+              retired: Dict[str, List[str]] = RETIRED_INDEXES) -> str:
+    """Stable hash of the index spec; a new value means the indexes need migrating"""
+    canonical = {
+        "specs": {
+            collection: sorted(
+                [spec.name, [list(key) for key in spec.keys], spec.unique, spec.ttl_seconds]
+                for spec in collection_specs
+            )
+            for collection, collection_specs in specs.items()
+        },
+        "retired": {collection: sorted(names) for collection, names in retired.items()},
+    }
+    encoded = json.dumps(canonical, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def _matches(spec: IndexSpec, existing: Dict[str, Any]) -> bool:
+    return (
+        [tuple(key) for key in existing.get("key", [])] == [tuple(key) for key in spec.keys]
+        and bool(existing.get("unique")) == spec.unique
+        and existing.get("expireAfterSeconds") == spec.ttl_seconds
+    )
+
+
+class IndexMigrator:
+    """Applies INDEX_SPECS once per spec version instead of on every boot.
+
+    The applied spec hash is recorded in `schema_migrations`. A worker that
+    finds the current hash applied does nothing; otherwise one worker takes a
+    lease on the migration document and builds only the missing or changed
+    indexes, while the others wait for it. The state is kept for /ready.
+    """
+
+    def __init__(self):
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.spec_hash = spec_hash()
+        self.status = "pending"
+        self.total = sum(len(specs) for specs in INDEX_SPECS.values())
+        self.done = 0
+        self.current: Optional[str] = None
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "spec_hash": self.spec_hash,
+            "progress": f"{self.done}/{self.total}",
+            "current": self.current,
+            "error": self.error,
+        }
+
+    async def startup(self, db) -> None:
+        """Run per settings.index_build_mode: blocking, background (after startup) or off"""
+        mode = settings.index_build_mode
+        if mode == "off":
+            self.status = "disabled"
+        elif mode == "blocking":
+            await self.run(db)
+        else:
+            self._task = asyncio.create_task(self.run(db))
+
+    async def shutdown(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _acquire(self, migrations) -> bool:
+        """Take (or renew) the build lease for this spec hash"""
+        now = datetime.utcnow()
+        lease = {"$or": [
+            {"status": {"$ne": "building"}},
+            {"owner": self.owner},
+            {"heartbeat": {"$lt": now - timedelta(seconds=settings.index_build_lease_seconds)}},
+        ]}
+        try:
+            document = await migrations.find_one_and_update(
+                {"_id": MIGRATION_ID, **lease},
+                {"$set": {"status": "building", "target_hash": self.spec_hash, "owner": self.owner,
+                          "heartbeat": now, "started_at": now}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Document exists and another worker holds a live lease
+            return False
+        return document is not None and document.get("owner") == self.owner
+
+    async def _heartbeat(self, migrations) -> None:
+        await migrations.update_one(
+            {"_id": MIGRATION_ID, "owner": self.owner},
+            {"$set": {"heartbeat": datetime.utcnow(), "progress": f"{self.done}/{self.total}"}}
+        )
+
+    async def _keep_lease(self, migrations) -> None:
+        """Renew the lease while _apply runs, so one long index build cannot let it lapse"""
+        interval = max(settings.index_build_lease_seconds / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._heartbeat(migrations)
+            except Exception as e:
+                logger.warning(f"Index build lease heartbeat failed: {e}")
+
+    async def _apply(self, db, migrations) -> None:
+        for collection_name, names in RETIRED_INDEXES.items():
+            existing = await db[collection_name].index_information()
+            for name in names:
+                if name in existing:
+                    await db[collection_name].drop_index(name)
+                    logger.info(f"Dropped retired index {collection_name}.{name}")
+
+        for collection_name, specs in INDEX_SPECS.items():
+            collection = db[collection_name]
+            existing = await collection.index_information()
+            for spec in specs:
+                self.current = f"{collection_name}.{spec.name}"
+                if spec.name in existing and not _matches(spec, existing[spec.name]):
+                    # Same name, new definition: rebuild it
+                    await collection.drop_index(spec.name)
+                    existing.pop(spec.name)
+                if spec.name not in existing:
+                    logger.info(f"Building index {self.current}")
+                    await collection.create_indexes([spec.model()])
+                self.done += 1
+                await self._heartbeat(migrations)
+        self.current = None
+
+    async def run(self, db) -> None:
+        migrations = db.schema_migrations
+        try:
+            while True:
+                record = await migrations.find_one({"_id": MIGRATION_ID}) or {}
+                if record.get("applied_hash") == self.spec_hash:
+                    self.status = "ready"
+                    self.done = self.total
+                    logger.info(f"Indexes up to date (spec {self.spec_hash})")
+                    return
+                if await self._acquire(migrations):
+                    break
+                # Another worker is building; wait for it to finish or its lease to lapse
+                self.status = "waiting"
+                await asyncio.sleep(min(5, settings.index_build_lease_seconds))
+
+            self.status = "building"
+            self.done = 0
+            keeper = asyncio.create_task(self._keep_lease(migrations))
+            try:
+                await self._apply(db, migrations)
+            finally:
+                keeper.cancel()
+            await migrations.update_one(
+                {"_id": MIGRATION_ID},
+                {
+                    "$set": {"status": "applied", "applied_hash": self.spec_hash, "applied_at": datetime.utcnow(),
+                             "progress": f"{self.done}/{self.total}"},
+                    "$unset": {"owner": "", "heartbeat": "", "error": ""},
+                    "$push": {"history": {"$each": [{"hash": self.spec_hash, "applied_at": datetime.utcnow(),
+                                                     "by": self.owner}], "$slice": -20}}
+                }
+            )
+            self.status = "ready"
+            logger.info(f"Indexes migrated to spec {self.spec_hash}")
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            logger.error(f"Failed to migrate indexes: {e}")
+            try:
+                # Release the lease so another worker can retry
+                await migrations.update_one(
+                    {"_id": MIGRATION_ID, "owner": self.owner},
+                    {"$set": {"status": "failed", "error": str(e)}, "$unset": {"owner": ""}}
+                )
+            except Exception:
+                pass
+
+
+# Global instance
+index_migrator = IndexMigrator()
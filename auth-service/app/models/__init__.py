@@ -3,6 +3,8 @@ from .user import (
     UserLogin,
     UserUpdate,
     UserResponse,
+    UserBatchRequest,
+    UserSummary,
     UserInDB,
     Token,
     TokenData,
@@ -14,3 +16,4 @@ from .user import (
     Permission,
     UserStatus
 )
+from .access_control import GrantAccessRequest
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class GrantAccessRequest(BaseModel):
+    user_id: str
+    resource: str
+    permissions: List[str]
+    expires_at: Optional[str] = None
+    notes: Optional[str] = None
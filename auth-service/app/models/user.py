@@ -99,6 +99,24 @@ class UserResponse(BaseModel):
         populate_by_name = True
 
 
+class UserBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=500)
+
+
+class UserSummary(BaseModel):
+    """Directory fields returned by the batch lookup"""
+    id: str = Field(alias="_id")
+    email: EmailStr
+    first_name: str
+    last_name: str
+    role: UserRole
+    department: Optional[str] = None
+    status: UserStatus
+
+    class Config:
+        populate_by_name = True
+
+
 class Token(BaseModel):
     access_token: str
     refresh_token: str
@@ -111,6 +129,9 @@ class TokenData(BaseModel):
     email: Optional[str] = None
     role: Optional[UserRole] = None
     permissions: List[Permission] = []
+    jti: Optional[str] = None
+    issued_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
 
 
 class RefreshTokenRequest(BaseModel):
@@ -1,2 +1,7 @@
 from .security import SecurityService
 from .user_service import user_service, UserService
+from .token_revocation import token_revocation_service, TokenRevocationService
+from .login_activity import login_activity_writer, LoginActivityWriter
+from .user_import import user_import_service, UserImportService
+from .access_control import access_control_service, AccessControlService
+from .permission_loader import permission_dataset_loader, PermissionDatasetLoader
@@ -0,0 +1,175 @@
+from app.database import get_database
+from app.config import settings
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, FrozenSet
+from datetime import datetime, timezone
+from bson import ObjectId
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledACL:
+    """A user's active grants flattened to resource -> permissions.
+
+    Valid until `valid_until`: the earlier of the cache TTL and the first
+    grant expiry, so an expiring grant drops out on time even though the
+    TTL index only purges documents about once a minute.
+    """
+
+    __slots__ = ("grants", "valid_until")
+
+    def __init__(self, grants: Dict[str, FrozenSet[str]], valid_until: float):
+        self.grants = grants
+        self.valid_until = valid_until
+
+    def allows(self, resource: str, permission: str) -> bool:
+        return permission in self.grants.get(resource, ())
+
+
+class AccessControlService:
+    """Resource-level access grants stored in `access_control`.
+
+    Permission checks go through a per-user compiled ACL, loaded with one
+    query on the (user_id, resource) index and cached in-process, so a
+    check is a dict lookup instead of a scan over entries. Grants and
+    revocations made through this service invalidate the user's entry
+    immediately; changes made by other instances show up within
+    `acl_cache_ttl_seconds`.
+    """
+
+    def __init__(self):
+        self._cache: "OrderedDict[str, CompiledACL]" = OrderedDict()
+
+    @staticmethod
+    def _active_filter(now: datetime) -> Dict[str, Any]:
+        return {
+            "is_active": True,
+            "$or": [{"expires_at": None}, {"expires_at": {"$gt": now}}]
+        }
+
+    @staticmethod
+    def _to_utc_naive(value: datetime) -> datetime:
+        # Stored dates are naive UTC like the rest of the service
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    @staticmethod
+    def _serialize(entry: Dict[str, Any]) -> Dict[str, Any]:
+        entry["id"] = str(entry.pop("_id"))
+        return entry
+
+    async def list_entries(self, skip: int = 0, limit: int = 100,
+                           user_id: Optional[str] = None,
+                           resource: Optional[str] = None,
+                           include_expired: bool = False) -> List[Dict[str, Any]]:
+        """Get a page of access control entries, newest first"""
+        try:
+            db = get_database()
+            query_filter: Dict[str, Any] = {}
+            if not include_expired:
+                query_filter = self._active_filter(datetime.utcnow())
+            if user_id:
+                query_filter["user_id"] = user_id
+            if resource:
+                query_filter["resource"] = resource
+
+            cursor = db.access_control.find(query_filter).sort("granted_at", -1).skip(skip).limit(limit)
+            entries = await cursor.to_list(length=limit)
+            return [self._serialize(entry) for entry in entries]
+
+        except Exception as e:
+            logger.error(f"Error listing access control entries: {e}")
+            raise
+
+    async def grant_access(self, user_id: str, user_email: str, resource: str, permissions: List[str],
+                           granted_by: str, granted_by_email: str,
+                           expires_at: Optional[datetime] = None,
+                           notes: Optional[str] = None) -> Dict[str, Any]:
+        """Create an access control entry"""
+        db = get_database()
+        entry = {
+            "user_id": user_id,
+            "user_email": user_email,
+            "resource": resource,
+            "permissions": permissions,
+            "granted_by": granted_by,
+            "granted_by_email": granted_by_email,
+            "granted_at": datetime.utcnow(),
+            # The TTL index on expires_at deletes the entry once it lapses
+            "expires_at": self._to_utc_naive(expires_at) if expires_at else None,
+            "notes": notes,
+            "is_active": True
+        }
+
+        result = await db.access_control.insert_one(entry)
+        self.invalidate(user_id)
+        entry["_id"] = result.inserted_id
+        return self._serialize(entry)
+
+    async def revoke_access(self, entry_id: str) -> bool:
+        """Delete an access control entry"""
+        try:
+            db = get_database()
+            entry = await db.access_control.find_one_and_delete(
+                {"_id": ObjectId(entry_id)},
+                projection={"user_id": 1}
+            )
+            if not entry:
+                return False
+            self.invalidate(entry.get("user_id"))
+            return True
+
+        except Exception as e:
+            logger.error(f"Error revoking access entry {entry_id}: {e}")
+            raise
+
+    async def get_user_acl(self, user_id: str) -> CompiledACL:
+        """Get the compiled ACL for a user, loading it if missing or stale"""
+        now = time.monotonic()
+        acl = self._cache.get(user_id)
+        if acl is not None and now < acl.valid_until:
+            return acl
+
+        db = get_database()
+        utcnow = datetime.utcnow()
+        query_filter = self._active_filter(utcnow)
+        query_filter["user_id"] = user_id
+        cursor = db.access_control.find(query_filter, {"resource": 1, "permissions": 1, "expires_at": 1, "_id": 0})
+
+        grants: Dict[str, set] = {}
+        valid_until = now + settings.acl_cache_ttl_seconds
+        async for entry in cursor:
+            grants.setdefault(entry["resource"], set()).update(entry.get("permissions") or [])
+            expires_at = entry.get("expires_at")
+            if expires_at:
+                valid_until = min(valid_until, now + (expires_at - utcnow).total_seconds())
+
+        acl = CompiledACL({resource: frozenset(perms) for resource, perms in grants.items()}, valid_until)
+        self._cache[user_id] = acl
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > settings.acl_cache_max_users:
+            self._cache.popitem(last=False)
+        return acl
+
+    async def has_access(self, user_id: str, resource: str, permission: str) -> bool:
+        """Check whether a user holds a grant for `permission` on `resource`"""
+        try:
+            acl = await self.get_user_acl(user_id)
+            return acl.allows(resource, permission)
+        except Exception as e:
+            logger.error(f"Error checking access for user {user_id}: {e}")
+            return False
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Drop one user's compiled ACL, or all of them"""
+        if user_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(user_id, None)
+
+
+# Global instance
+access_control_service = AccessControlService()
@@ -0,0 +1,88 @@
+from app.database import get_database
+from app.config import settings
+from pymongo import UpdateOne
+from typing import Optional, Dict
+from datetime import datetime
+from bson import ObjectId
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LoginActivityWriter:
+    """Coalesces `last_login` updates and writes them in batches.
+
+    Repeated logins by the same user between flushes collapse into one
+    write, and each flush is a single unordered `bulk_write`, so successful
+    logins do not each cost a round-trip to MongoDB.
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, datetime] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.last_login_batching_enabled
+
+    def record(self, user_id: str, login_time: datetime) -> None:
+        """Queue a last_login update for the next flush"""
+        previous = self._pending.get(user_id)
+        if previous is None or login_time > previous:
+            self._pending[user_id] = login_time
+        if len(self._pending) >= settings.last_login_batch_size:
+            asyncio.create_task(self.flush())
+
+    async def flush(self) -> int:
+        """Write all queued last_login updates"""
+        if not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        try:
+            db = get_database()
+            operations = [
+                UpdateOne(
+                    {"_id": ObjectId(user_id)},
+                    {
+                        # $max keeps last_login monotonic if flushes interleave
+                        "$max": {"last_login": login_time, "updated_at": login_time}
+                    }
+                )
+                for user_id, login_time in pending.items()
+            ]
+            await db.users.bulk_write(operations, ordered=False)
+            return len(operations)
+
+        except Exception as e:
+            logger.error(f"Error flushing last login updates: {e}")
+            # Put the batch back so the next flush retries it
+            for user_id, login_time in pending.items():
+                self._pending.setdefault(user_id, login_time)
+            return 0
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.last_login_flush_interval_seconds)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the background flush task"""
+        if self.enabled and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the background flush task and write anything still queued"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+
+# Global instance
+login_activity_writer = LoginActivityWriter()
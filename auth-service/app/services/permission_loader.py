@@ -0,0 +1,198 @@
+from app.database import get_analytics_database
+from app.config import settings
+from app.models import UserRole, UserStatus
+from app.services.security import SecurityService
+from app.services.permission_optimizer import (
+    PermissionOptimizerService, PermissionLevel, PermissionMatchResult, UserRole as RoleDefinition
+)
+from array import array
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+from datetime import datetime
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Permission level the optimizer assigns to each built-in role
+ROLE_LEVELS = {
+    UserRole.SUPER_ADMIN: PermissionLevel.SUPER_ADMIN.value,
+    UserRole.ADMIN: PermissionLevel.ADMIN.value,
+    UserRole.MANAGER: PermissionLevel.DELETE.value,
+    UserRole.EMPLOYEE: PermissionLevel.WRITE.value,
+    UserRole.CUSTOMER: PermissionLevel.READ.value,
+    UserRole.VENDOR: PermissionLevel.READ.value,
+}
+
+ROLES = list(UserRole)
+ROLE_CODES = {role.value: code for code, role in enumerate(ROLES)}
+UNKNOWN_ROLE = -1
+
+USER_PROJECTION = {"role": 1, "status": 1, "updated_at": 1}
+
+
+def role_catalogue() -> List[RoleDefinition]:
+    """Built-in roles as optimizer role definitions, with any custom permissions applied"""
+    return [
+        RoleDefinition(
+            id=role.value,
+            name=role.value.replace("_", " ").title(),
+            permission_level=ROLE_LEVELS[role],
+            permissions=tuple(permission.value for permission in SecurityService.get_role_permissions(role)),
+            description=f"Built-in {role.value} role"
+        )
+        for role in ROLES
+    ]
+
+
+def _role_ids(roles) -> List[str]:
+    return [role.id for role in roles]
+
+
+def _match_result(result: PermissionMatchResult) -> Dict[str, Any]:
+    """PermissionMatchResult as plain JSON data; difference is None when no pair qualifies"""
+    return {
+        "found": result.found,
+        "roles": _role_ids(result.roles),
+        "total_permission_level": result.total_permission_level,
+        "combined_permissions": sorted(result.combined_permissions),
+        "difference": result.difference if result.found else None,
+        "efficiency": result.efficiency,
+    }
+
+
+class UserRoleBuffer:
+    """Users reduced to (id, role code, active flag) rows in typed arrays.
+
+    Rows are keyed by user id so a reloaded user overwrites its own row.
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.row_of: Dict[str, int] = {}
+        self.role_code = array("b")
+        self.active = array("b")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def put(self, doc: Dict[str, Any]) -> bool:
+        """Write one user document into its row; False if nothing changed"""
+        user_id = str(doc["_id"])
+        role_code = ROLE_CODES.get(doc.get("role"), UNKNOWN_ROLE)
+        active = doc.get("status") == UserStatus.ACTIVE.value
+
+        row = self.row_of.get(user_id)
+        if row is None:
+            self.row_of[user_id] = len(self.ids)
+            self.ids.append(user_id)
+            self.role_code.append(role_code)
+            self.active.append(active)
+            return True
+        if self.role_code[row] == role_code and bool(self.active[row]) == active:
+            return False
+        self.role_code[row] = role_code
+        self.active[row] = active
+        return True
+
+    def users(self) -> Iterator[Dict[str, Any]]:
+        """Active users in the shape PermissionOptimizerService expects, built on demand"""
+        for user_id, role_code, active in zip(self.ids, self.role_code, self.active):
+            if active:
+                role_ids = [ROLES[role_code].value] if role_code != UNKNOWN_ROLE else []
+                yield {"id": user_id, "role_ids": role_ids}
+
+    def role_counts(self) -> Dict[str, int]:
+        """Active users per role"""
+        counts = [0] * len(ROLES)
+        for role_code, active in zip(self.role_code, self.active):
+            if active and role_code != UNKNOWN_ROLE:
+                counts[role_code] += 1
+        return {role.value: count for role, count in zip(ROLES, counts)}
+
+
+class PermissionDatasetLoader:
+    """Keeps the permission optimizer's inputs warm from the users collection.
+
+    The first refresh streams every user in cursor batches with a projection
+    of role and status only; later refreshes read just the users whose
+    `updated_at` is at or past the watermark. The optimizer itself is
+    rebuilt only when role permissions change.
+    """
+
+    def __init__(self):
+        self.buffer = UserRoleBuffer()
+        self.watermark: Optional[datetime] = None
+        self.loaded_at: Optional[float] = None
+        self._optimizer: Optional[PermissionOptimizerService] = None
+        self._catalogue_key: Optional[Tuple] = None
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, full: bool = False) -> int:
+        """Load new and changed users; returns the number of rows changed"""
+        async with self._lock:
+            if full:
+                self.buffer = UserRoleBuffer()
+                self.watermark = None
+
+            db = get_analytics_database()
+            # Users written in the watermark's own millisecond are re-read; put() skips them
+            query = {} if self.watermark is None else {"updated_at": {"$gte": self.watermark}}
+            cursor = db.users.find(query, USER_PROJECTION).batch_size(settings.permission_loader_batch_size)
+
+            changed = 0
+            watermark = self.watermark
+            async for doc in cursor:
+                if self.buffer.put(doc):
+                    changed += 1
+                updated_at = doc.get("updated_at")
+                if isinstance(updated_at, datetime) and (watermark is None or updated_at > watermark):
+                    watermark = updated_at
+
+            self.watermark = watermark
+            self.loaded_at = time.monotonic()
+            logger.info(f"Permission dataset refresh: {changed} changed users, {len(self.buffer)} total")
+            return changed
+
+    def get_optimizer(self) -> PermissionOptimizerService:
+        """Optimizer over the built-in roles, rebuilt if their permissions changed"""
+        catalogue = role_catalogue()
+        key = tuple((role.id, role.permissions) for role in catalogue)
+        if self._optimizer is None or key != self._catalogue_key:
+            self._optimizer = PermissionOptimizerService(catalogue)
+            self._catalogue_key = key
+        return self._optimizer
+
+    async def ensure_fresh(self) -> None:
+        """Refresh if the last load is older than the refresh interval"""
+        if self.loaded_at is None or time.monotonic() - self.loaded_at >= settings.permission_refresh_interval_seconds:
+            await self.refresh()
+
+    async def optimize_role_assignments(self, required_permission_level: int) -> Dict[str, Any]:
+        """Run the optimizer over all active users; roles are reported by id"""
+        await self.ensure_fresh()
+        results = self.get_optimizer().optimize_role_assignments(self.buffer.users(), required_permission_level)
+        return {
+            user_id: {
+                "current_status": {**result["current_status"],
+                                   "roles": _role_ids(result["current_status"]["roles"])},
+                "recommendation": _match_result(result["recommendation"]) if result["recommendation"] else None,
+                "action_required": result["action_required"],
+                "efficiency_improvement": result["efficiency_improvement"],
+            }
+            for user_id, result in results.items()
+        }
+
+    async def analyze_permission_gaps(self, required_permissions: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Roles each active user would need to cover required_permissions; roles are reported by id"""
+        await self.ensure_fresh()
+        results = self.get_optimizer().coverage.cover_users(self.buffer.users(), required_permissions)
+        # Results are memoised and shared between users with the same roles: copy, never mutate
+        return {
+            user_id: {**result, "additional_roles": _role_ids(result["additional_roles"])}
+            for user_id, result in results.items()
+        }
+
+
+# Global instance
+permission_dataset_loader = PermissionDatasetLoader()
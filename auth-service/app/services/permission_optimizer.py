@@ -1,9 +1,13 @@
 # Permission Optimizer Service - Two Sum Implementation
 # This service validates if user roles can be combined for required permissions
 
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Sequence, Iterable, FrozenSet
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
+from bisect import bisect_right
+from sys import intern
+import heapq
 
 class PermissionLevel(Enum):
     READ = 1
@@ -12,26 +16,309 @@ class PermissionLevel(Enum):
     ADMIN = 4
     SUPER_ADMIN = 5
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class UserRole:
     id: str
     name: str
     permission_level: int
-    permissions: List[str]
+    permissions: Tuple[str, ...]
     description: str
 
-@dataclass
+    def __post_init__(self):
+        # Permission names are shared by many roles; intern them and freeze the list
+        object.__setattr__(self, "id", intern(self.id))
+        object.__setattr__(self, "permissions", tuple(intern(p) for p in self.permissions))
+
+@dataclass(frozen=True, slots=True)
 class PermissionMatchResult:
     found: bool
-    roles: List[UserRole]
+    roles: Tuple[UserRole, ...]
     total_permission_level: int
-    combined_permissions: List[str]
+    combined_permissions: Tuple[str, ...]
     difference: int
     efficiency: float
 
+def _first_pairs_at_least(levels: Sequence[int], target: int, limit: int) -> List[Tuple[int, int]]:
+    """
+    First `limit` index pairs (i < j), in row-major order, whose levels sum to at least target
+    Time Complexity: O(n) - a suffix maximum skips every i that has no partner
+    """
+    n = len(levels)
+    suffix_max = [0] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        suffix_max[i] = levels[i] if i == n - 1 else max(levels[i], suffix_max[i + 1])
+
+    pairs = []
+    for i in range(n - 1):
+        need = target - levels[i]
+        if suffix_max[i + 1] < need:
+            continue
+        for j in range(i + 1, n):
+            if levels[j] >= need:
+                pairs.append((i, j))
+                if len(pairs) == limit:
+                    return pairs
+    return pairs
+
+
+class RoleCoverageEngine:
+    """
+    Answers "which additional roles cover the missing permissions" with integer bitsets
+    Each permission some role grants gets one bit and each role one mask, so coverage checks
+    are single AND/OR operations. Names no role grants never get a bit; they are carried as a
+    set and are always uncoverable. Results are memoised (LRU, memo_max_entries) by the user's
+    role-set signature, which makes batch analysis of many users cost one search per distinct
+    role set.
+    """
+
+    def __init__(self, roles: List[UserRole], exact_max_roles: int = 3, exact_max_permissions: int = 12,
+                 memo_max_entries: int = 4096):
+        self.roles = roles
+        self.exact_max_roles = exact_max_roles
+        self.exact_max_permissions = exact_max_permissions
+        self.memo_max_entries = memo_max_entries
+        self.bit_of: Dict[str, int] = {}
+        self.permission_names: List[str] = []
+        self.role_masks: List[int] = []
+        self.positions_by_id: Dict[str, List[int]] = {}
+        for position, role in enumerate(roles):
+            self.positions_by_id.setdefault(role.id, []).append(position)
+            for permission in role.permissions:
+                if permission not in self.bit_of:
+                    self.bit_of[permission] = len(self.permission_names)
+                    self.permission_names.append(permission)
+            self.role_masks.append(self.mask_of(role.permissions))
+        self._memo: "OrderedDict[tuple, Dict[str, any]]" = OrderedDict()
+
+    def mask_of(self, permissions: Iterable[str]) -> int:
+        """Bitset of the permissions some role grants; other names are ignored"""
+        mask = 0
+        for permission in permissions:
+            bit = self.bit_of.get(permission)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def unknown_of(self, permissions: Iterable[str]) -> FrozenSet[str]:
+        """Names in permissions that no role grants"""
+        return frozenset(permission for permission in permissions if permission not in self.bit_of)
+
+    def names_of(self, mask: int) -> List[str]:
+        return [name for bit, name in enumerate(self.permission_names) if mask >> bit & 1]
+
+    def signature(self, role_ids: List[str]) -> Tuple[int, ...]:
+        """Canonical key for a user's role set (unknown role ids are ignored)"""
+        positions = set()
+        for role_id in role_ids:
+            positions.update(self.positions_by_id.get(role_id, ()))
+        return tuple(sorted(positions))
+
+    def _candidates(self, target: int, excluded: Tuple[int, ...]) -> List[Tuple[int, int]]:
+        """(position, useful mask) for roles that add something, one per distinct useful mask"""
+        excluded_set = set(excluded)
+        seen = set()
+        candidates = []
+        for position, mask in enumerate(self.role_masks):
+            useful = mask & target
+            if useful and useful not in seen and position not in excluded_set:
+                seen.add(useful)
+                candidates.append((position, useful))
+        # Drop roles whose contribution is a strict subset of another candidate's
+        return [
+            (position, useful) for position, useful in candidates
+            if not any(other != useful and useful & other == useful for _, other in candidates)
+        ]
+
+    def _exact_cover(self, target: int, candidates: List[Tuple[int, int]]) -> Optional[List[int]]:
+        """Fewest roles covering target, by breadth-first search over covered-bit states"""
+        parents = {0: None}
+        frontier = [0]
+        for _ in range(self.exact_max_roles):
+            next_frontier = []
+            for state in frontier:
+                for position, useful in candidates:
+                    covered = state | useful
+                    if covered in parents:
+                        continue
+                    parents[covered] = (state, position)
+                    if covered == target:
+                        chosen = []
+                        while parents[covered] is not None:
+                            covered, role_position = parents[covered]
+                            chosen.append(role_position)
+                        return sorted(chosen)
+                    next_frontier.append(covered)
+            frontier = next_frontier
+        return None
+
+    @staticmethod
+    def _greedy_cover(target: int, candidates: List[Tuple[int, int]]) -> List[int]:
+        """Repeatedly take the role covering the most still-missing permissions"""
+        chosen = []
+        remaining = target
+        while remaining:
+            best_position, best_useful, best_gain = None, 0, 0
+            for position, useful in candidates:
+                gain = bin(useful & remaining).count("1")
+                if gain > best_gain:
+                    best_position, best_useful, best_gain = position, useful, gain
+            if best_position is None:
+                break
+            chosen.append(best_position)
+            remaining &= ~best_useful
+        return sorted(chosen)
+
+    def _cover(self, excluded: Tuple[int, ...], held: int, required: int,
+               missing_unknown: FrozenSet[str]) -> Dict[str, any]:
+        key = (excluded, held, required, missing_unknown)
+        cached = self._memo.get(key)
+        if cached is not None:
+            self._memo.move_to_end(key)
+            return cached
+
+        target = required & ~held
+        method = 'none'
+        chosen: List[int] = []
+        if target:
+            candidates = self._candidates(target, excluded)
+            exact = None
+            if bin(target).count("1") <= self.exact_max_permissions:
+                exact = self._exact_cover(target, candidates)
+            if exact is not None:
+                method, chosen = 'exact', exact
+            else:
+                method, chosen = 'greedy', self._greedy_cover(target, candidates)
+
+        uncoverable = sorted(missing_unknown)
+        result = {
+            'missing_permissions': self.names_of(target) + uncoverable,
+            'additional_roles': [self.roles[position] for position in chosen],
+            'uncoverable_permissions': uncoverable,
+            'method': method
+        }
+        self._memo[key] = result
+        while len(self._memo) > self.memo_max_entries:
+            self._memo.popitem(last=False)
+        return result
+
+    def cover(self, role_ids: List[str], required_permissions: List[str]) -> Dict[str, any]:
+        """Smallest set of additional roles covering what the user's catalogue roles lack"""
+        signature = self.signature(role_ids)
+        held = 0
+        for position in signature:
+            held |= self.role_masks[position]
+        return self._cover(signature, held, self.mask_of(required_permissions),
+                           self.unknown_of(required_permissions))
+
+    def cover_roles(self, user_roles: List[UserRole], required_permissions: List[str]) -> Dict[str, any]:
+        """
+        Like cover(), but the user's permissions come from the given roles themselves, so roles
+        missing from the catalogue (or defined differently there) still count
+        """
+        held_permissions = [permission for role in user_roles for permission in role.permissions]
+        missing_unknown = self.unknown_of(required_permissions) - self.unknown_of(held_permissions)
+        return self._cover(self.signature([role.id for role in user_roles]), self.mask_of(held_permissions),
+                           self.mask_of(required_permissions), missing_unknown)
+
+    def cover_users(self, users: List[Dict], required_permissions: List[str]) -> Dict[str, Dict[str, any]]:
+        """Batch version of cover(); users sharing a role set share one search"""
+        required = self.mask_of(required_permissions)
+        missing_unknown = self.unknown_of(required_permissions)
+        results = {}
+        for user in users:
+            signature = self.signature(user.get('role_ids', []))
+            held = 0
+            for position in signature:
+                held |= self.role_masks[position]
+            results[user['id']] = self._cover(signature, held, required, missing_unknown)
+        return results
+
+
 class PermissionOptimizerService:
     def __init__(self, available_roles: List[UserRole]):
         self.available_roles = available_roles
+        self.refresh_index()
+
+    def refresh_index(self):
+        """
+        Build the sorted index over available_roles by permission_level
+        Call again after mutating available_roles in place.
+        """
+        self._levels = [role.permission_level for role in self.available_roles]
+        self._sorted_levels = sorted(self._levels)
+        # permission_level -> positions in available_roles, ascending
+        self._positions_by_level: Dict[int, List[int]] = {}
+        for position, level in enumerate(self._levels):
+            self._positions_by_level.setdefault(level, []).append(position)
+        self._distinct_levels_desc = sorted(self._positions_by_level, reverse=True)
+        self.coverage = RoleCoverageEngine(self.available_roles)
+        # The minimum combination depends only on the required level
+        self._min_combination_by_level: Dict[int, PermissionMatchResult] = {}
+
+    def _min_pair_sum_at_least(self, target: int) -> Optional[int]:
+        """Smallest pair sum >= target via two pointers over the sorted levels"""
+        levels = self._sorted_levels
+        lo, hi = 0, len(levels) - 1
+        best = None
+        while lo < hi:
+            total = levels[lo] + levels[hi]
+            if total >= target:
+                if best is None or total < best:
+                    best = total
+                hi -= 1
+            else:
+                lo += 1
+        return best
+
+    def _count_pairs_at_least(self, target: int) -> int:
+        """Number of role pairs whose levels sum to at least target"""
+        levels = self._sorted_levels
+        lo, hi = 0, len(levels) - 1
+        count = 0
+        while lo < hi:
+            if levels[lo] + levels[hi] >= target:
+                count += hi - lo
+                hi -= 1
+            else:
+                lo += 1
+        return count
+
+    def _pairs_with_sum(self, total: int, limit: int) -> List[Tuple[int, int]]:
+        """First `limit` index pairs (i < j), in row-major order, whose levels sum exactly to total"""
+        pairs = []
+        for i, level in enumerate(self._levels):
+            positions = self._positions_by_level.get(total - level)
+            if not positions:
+                continue
+            for j in positions[bisect_right(positions, i):]:
+                pairs.append((i, j))
+                if len(pairs) == limit:
+                    return pairs
+        return pairs
+
+    def _pair_sums_desc(self):
+        """
+        Distinct pair sums in descending order
+        Lazily merges the rows of the (distinct level x distinct level) sum matrix with a heap,
+        so only as many sums as the caller consumes are generated.
+        """
+        levels = self._distinct_levels_desc
+        heap = []
+        for a in range(len(levels)):
+            # A level can pair with itself only if two roles share it
+            b = a if len(self._positions_by_level[levels[a]]) > 1 else a + 1
+            if b < len(levels):
+                heap.append((-(levels[a] + levels[b]), a, b))
+        heapq.heapify(heap)
+
+        last = None
+        while heap:
+            negative_total, a, b = heapq.heappop(heap)
+            if b + 1 < len(levels):
+                heapq.heappush(heap, (-(levels[a] + levels[b + 1]), a, b + 1))
+            if -negative_total != last:
+                last = -negative_total
+                yield last
 
     def find_roles_by_target_permission_level(self, target_level: int) -> PermissionMatchResult:
         """
@@ -46,12 +333,12 @@ class PermissionOptimizerService:
             if complement in level_map:
                 complement_role = level_map[complement]
                 total_level = complement_role.permission_level + role.permission_level
-                combined_permissions = list(set(complement_role.permissions + role.permissions))
+                combined_permissions = tuple(set(complement_role.permissions + role.permissions))
                 efficiency = total_level / target_level if target_level > 0 else 0
                 
                 return PermissionMatchResult(
                     found=True,
-                    roles=[complement_role, role],
+                    roles=(complement_role, role),
                     total_permission_level=total_level,
                     combined_permissions=combined_permissions,
                     difference=0,
@@ -61,9 +348,9 @@ class PermissionOptimizerService:
 
         return PermissionMatchResult(
             found=False,
-            roles=[],
+            roles=(),
             total_permission_level=0,
-            combined_permissions=[],
+            combined_permissions=(),
             difference=target_level,
             efficiency=0.0
         )
@@ -84,20 +371,20 @@ class PermissionOptimizerService:
                 }
         
         # Check if any two roles can be combined to meet the requirement
-        for i in range(len(user_roles)):
-            for j in range(i + 1, len(user_roles)):
-                combined_level = user_roles[i].permission_level + user_roles[j].permission_level
-                if combined_level >= required_permission_level:
-                    combined_permissions = list(set(user_roles[i].permissions + user_roles[j].permissions))
-                    efficiency = combined_level / required_permission_level if required_permission_level > 0 else 0
-                    return {
-                        'has_permission': True,
-                        'method': 'role_combination',
-                        'roles': [user_roles[i], user_roles[j]],
-                        'permission_level': combined_level,
-                        'combined_permissions': combined_permissions,
-                        'efficiency': efficiency
-                    }
+        pairs = _first_pairs_at_least([role.permission_level for role in user_roles], required_permission_level, 1)
+        if pairs:
+            i, j = pairs[0]
+            combined_level = user_roles[i].permission_level + user_roles[j].permission_level
+            combined_permissions = list(set(user_roles[i].permissions + user_roles[j].permissions))
+            efficiency = combined_level / required_permission_level if required_permission_level > 0 else 0
+            return {
+                'has_permission': True,
+                'method': 'role_combination',
+                'roles': [user_roles[i], user_roles[j]],
+                'permission_level': combined_level,
+                'combined_permissions': combined_permissions,
+                'efficiency': efficiency
+            }
         
         return {
             'has_permission': False,
@@ -110,38 +397,41 @@ class PermissionOptimizerService:
     def find_minimum_role_combination(self, required_permission_level: int) -> PermissionMatchResult:
         """
         Find the minimum role combination that meets the permission requirement
+        Time Complexity: O(n log n) - two pointers find the smallest qualifying sum,
+        then a binary search per role finds the first pair reaching it; memoised per level
         """
-        best_match = PermissionMatchResult(
-            found=False,
-            roles=[],
-            total_permission_level=0,
-            combined_permissions=[],
-            difference=float('inf'),
-            efficiency=0.0
-        )
+        cached = self._min_combination_by_level.get(required_permission_level)
+        if cached is not None:
+            return cached
 
-        for i in range(len(self.available_roles)):
-            for j in range(i + 1, len(self.available_roles)):
-                role1 = self.available_roles[i]
-                role2 = self.available_roles[j]
-                total_level = role1.permission_level + role2.permission_level
-                
-                if total_level >= required_permission_level:
-                    difference = total_level - required_permission_level
-                    efficiency = total_level / required_permission_level if required_permission_level > 0 else 0
-                    
-                    if difference < best_match.difference:
-                        combined_permissions = list(set(role1.permissions + role2.permissions))
-                        best_match = PermissionMatchResult(
-                            found=True,
-                            roles=[role1, role2],
-                            total_permission_level=total_level,
-                            combined_permissions=combined_permissions,
-                            difference=difference,
-                            efficiency=efficiency
-                        )
-
-        return best_match
+        result = self._find_minimum_role_combination(required_permission_level)
+        self._min_combination_by_level[required_permission_level] = result
+        return result
+
+    def _find_minimum_role_combination(self, required_permission_level: int) -> PermissionMatchResult:
+        best_total = self._min_pair_sum_at_least(required_permission_level)
+        if best_total is None:
+            return PermissionMatchResult(
+                found=False,
+                roles=(),
+                total_permission_level=0,
+                combined_permissions=(),
+                difference=float('inf'),
+                efficiency=0.0
+            )
+
+        i, j = self._pairs_with_sum(best_total, 1)[0]
+        role1 = self.available_roles[i]
+        role2 = self.available_roles[j]
+        efficiency = best_total / required_permission_level if required_permission_level > 0 else 0
+        return PermissionMatchResult(
+            found=True,
+            roles=(role1, role2),
+            total_permission_level=best_total,
+            combined_permissions=tuple(set(role1.permissions + role2.permissions)),
+            difference=best_total - required_permission_level,
+            efficiency=efficiency
+        )
 
     def analyze_permission_gaps(self, user_roles: List[UserRole], required_permissions: List[str]) -> Dict[str, any]:
         """
@@ -162,12 +452,13 @@ class PermissionOptimizerService:
             }
         
         # Find roles that could provide missing permissions
-        suggested_roles = []
-        for role in self.available_roles:
-            if role.id not in [r.id for r in user_roles]:
-                role_permissions = set(role.permissions)
-                if role_permissions.intersection(missing_permissions):
-                    suggested_roles.append(role)
+        held_ids = {role.id for role in user_roles}
+        missing_mask = self.coverage.mask_of(missing_permissions)
+        suggested_roles = [
+            role for role, mask in zip(self.available_roles, self.coverage.role_masks)
+            if mask & missing_mask and role.id not in held_ids
+        ]
+        coverage = self.coverage.cover_roles(user_roles, required_permissions)
         
         # Calculate efficiency
         total_required = len(required_permissions)
@@ -178,6 +469,8 @@ class PermissionOptimizerService:
             'has_all_permissions': False,
             'missing_permissions': list(missing_permissions),
             'suggested_roles': suggested_roles,
+            'recommended_roles': coverage['additional_roles'],
+            'uncoverable_permissions': coverage['uncoverable_permissions'],
             'efficiency': efficiency
         }
 
@@ -186,12 +479,16 @@ class PermissionOptimizerService:
         Optimize role assignments to meet permission requirements efficiently
         """
         results = {}
+        # Users with the same role set get the same status, so validate each set once
+        status_by_signature = {}
         
         for user in users:
-            user_roles = [role for role in self.available_roles if role.id in user.get('role_ids', [])]
-            
-            # Check current permission status
-            current_status = self.validate_user_permissions(user_roles, required_permission_level)
+            signature = self.coverage.signature(user.get('role_ids', []))
+            current_status = status_by_signature.get(signature)
+            if current_status is None:
+                user_roles = [self.available_roles[position] for position in signature]
+                current_status = self.validate_user_permissions(user_roles, required_permission_level)
+                status_by_signature[signature] = current_status
             
             if not current_status['has_permission']:
                 # Find minimum role combination
@@ -231,34 +528,40 @@ class PermissionOptimizerService:
                 role_distribution[level] = []
             role_distribution[level].append(role)
         
-        # Find optimal role pairs
+        # Find optimal role pairs: the top 5 by efficiency, ties in row-major order
+        top_k = 5
+        if required_permission_level > 0:
+            # Efficiency grows with the combined level, so walk pair sums from the top
+            top_pairs = []
+            for total in self._pair_sums_desc():
+                if total < required_permission_level or len(top_pairs) == top_k:
+                    break
+                top_pairs.extend(self._pairs_with_sum(total, top_k - len(top_pairs)))
+        else:
+            # Every qualifying pair has efficiency 0, so the first ones found win
+            top_pairs = _first_pairs_at_least(self._levels, required_permission_level, top_k)
+
         optimal_pairs = []
-        for i in range(len(self.available_roles)):
-            for j in range(i + 1, len(self.available_roles)):
-                role1 = self.available_roles[i]
-                role2 = self.available_roles[j]
-                combined_level = role1.permission_level + role2.permission_level
-                
-                if combined_level >= required_permission_level:
-                    efficiency = combined_level / required_permission_level if required_permission_level > 0 else 0
-                    optimal_pairs.append({
-                        'roles': [role1, role2],
-                        'combined_level': combined_level,
-                        'efficiency': efficiency,
-                        'overhead': combined_level - required_permission_level
-                    })
-        
-        # Sort by efficiency (best first)
-        optimal_pairs.sort(key=lambda x: x['efficiency'], reverse=True)
+        for i, j in top_pairs:
+            role1 = self.available_roles[i]
+            role2 = self.available_roles[j]
+            combined_level = role1.permission_level + role2.permission_level
+            efficiency = combined_level / required_permission_level if required_permission_level > 0 else 0
+            optimal_pairs.append({
+                'roles': [role1, role2],
+                'combined_level': combined_level,
+                'efficiency': efficiency,
+                'overhead': combined_level - required_permission_level
+            })
         
         return {
             'required_permission_level': required_permission_level,
             'exact_matches': exact_matches,
             'minimum_combinations': min_combinations,
             'role_distribution': role_distribution,
-            'optimal_pairs': optimal_pairs[:5],  # Top 5 pairs
+            'optimal_pairs': optimal_pairs,
             'total_available_roles': len(self.available_roles),
-            'possible_combinations': len(optimal_pairs)
+            'possible_combinations': self._count_pairs_at_least(required_permission_level)
         }
 
 # Example usage and testing
@@ -59,12 +59,13 @@ class SecurityService:
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """Create JWT access token"""
         to_encode = data.copy()
+        now = datetime.utcnow()
         if expires_delta:
-            expire = datetime.utcnow() + expires_delta
+            expire = now + expires_delta
         else:
-            expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
+            expire = now + timedelta(minutes=settings.access_token_expire_minutes)
         
-        to_encode.update({"exp": expire, "type": "access"})
+        to_encode.update({"exp": expire, "iat": now, "jti": secrets.token_urlsafe(16), "type": "access"})
         encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
         return encoded_jwt
 
@@ -72,8 +73,9 @@ class SecurityService:
     def create_refresh_token(data: dict) -> str:
         """Create JWT refresh token"""
         to_encode = data.copy()
-        expire = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
-        to_encode.update({"exp": expire, "type": "refresh"})
+        now = datetime.utcnow()
+        expire = now + timedelta(days=settings.refresh_token_expire_days)
+        to_encode.update({"exp": expire, "iat": now, "jti": secrets.token_urlsafe(16), "type": "refresh"})
         encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
         return encoded_jwt
 
@@ -91,6 +93,8 @@ class SecurityService:
             email: str = payload.get("email")
             role: str = payload.get("role")
             permissions: List[str] = payload.get("permissions", [])
+            issued_at = payload.get("iat")
+            expires_at = payload.get("exp")
             
             if user_id is None or email is None:
                 return None
@@ -99,7 +103,10 @@ class SecurityService:
                 user_id=user_id,
                 email=email,
                 role=UserRole(role) if role else None,
-                permissions=[Permission(p) for p in permissions if p in Permission.__members__.values()]
+                permissions=[Permission(p) for p in permissions if p in Permission.__members__.values()],
+                jti=payload.get("jti"),
+                issued_at=datetime.utcfromtimestamp(issued_at) if issued_at else None,
+                expires_at=datetime.utcfromtimestamp(expires_at) if expires_at else None
             )
             return token_data
         except JWTError:
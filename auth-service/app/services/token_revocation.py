@@ -0,0 +1,228 @@
+from app.database import get_database
+from app.config import settings
+from app.models import TokenData
+from typing import Optional, Dict, Iterable
+from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys.
+
+    Answers "definitely not present" without false negatives, so a miss can
+    skip any further lookup. A hit only means "maybe present".
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        # Kirsch-Mitzenmacher double hashing from one 128-bit digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class TokenRevocationService:
+    """Revocation list for JWTs that are still within their `exp`.
+
+    Two kinds of revocation are stored in MongoDB:
+    - `revoked_tokens`: individual token ids (`jti`), e.g. on logout
+    - `token_watermarks`: per-user "tokens issued before T are invalid",
+      e.g. on deactivation or password change
+
+    Both collections carry an `expires_at` TTL so entries disappear once
+    every token they could affect has expired anyway. Verification uses an
+    in-memory Bloom filter of revoked jtis plus the watermark map, kept
+    current by an incremental background sync, so the common case (token
+    not revoked) costs no I/O.
+    """
+
+    def __init__(self):
+        self._filter = self._new_filter()
+        self._watermarks: Dict[str, datetime] = {}
+        self._last_sync: Optional[datetime] = None
+        self._last_full_sync: Optional[datetime] = None
+        self._sync_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _new_filter() -> BloomFilter:
+        return BloomFilter(settings.revocation_bloom_capacity, settings.revocation_bloom_error_rate)
+
+    async def revoke_token(self, token_data: TokenData, reason: Optional[str] = None) -> bool:
+        """Revoke a single token by its jti"""
+        if not token_data or not token_data.jti:
+            return False
+        try:
+            db = get_database()
+            now = datetime.utcnow()
+            expires_at = token_data.expires_at or now + timedelta(days=settings.refresh_token_expire_days)
+
+            await db.revoked_tokens.update_one(
+                {"jti": token_data.jti},
+                {
+                    "$setOnInsert": {
+                        "jti": token_data.jti,
+                        "user_id": token_data.user_id,
+                        "reason": reason,
+                        "revoked_at": now,
+                        "expires_at": expires_at
+                    }
+                },
+                upsert=True
+            )
+            self._filter.add(token_data.jti)
+            return True
+
+        except Exception as e:
+            logger.error(f"Error revoking token: {e}")
+            return False
+
+    async def revoke_user_tokens(self, user_id: str, reason: Optional[str] = None) -> bool:
+        """Invalidate every token issued to a user up to now"""
+        try:
+            db = get_database()
+            now = datetime.utcnow()
+
+            await db.token_watermarks.update_one(
+                {"user_id": user_id},
+                {
+                    "$set": {
+                        "not_before": now,
+                        "reason": reason,
+                        "updated_at": now,
+                        # Refresh tokens are the longest-lived tokens we issue
+                        "expires_at": now + timedelta(days=settings.refresh_token_expire_days)
+                    }
+                },
+                upsert=True
+            )
+            self._watermarks[user_id] = now
+            return True
+
+        except Exception as e:
+            logger.error(f"Error revoking tokens for user {user_id}: {e}")
+            return False
+
+    async def is_revoked(self, token_data: TokenData) -> bool:
+        """Check whether a decoded token has been revoked"""
+        not_before = self._watermarks.get(token_data.user_id)
+        if not_before and token_data.issued_at and token_data.issued_at < not_before:
+            return True
+
+        if not token_data.jti or token_data.jti not in self._filter:
+            return False
+
+        # Bloom filter hit: confirm against the store to rule out a false positive
+        try:
+            db = get_database()
+            entry = await db.revoked_tokens.find_one({"jti": token_data.jti}, {"_id": 1})
+            return entry is not None
+        except Exception as e:
+            logger.error(f"Error checking token revocation: {e}")
+            # A filter hit with the store unreachable is treated as revoked
+            return True
+
+    async def sync(self) -> None:
+        """Pull revocations recorded since the last sync (by any instance)"""
+        now = datetime.utcnow()
+        full_resync_due = (
+            self._last_full_sync is None
+            or now - self._last_full_sync >= timedelta(minutes=settings.revocation_full_resync_minutes)
+        )
+        if full_resync_due:
+            await self._full_sync(now)
+            return
+
+        try:
+            db = get_database()
+            # Overlap the window so entries written by other instances with
+            # slightly skewed clocks are not missed; re-adding is harmless
+            since = self._last_sync - timedelta(seconds=settings.revocation_sync_interval_seconds)
+
+            cursor = db.revoked_tokens.find({"revoked_at": {"$gte": since}}, {"jti": 1, "_id": 0})
+            async for entry in cursor:
+                self._filter.add(entry["jti"])
+
+            cursor = db.token_watermarks.find(
+                {"updated_at": {"$gte": since}},
+                {"user_id": 1, "not_before": 1, "_id": 0}
+            )
+            async for entry in cursor:
+                self._watermarks[entry["user_id"]] = entry["not_before"]
+
+            self._last_sync = now
+
+        except Exception as e:
+            logger.error(f"Error syncing token revocations: {e}")
+
+    async def _full_sync(self, now: datetime) -> None:
+        """Rebuild the filter and watermark map from the store.
+
+        Bloom filters cannot drop keys, so a periodic rebuild keeps expired
+        jtis (removed by the TTL index) from raising the false-positive rate.
+        """
+        try:
+            db = get_database()
+            revoked = await db.revoked_tokens.count_documents({})
+            capacity = max(settings.revocation_bloom_capacity, revoked * 2)
+            bloom = BloomFilter(capacity, settings.revocation_bloom_error_rate)
+
+            async for entry in db.revoked_tokens.find({}, {"jti": 1, "_id": 0}):
+                bloom.add(entry["jti"])
+
+            watermarks = {}
+            async for entry in db.token_watermarks.find({}, {"user_id": 1, "not_before": 1, "_id": 0}):
+                watermarks[entry["user_id"]] = entry["not_before"]
+
+            self._filter = bloom
+            self._watermarks = watermarks
+            self._last_sync = now
+            self._last_full_sync = now
+            logger.info(f"Token revocation list loaded: {bloom.count} tokens, {len(watermarks)} user watermarks")
+
+        except Exception as e:
+            logger.error(f"Error loading token revocations: {e}")
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await self.sync()
+            await asyncio.sleep(settings.revocation_sync_interval_seconds)
+
+    def start(self) -> None:
+        """Start the background sync task"""
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self) -> None:
+        """Stop the background sync task"""
+        if self._sync_task:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+
+
+# Global instance
+token_revocation_service = TokenRevocationService()
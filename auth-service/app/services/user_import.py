@@ -0,0 +1,214 @@
+from app.database import get_database
+from app.models import UserCreate, UserInDB, UserStatus
+from app.services.security import SecurityService
+from app.config import settings
+from pymongo.errors import BulkWriteError
+from pydantic import ValidationError
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Any, Iterable, Iterator, AsyncIterator, Tuple
+import asyncio
+import csv
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+# Result statuses reported per input row
+ROW_CREATED = "created"
+ROW_DUPLICATE = "duplicate"
+ROW_INVALID = "invalid"
+ROW_FAILED = "failed"
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash a chunk of passwords (runs inside a worker process)"""
+    return [SecurityService.get_password_hash(password) for password in passwords]
+
+
+def read_user_rows(lines: Iterable[str], format: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (row number, raw fields) from CSV or JSONL text, one row at a time.
+
+    CSV row numbers count the header as row 1 so they match what a
+    spreadsheet shows; JSONL row numbers are line numbers.
+    """
+    if format == "csv":
+        for row_number, row in enumerate(csv.DictReader(lines), start=2):
+            # Empty cells mean "not provided" for optional fields
+            yield row_number, {key: value for key, value in row.items() if key and value not in ("", None)}
+    elif format == "jsonl":
+        for line_number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                row = {"_parse_error": f"Invalid JSON: {e.msg}"}
+            if not isinstance(row, dict):
+                row = {"_parse_error": "Expected a JSON object"}
+            yield line_number, row
+    else:
+        raise ValueError(f"Unsupported import format: {format}")
+
+
+class UserImportService:
+    """Bulk user creation for onboarding.
+
+    Input rows are consumed in batches of `user_import_batch_size`, so memory
+    stays bounded regardless of file size. Each batch costs one `$in`
+    duplicate check and one unordered `insert_many`; bcrypt hashing runs in a
+    process pool so it neither blocks the event loop nor serialises on one
+    core. Results are yielded per row as soon as their batch is written.
+    """
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=settings.user_import_hash_workers)
+        return self._pool
+
+    def shutdown(self) -> None:
+        """Stop the hashing worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _hash_passwords(self, passwords: List[str]) -> List[str]:
+        """Hash passwords in one chunk per worker process, keeping input order"""
+        workers = settings.user_import_hash_workers or os.cpu_count() or 1
+        chunk_size = -(-len(passwords) // workers)
+        loop = asyncio.get_running_loop()
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(self._get_pool(), hash_passwords, passwords[start:start + chunk_size])
+            for start in range(0, len(passwords), chunk_size)
+        ))
+        return [hashed for chunk in chunks for hashed in chunk]
+
+    async def import_users(self, rows: Iterable[Tuple[int, Dict[str, Any]]]) -> AsyncIterator[Dict[str, Any]]:
+        """Create users from (row number, fields) pairs, yielding one result per row"""
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= settings.user_import_batch_size:
+                for result in await self._import_batch(batch):
+                    yield result
+                batch = []
+        if batch:
+            for result in await self._import_batch(batch):
+                yield result
+
+    async def _import_batch(self, rows: List[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        results: Dict[int, Dict[str, Any]] = {}
+        candidates: List[Tuple[int, UserCreate]] = []
+        seen_emails = set()
+
+        # Validate rows and drop duplicates within the batch
+        for row_number, fields in rows:
+            email = fields.get("email")
+            if "_parse_error" in fields:
+                results[row_number] = self._result(row_number, email, ROW_INVALID, error=fields["_parse_error"])
+                continue
+            try:
+                user_data = UserCreate(**fields)
+            except ValidationError as e:
+                error = "; ".join(
+                    f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+                )
+                results[row_number] = self._result(row_number, email, ROW_INVALID, error=error)
+                continue
+
+            if user_data.email in seen_emails:
+                results[row_number] = self._result(
+                    row_number, user_data.email, ROW_DUPLICATE, error="Email repeated earlier in the import"
+                )
+                continue
+            seen_emails.add(user_data.email)
+            candidates.append((row_number, user_data))
+
+        try:
+            db = get_database()
+            users_collection = db.users
+
+            # One round-trip for the duplicate check of the whole batch
+            if candidates:
+                cursor = users_collection.find(
+                    {"email": {"$in": [user_data.email for _, user_data in candidates]}},
+                    {"email": 1, "_id": 0}
+                )
+                existing = {user["email"] async for user in cursor}
+                remaining = []
+                for row_number, user_data in candidates:
+                    if user_data.email in existing:
+                        results[row_number] = self._result(
+                            row_number, user_data.email, ROW_DUPLICATE, error="User with this email already exists"
+                        )
+                    else:
+                        remaining.append((row_number, user_data))
+                candidates = remaining
+
+            if candidates:
+                hashed_passwords = await self._hash_passwords([user_data.password for _, user_data in candidates])
+
+                documents = []
+                permissions_by_role = {}
+                for (row_number, user_data), hashed_password in zip(candidates, hashed_passwords):
+                    if user_data.role not in permissions_by_role:
+                        permissions_by_role[user_data.role] = SecurityService.get_role_permissions(user_data.role)
+                    user_doc = UserInDB(
+                        email=user_data.email,
+                        hashed_password=hashed_password,
+                        first_name=user_data.first_name,
+                        last_name=user_data.last_name,
+                        role=user_data.role,
+                        department=user_data.department,
+                        phone=user_data.phone,
+                        permissions=permissions_by_role[user_data.role],
+                        status=UserStatus.ACTIVE
+                    )
+                    documents.append(user_doc.dict(by_alias=True, exclude={"id"}))
+
+                failed: Dict[int, Dict[str, Any]] = {}
+                try:
+                    await users_collection.insert_many(documents, ordered=False)
+                except BulkWriteError as e:
+                    # Unordered inserts keep going past errors; collect them by index
+                    failed = {error["index"]: error for error in e.details.get("writeErrors", [])}
+
+                for index, (row_number, user_data) in enumerate(candidates):
+                    error = failed.get(index)
+                    if error is None:
+                        # insert_many sets _id on each document it sends
+                        results[row_number] = self._result(
+                            row_number, user_data.email, ROW_CREATED, user_id=str(documents[index]["_id"])
+                        )
+                    elif error.get("code") == DUPLICATE_KEY_ERROR:
+                        results[row_number] = self._result(
+                            row_number, user_data.email, ROW_DUPLICATE, error="User with this email already exists"
+                        )
+                    else:
+                        results[row_number] = self._result(
+                            row_number, user_data.email, ROW_FAILED, error=error.get("errmsg", "Insert failed")
+                        )
+
+        except Exception as e:
+            logger.error(f"Error importing user batch: {e}")
+            for row_number, user_data in candidates:
+                results.setdefault(row_number, self._result(row_number, user_data.email, ROW_FAILED, error=str(e)))
+
+        return [results[row_number] for row_number, _ in rows]
+
+    @staticmethod
+    def _result(row_number: int, email: Optional[str], status: str,
+                user_id: Optional[str] = None, error: Optional[str] = None) -> Dict[str, Any]:
+        return {"row": row_number, "email": email, "status": status, "id": user_id, "error": error}
+
+
+# Global instance
+user_import_service = UserImportService()
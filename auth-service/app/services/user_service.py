@@ -1,6 +1,9 @@
 from app.database import get_database
-from app.models import UserInDB, UserCreate, UserUpdate, UserResponse, UserRole, UserStatus, Permission
+from app.models import UserInDB, UserCreate, UserUpdate, UserResponse, UserSummary, UserRole, UserStatus, Permission
 from app.services.security import SecurityService
+from app.services.token_revocation import token_revocation_service
+from app.services.login_activity import login_activity_writer
+from pymongo import ReturnDocument
 from pymongo.errors import DuplicateKeyError
 from typing import Optional, List
 from datetime import datetime, timedelta
@@ -78,6 +81,36 @@ class UserService:
             logger.error(f"Error getting user by ID: {e}")
             return None
 
+    async def get_users_by_ids(self, user_ids: List[str]) -> List[UserSummary]:
+        """Get directory fields for many users in one query"""
+        try:
+            db = get_database()
+            users_collection = db.users
+
+            object_ids = []
+            for user_id in dict.fromkeys(user_ids):
+                if ObjectId.is_valid(user_id):
+                    object_ids.append(ObjectId(user_id))
+            if not object_ids:
+                return []
+
+            cursor = users_collection.find(
+                {"_id": {"$in": object_ids}},
+                {"email": 1, "first_name": 1, "last_name": 1, "role": 1, "department": 1, "status": 1}
+            )
+            users = await cursor.to_list(length=len(object_ids))
+
+            summaries = []
+            for user in users:
+                user["id"] = str(user["_id"])
+                del user["_id"]
+                summaries.append(UserSummary(**user))
+            return summaries
+
+        except Exception as e:
+            logger.error(f"Error getting users by IDs: {e}")
+            return []
+
     async def get_user_by_email(self, email: str) -> Optional[UserInDB]:
         """Get user by email"""
         try:
@@ -123,23 +156,22 @@ class UserService:
                 permissions = self.security_service.get_role_permissions(UserRole(update_data["role"]))
                 update_data["permissions"] = permissions
 
-            # Update user
-            result = await users_collection.update_one(
+            # Update and read back in one round trip
+            updated_user = await users_collection.find_one_and_update(
                 {"_id": ObjectId(user_id)},
-                {"$set": update_data}
+                {"$set": update_data},
+                return_document=ReturnDocument.AFTER
             )
-
-            if result.matched_count == 0:
+            if not updated_user:
                 return None
 
-            # Fetch updated user
-            updated_user = await users_collection.find_one({"_id": ObjectId(user_id)})
-            if updated_user:
-                updated_user["id"] = str(updated_user["_id"])
-                del updated_user["_id"]  # Remove the original _id field
-                return UserResponse(**updated_user)
-            
-            return None
+            # Deactivated users lose their outstanding tokens immediately
+            if "status" in update_data and update_data["status"] != UserStatus.ACTIVE:
+                await token_revocation_service.revoke_user_tokens(user_id, reason="status_change")
+
+            updated_user["id"] = str(updated_user["_id"])
+            del updated_user["_id"]  # Remove the original _id field
+            return UserResponse(**updated_user)
 
         except Exception as e:
             logger.error(f"Error updating user: {e}")
@@ -161,6 +193,9 @@ class UserService:
                 }
             )
 
+            if result.matched_count > 0:
+                await token_revocation_service.revoke_user_tokens(user_id, reason="deactivated")
+
             return result.matched_count > 0
 
         except Exception as e:
@@ -199,7 +234,7 @@ class UserService:
             return []
 
     async def authenticate_user(self, email: str, password: str) -> Optional[UserInDB]:
-        """Authenticate user credentials"""
+        """Authenticate user credentials (one read, at most one write per attempt)"""
         try:
             user = await self.get_user_by_email(email)
             if not user:
@@ -215,15 +250,10 @@ class UserService:
 
             # Verify password
             if not self.security_service.verify_password(password, user.hashed_password):
-                # Increment failed login attempts
-                await self._increment_failed_login_attempts(user.id)
+                await self._record_failed_login(user.id)
                 return None
 
-            # Reset failed login attempts on successful login
-            await self._reset_failed_login_attempts(user.id)
-            
-            # Update last login
-            await self._update_last_login(user.id)
+            await self._record_successful_login(user)
 
             return user
 
@@ -249,8 +279,9 @@ class UserService:
             db = get_database()
             users_collection = db.users
 
+            # Only if the password is still the one just verified (no concurrent change)
             result = await users_collection.update_one(
-                {"_id": ObjectId(user_id)},
+                {"_id": ObjectId(user_id), "hashed_password": user.hashed_password},
                 {
                     "$set": {
                         "hashed_password": new_hashed_password,
@@ -259,7 +290,12 @@ class UserService:
                 }
             )
 
-            return result.matched_count > 0
+            if result.matched_count == 0:
+                return False
+
+            # Sessions opened with the old password must not outlive it
+            await token_revocation_service.revoke_user_tokens(user_id, reason="password_change")
+            return True
 
         except Exception as e:
             logger.error(f"Error changing password: {e}")
@@ -287,72 +323,73 @@ class UserService:
             logger.error(f"Error updating user permissions: {e}")
             return False
 
-    async def _increment_failed_login_attempts(self, user_id: str):
-        """Increment failed login attempts and lock account if necessary"""
-        try:
-            db = get_database()
-            users_collection = db.users
-
-            user = await users_collection.find_one({"_id": ObjectId(user_id)})
-            if not user:
-                return
-
-            failed_attempts = user.get("failed_login_attempts", 0) + 1
-            update_data = {
-                "failed_login_attempts": failed_attempts,
-                "updated_at": datetime.utcnow()
-            }
-
-            # Lock account after 5 failed attempts for 30 minutes
-            if failed_attempts >= 5:
-                update_data["locked_until"] = datetime.utcnow() + timedelta(minutes=30)
+    async def _record_failed_login(self, user_id: str):
+        """Increment failed login attempts and lock the account after 5 failures.
 
-            await users_collection.update_one(
-                {"_id": ObjectId(user_id)},
-                {"$set": update_data}
-            )
-
-        except Exception as e:
-            logger.error(f"Error incrementing failed login attempts: {e}")
-
-    async def _reset_failed_login_attempts(self, user_id: str):
-        """Reset failed login attempts"""
+        A single pipeline update, so concurrent failures cannot lose increments.
+        """
         try:
             db = get_database()
             users_collection = db.users
+            now = datetime.utcnow()
 
             await users_collection.update_one(
                 {"_id": ObjectId(user_id)},
-                {
-                    "$set": {
-                        "failed_login_attempts": 0,
-                        "locked_until": None,
-                        "updated_at": datetime.utcnow()
+                [
+                    {
+                        "$set": {
+                            "failed_login_attempts": {"$add": [{"$ifNull": ["$failed_login_attempts", 0]}, 1]},
+                            "updated_at": now
+                        }
+                    },
+                    {
+                        "$set": {
+                            # Lock account after 5 failed attempts for 30 minutes
+                            "locked_until": {
+                                "$cond": [
+                                    {"$gte": ["$failed_login_attempts", 5]},
+                                    now + timedelta(minutes=30),
+                                    {"$ifNull": ["$locked_until", None]}
+                                ]
+                            }
+                        }
                     }
-                }
+                ]
             )
 
         except Exception as e:
-            logger.error(f"Error resetting failed login attempts: {e}")
+            logger.error(f"Error recording failed login: {e}")
+
+    async def _record_successful_login(self, user: UserInDB):
+        """Reset lockout state and stamp last_login in one write.
 
-    async def _update_last_login(self, user_id: str):
-        """Update last login timestamp"""
+        When last_login batching is enabled and there is no lockout state to
+        clear, the timestamp is handed to the batched writer instead.
+        """
         try:
+            now = datetime.utcnow()
+
+            if login_activity_writer.enabled and not user.failed_login_attempts and not user.locked_until:
+                login_activity_writer.record(user.id, now)
+                return
+
             db = get_database()
             users_collection = db.users
 
             await users_collection.update_one(
-                {"_id": ObjectId(user_id)},
+                {"_id": ObjectId(user.id)},
                 {
                     "$set": {
-                        "last_login": datetime.utcnow(),
-                        "updated_at": datetime.utcnow()
+                        "failed_login_attempts": 0,
+                        "locked_until": None,
+                        "last_login": now,
+                        "updated_at": now
                     }
                 }
             )
 
         except Exception as e:
-            logger.error(f"Error updating last login: {e}")
+            logger.error(f"Error recording successful login: {e}")
 
 
 # Global instance
@@ -7,8 +7,9 @@ import logging
 import uvicorn
 
 from app.config import settings
-from app.database import connect_to_mongo, close_mongo_connection
+from app.database import connect_to_mongo, close_mongo_connection, get_database, index_migrator
 from app.api.v1 import auth_router, users_router
+from app.services import token_revocation_service, login_activity_writer, user_import_service
 
 # Configure logging
 logging.basicConfig(
@@ -24,12 +25,21 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"Starting {settings.service_name}...")
     await connect_to_mongo()
+    # Bring indexes up to the current spec (skipped when already applied)
+    await index_migrator.startup(get_database())
+    # The sync task loads revocations as its first step
+    token_revocation_service.start()
+    login_activity_writer.start()
     logger.info(f"{settings.service_name} started successfully")
     
     yield
     
     # Shutdown
     logger.info(f"Shutting down {settings.service_name}...")
+    await index_migrator.shutdown()
+    await token_revocation_service.stop()
+    await login_activity_writer.stop()
+    user_import_service.shutdown()
     await close_mongo_connection()
     logger.info(f"{settings.service_name} shutdown complete")
 
@@ -83,6 +93,21 @@ async def health_check():
     }
 
 
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+    """Readiness probe: database reachable; index migration progress is reported, not awaited"""
+    indexes = index_migrator.state()
+    try:
+        await get_database().command("ping")
+    except Exception as e:
+        logger.error(f"Readiness check failed: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "service": settings.service_name, "indexes": indexes}
+        )
+    return {"status": "ready", "service": settings.service_name, "indexes": indexes}
+
+
 # API routers
 app.include_router(auth_router, prefix="/api/v1")
 app.include_router(users_router, prefix="/api/v1")
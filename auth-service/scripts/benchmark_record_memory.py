@@ -0,0 +1,119 @@
+"""
+Memory Benchmark for Permission Optimizer Records
+Reports bytes per record for role definitions (plain dataclass vs slotted
+and interned UserRole) and for users (one dict each vs a UserRoleBuffer row)
+
+Usage:
+    python scripts/benchmark_record_memory.py
+    python scripts/benchmark_record_memory.py --roles 20000 --users 500000
+"""
+
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models import Permission, UserRole as Role
+from app.services.permission_optimizer import UserRole
+from app.services.permission_loader import UserRoleBuffer
+
+
+@dataclass
+class LegacyUserRole:
+    """UserRole as it was: per-instance __dict__ and a permissions list"""
+    id: str
+    name: str
+    permission_level: int
+    permissions: List[str]
+    description: str
+
+
+def make_role_documents(count: int, seed: int = 7):
+    """Role-like documents; every string is a fresh object, as when decoded from BSON"""
+    rng = random.Random(seed)
+    vocabulary = [permission.value for permission in Permission]
+    for i in range(count):
+        yield {
+            "id": f"role-{i}",
+            "name": f"Role {i}",
+            "permission_level": rng.randint(1, 5),
+            "permissions": [p.encode().decode() for p in rng.sample(vocabulary, rng.randint(1, len(vocabulary)))],
+            "description": f"Generated role {i}",
+        }
+
+
+def make_user_documents(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    roles = [role.value for role in Role]
+    for i in range(count):
+        yield {"_id": f"{i:024x}", "role": rng.choice(roles).encode().decode(), "status": b"active".decode()}
+
+
+def build_roles(record_type, documents):
+    return [
+        record_type(doc["id"], doc["name"], doc["permission_level"], doc["permissions"], doc["description"])
+        for doc in documents
+    ]
+
+
+def build_user_dicts(documents):
+    return [{"id": doc["_id"], "role_ids": [doc["role"]], "status": doc["status"]} for doc in documents]
+
+
+def build_user_buffer(documents):
+    buffer = UserRoleBuffer()
+    for doc in documents:
+        buffer.put(doc)
+    return buffer
+
+
+def measure(build, documents, count: int) -> float:
+    """Bytes per record retained by whatever build() returns (inputs are freed first)"""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = build(documents)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del result
+    return retained / count
+
+
+def report(title: str, results):
+    print(title)
+    baseline = results[0][1]
+    for name, per_record in results:
+        ratio = f"{baseline / per_record:.1f}x smaller" if per_record != baseline else "baseline"
+        print(f"  {name:<40} {per_record:>8.0f} bytes/record  ({ratio})")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per permission record, before and after")
+    parser.add_argument("--roles", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"📏 Measuring {args.roles:,} roles and {args.users:,} users...\n")
+    report("Role definitions", [
+        ("LegacyUserRole (dataclass, list)",
+         measure(lambda docs: build_roles(LegacyUserRole, docs), make_role_documents(args.roles), args.roles)),
+        ("UserRole (slots, interned, tuple)",
+         measure(lambda docs: build_roles(UserRole, docs), make_role_documents(args.roles), args.roles)),
+    ])
+    report("Users", [
+        ("dict per user", measure(build_user_dicts, make_user_documents(args.users), args.users)),
+        ("UserRoleBuffer row", measure(build_user_buffer, make_user_documents(args.users), args.users)),
+    ])
+
+
+if __name__ == "__main__":
+    main()
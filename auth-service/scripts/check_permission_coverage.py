@@ -0,0 +1,216 @@
+"""
+Equivalence Check for Permission Gap Analysis
+Compares analyze_permission_gaps and optimize_role_assignments against the
+implementations they replaced, on random role catalogues and users. Users
+may hold roles that are missing from the catalogue and require permissions
+no role grants. Recommended roles from the coverage engine are checked by
+brute force: they must cover every coverable gap, and "exact" answers must
+be minimal. The engine must not grow on unknown names, and its memo must
+stay within its cap.
+
+Usage:
+    python scripts/check_permission_coverage.py
+    python scripts/check_permission_coverage.py --cases 20000 --seed 7
+"""
+
+import argparse
+import random
+import sys
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.permission_optimizer import PermissionOptimizerService, UserRole
+from check_permission_optimizer import reference_validate, reference_minimum, normalize, minimum_as_dict
+
+PERMISSIONS = ["read", "write", "approve", "delete", "manage_users", "system_config", "export", "audit"]
+UNKNOWN_PERMISSIONS = ["legacy_admin", "beta_feature"]
+MEMO_CAP = 8
+
+
+# Reference implementations: the service before the coverage engine
+
+def reference_gaps(available_roles: List[UserRole], user_roles: List[UserRole],
+                   required_permissions: List[str]) -> Dict[str, Any]:
+    user_permissions = set()
+    for role in user_roles:
+        user_permissions.update(role.permissions)
+
+    missing_permissions = set(required_permissions) - user_permissions
+    if not missing_permissions:
+        return {'has_all_permissions': True, 'missing_permissions': [], 'suggested_roles': [], 'efficiency': 1.0}
+
+    suggested_roles = []
+    for role in available_roles:
+        if role.id not in [r.id for r in user_roles]:
+            if set(role.permissions).intersection(missing_permissions):
+                suggested_roles.append(role)
+
+    total_required = len(required_permissions)
+    total_covered = len(required_permissions) - len(missing_permissions)
+    return {
+        'has_all_permissions': False,
+        'missing_permissions': list(missing_permissions),
+        'suggested_roles': suggested_roles,
+        'efficiency': total_covered / total_required if total_required > 0 else 0
+    }
+
+
+def reference_assignments(available_roles: List[UserRole], users: List[Dict],
+                          required_permission_level: int) -> Dict[str, Any]:
+    results = {}
+    for user in users:
+        user_roles = [role for role in available_roles if role.id in user.get('role_ids', [])]
+        current_status = reference_validate(user_roles, required_permission_level)
+        if not current_status['has_permission']:
+            min_combination = reference_minimum(available_roles, required_permission_level)
+            results[user['id']] = {
+                'current_status': normalize(current_status),
+                'recommendation': normalize(min_combination),
+                'action_required': True,
+                'efficiency_improvement': min_combination['efficiency'] - current_status['efficiency']
+            }
+        else:
+            results[user['id']] = {
+                'current_status': normalize(current_status),
+                'recommendation': None,
+                'action_required': False,
+                'efficiency_improvement': 0.0
+            }
+    return results
+
+
+def minimum_cover_size(candidates: List[UserRole], target: set, max_roles: int):
+    """Fewest candidate roles whose permissions include target, by brute force; None above max_roles"""
+    if not target:
+        return 0
+    for size in range(1, max_roles + 1):
+        for combination in combinations(candidates, size):
+            if target <= {permission for role in combination for permission in role.permissions}:
+                return size
+    return None
+
+
+def random_role(rng: random.Random, index: int) -> UserRole:
+    return UserRole(str(rng.randint(1, 8)), f"Role {index}", rng.randint(-1, 6),
+                    rng.sample(PERMISSIONS, rng.randint(0, 4)), "")
+
+
+def check_case(rng: random.Random) -> List[str]:
+    roles = [random_role(rng, index) for index in range(rng.randint(0, 10))]
+    optimizer = PermissionOptimizerService(roles)
+    engine = optimizer.coverage
+    engine.memo_max_entries = MEMO_CAP
+    known_names = len(engine.permission_names)
+    mismatches = []
+
+    for _ in range(6):
+        # Held roles: some from the catalogue, some defined only on the user
+        user_roles = rng.sample(roles, rng.randint(0, min(3, len(roles))))
+        user_roles += [random_role(rng, 100 + index) for index in range(rng.randint(0, 2))]
+        if rng.random() < 0.3:
+            user_roles.append(UserRole("99", "Legacy", 1, [rng.choice(UNKNOWN_PERMISSIONS)], ""))
+        required = rng.sample(PERMISSIONS + UNKNOWN_PERMISSIONS, rng.randint(0, 6))
+
+        expected = reference_gaps(roles, user_roles, required)
+        actual = optimizer.analyze_permission_gaps(user_roles, required)
+        for field in ('has_all_permissions', 'efficiency'):
+            if actual[field] != expected[field]:
+                mismatches.append(f"analyze_permission_gaps {field}: {actual[field]} != {expected[field]}")
+        if sorted(actual['missing_permissions']) != sorted(expected['missing_permissions']):
+            mismatches.append(f"analyze_permission_gaps missing_permissions: "
+                              f"{actual['missing_permissions']} != {expected['missing_permissions']}")
+        if [id(role) for role in actual['suggested_roles']] != [id(role) for role in expected['suggested_roles']]:
+            mismatches.append("analyze_permission_gaps suggested_roles differ")
+        if actual['has_all_permissions']:
+            continue
+
+        # Recommended roles: checked against brute force rather than an older implementation
+        missing = set(expected['missing_permissions'])
+        grantable = {permission for role in roles for permission in role.permissions}
+        held_ids = {role.id for role in user_roles}
+        candidates = [role for role in roles if role.id not in held_ids]
+        if sorted(actual['uncoverable_permissions']) != sorted(missing - grantable):
+            mismatches.append(f"uncoverable_permissions: {actual['uncoverable_permissions']} != "
+                              f"{sorted(missing - grantable)}")
+        recommended = actual['recommended_roles']
+        covered = {permission for role in recommended for permission in role.permissions}
+        coverable = missing & {permission for role in candidates for permission in role.permissions}
+        if not coverable <= covered:
+            mismatches.append(f"recommended_roles leave {sorted(coverable - covered)} uncovered")
+        if coverable == missing & grantable:
+            best = minimum_cover_size(candidates, coverable, engine.exact_max_roles)
+            method = engine.cover_roles(user_roles, required)['method']
+            if method == 'exact' and best != len(recommended):
+                mismatches.append(f"exact cover uses {len(recommended)} roles, minimum is {best}")
+            if method == 'greedy' and best is not None and len(missing & grantable) <= engine.exact_max_permissions:
+                mismatches.append(f"greedy fallback although {best} roles suffice")
+
+    # optimize_role_assignments, with catalogue ids and ids no role has
+    role_ids = sorted({role.id for role in roles} | {"unknown"})
+    users = [{'id': f"u{index}", 'role_ids': rng.sample(role_ids, rng.randint(0, min(3, len(role_ids))))}
+             for index in range(rng.randint(0, 12))]
+    for required_level in (rng.randint(-2, 14), 0):
+        expected = reference_assignments(roles, users, required_level)
+        actual = optimizer.optimize_role_assignments(users, required_level)
+        for user in users:
+            result = actual[user['id']]
+            result = {
+                **result,
+                'current_status': normalize(result['current_status']),
+                'recommendation': minimum_as_dict(result['recommendation']) if result['recommendation'] else None,
+            }
+            if result != expected[user['id']]:
+                mismatches.append(f"optimize_role_assignments(level={required_level}) user {user['id']}: "
+                                  f"{result} != {expected[user['id']]}")
+
+    # cover_users must agree with cover() per user
+    required = rng.sample(PERMISSIONS + UNKNOWN_PERMISSIONS, rng.randint(1, 5))
+    for user_id, result in engine.cover_users(users, required).items():
+        user = next(user for user in users if user['id'] == user_id)
+        if result != engine.cover(user['role_ids'], required):
+            mismatches.append(f"cover_users and cover disagree for {user_id}")
+
+    if len(engine.permission_names) != known_names or set(engine.bit_of) & set(UNKNOWN_PERMISSIONS):
+        mismatches.append("engine registered permission names it was only asked about")
+    if len(engine._memo) > MEMO_CAP:
+        mismatches.append(f"memo holds {len(engine._memo)} entries, cap is {MEMO_CAP}")
+
+    if mismatches:
+        levels = [(role.id, role.permission_level, role.permissions) for role in roles]
+        mismatches = [f"roles={levels}: {mismatch}" for mismatch in mismatches]
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check permission gap analysis against the reference")
+    parser.add_argument("--cases", type=int, default=5000, help="Random role catalogues to check")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed (default: random)")
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    rng = random.Random(seed)
+    print(f"🔄 Checking {args.cases} random role catalogues (seed {seed})...")
+
+    failures = 0
+    for case in range(args.cases):
+        mismatches = check_case(rng)
+        if mismatches:
+            failures += 1
+            for mismatch in mismatches:
+                print(f"   ❌ case {case}: {mismatch}")
+            if failures >= 10:
+                print("   ... stopping after 10 failing cases")
+                break
+
+    if failures:
+        print(f"❌ {failures} case(s) differ from the reference implementation (seed {seed})")
+        sys.exit(1)
+    print(f"✅ All {args.cases} cases match the reference implementation")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Equivalence Check for PermissionOptimizerService
+Compares validate_user_permissions, find_minimum_role_combination and
+get_permission_insights against the original O(n^2) pair scans on random
+role sets, including duplicate, zero and negative permission levels.
+Results must match exactly, including which pair wins a tie.
+
+Usage:
+    python scripts/check_permission_optimizer.py
+    python scripts/check_permission_optimizer.py --cases 50000 --seed 7
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.permission_optimizer import PermissionOptimizerService, UserRole
+
+PERMISSIONS = ["read", "write", "approve", "delete", "manage_users", "system_config"]
+
+
+# Reference implementations: the pair scans the service used before the sorted index
+
+def reference_validate(user_roles: List[UserRole], required_permission_level: int) -> Dict[str, Any]:
+    for role in user_roles:
+        if role.permission_level >= required_permission_level:
+            return {'has_permission': True, 'method': 'single_role', 'roles': [role],
+                    'permission_level': role.permission_level, 'efficiency': 1.0}
+
+    for i in range(len(user_roles)):
+        for j in range(i + 1, len(user_roles)):
+            combined_level = user_roles[i].permission_level + user_roles[j].permission_level
+            if combined_level >= required_permission_level:
+                return {
+                    'has_permission': True,
+                    'method': 'role_combination',
+                    'roles': [user_roles[i], user_roles[j]],
+                    'permission_level': combined_level,
+                    'combined_permissions': list(set(user_roles[i].permissions + user_roles[j].permissions)),
+                    'efficiency': combined_level / required_permission_level if required_permission_level > 0 else 0
+                }
+
+    return {'has_permission': False, 'method': 'insufficient', 'roles': [], 'permission_level': 0, 'efficiency': 0.0}
+
+
+def reference_minimum(roles: List[UserRole], required_permission_level: int) -> Dict[str, Any]:
+    best = {'found': False, 'roles': [], 'total_permission_level': 0, 'combined_permissions': [],
+            'difference': float('inf'), 'efficiency': 0.0}
+    for i in range(len(roles)):
+        for j in range(i + 1, len(roles)):
+            total_level = roles[i].permission_level + roles[j].permission_level
+            if total_level >= required_permission_level:
+                difference = total_level - required_permission_level
+                if difference < best['difference']:
+                    best = {
+                        'found': True,
+                        'roles': [roles[i], roles[j]],
+                        'total_permission_level': total_level,
+                        'combined_permissions': list(set(roles[i].permissions + roles[j].permissions)),
+                        'difference': difference,
+                        'efficiency': total_level / required_permission_level if required_permission_level > 0 else 0
+                    }
+    return best
+
+
+def reference_insights(roles: List[UserRole], required_permission_level: int) -> Dict[str, Any]:
+    optimal_pairs = []
+    for i in range(len(roles)):
+        for j in range(i + 1, len(roles)):
+            combined_level = roles[i].permission_level + roles[j].permission_level
+            if combined_level >= required_permission_level:
+                optimal_pairs.append({
+                    'roles': [roles[i], roles[j]],
+                    'combined_level': combined_level,
+                    'efficiency': combined_level / required_permission_level if required_permission_level > 0 else 0,
+                    'overhead': combined_level - required_permission_level
+                })
+    optimal_pairs.sort(key=lambda x: x['efficiency'], reverse=True)
+    return {'optimal_pairs': optimal_pairs[:5], 'possible_combinations': len(optimal_pairs)}
+
+
+# Roles are compared by identity so duplicate ids or levels cannot hide a wrong pick
+
+def normalize(result: Dict[str, Any]) -> Dict[str, Any]:
+    normalized = dict(result)
+    normalized['roles'] = [id(role) for role in result['roles']]
+    if 'combined_permissions' in result:
+        normalized['combined_permissions'] = sorted(result['combined_permissions'])
+    return normalized
+
+
+def minimum_as_dict(result) -> Dict[str, Any]:
+    return normalize({
+        'found': result.found,
+        'roles': list(result.roles),
+        'total_permission_level': result.total_permission_level,
+        'combined_permissions': list(result.combined_permissions),
+        'difference': result.difference,
+        'efficiency': result.efficiency,
+    })
+
+
+def random_roles(rng: random.Random) -> List[UserRole]:
+    # A narrow level range forces duplicate levels and ties
+    low, high = rng.choice([(-3, 3), (0, 5), (-5, 10), (1, 1)])
+    return [
+        UserRole(str(rng.randint(1, 6)), f"Role {index}", rng.randint(low, high),
+                 rng.sample(PERMISSIONS, rng.randint(0, 3)), "")
+        for index in range(rng.randint(0, 12))
+    ]
+
+
+def check_case(rng: random.Random) -> List[str]:
+    roles = random_roles(rng)
+    optimizer = PermissionOptimizerService(roles)
+    mismatches = []
+    levels = [rng.randint(-6, 20) for _ in range(3)] + [0]
+    # Repeat one level so the memoised minimum is checked too
+    for required in levels + levels[:1]:
+        user_roles = rng.sample(roles, rng.randint(0, len(roles)))
+
+        expected = normalize(reference_validate(user_roles, required))
+        actual = normalize(optimizer.validate_user_permissions(user_roles, required))
+        if actual != expected:
+            mismatches.append(f"validate_user_permissions(level={required}): {actual} != {expected}")
+
+        expected = normalize(reference_minimum(roles, required))
+        actual = minimum_as_dict(optimizer.find_minimum_role_combination(required))
+        if actual != expected:
+            mismatches.append(f"find_minimum_role_combination(level={required}): {actual} != {expected}")
+
+        reference = reference_insights(roles, required)
+        insights = optimizer.get_permission_insights(required)
+        expected_pairs = [normalize(pair) for pair in reference['optimal_pairs']]
+        actual_pairs = [normalize(pair) for pair in insights['optimal_pairs']]
+        if actual_pairs != expected_pairs:
+            mismatches.append(f"get_permission_insights(level={required}).optimal_pairs: "
+                              f"{actual_pairs} != {expected_pairs}")
+        if insights['possible_combinations'] != reference['possible_combinations']:
+            mismatches.append(f"get_permission_insights(level={required}).possible_combinations: "
+                              f"{insights['possible_combinations']} != {reference['possible_combinations']}")
+        if insights['minimum_combinations'] is not optimizer.find_minimum_role_combination(required):
+            mismatches.append(f"get_permission_insights(level={required}).minimum_combinations differs")
+
+    if mismatches:
+        levels_by_role = [role.permission_level for role in roles]
+        mismatches = [f"levels={levels_by_role}: {mismatch}" for mismatch in mismatches]
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check PermissionOptimizerService against the O(n^2) reference")
+    parser.add_argument("--cases", type=int, default=20000, help="Random role sets to check")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed (default: random)")
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    rng = random.Random(seed)
+    print(f"🔄 Checking {args.cases} random role sets (seed {seed})...")
+
+    failures = 0
+    for case in range(args.cases):
+        mismatches = check_case(rng)
+        if mismatches:
+            failures += 1
+            for mismatch in mismatches:
+                print(f"   ❌ case {case}: {mismatch}")
+            if failures >= 10:
+                print("   ... stopping after 10 failing cases")
+                break
+
+    if failures:
+        print(f"❌ {failures} case(s) differ from the reference implementation (seed {seed})")
+        sys.exit(1)
+    print(f"✅ All {args.cases} cases match the reference implementation")
+
+
+if __name__ == "__main__":
+    main()
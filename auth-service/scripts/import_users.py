@@ -0,0 +1,72 @@
+"""
+Bulk User Import for Auth Service
+Creates users from a CSV or JSONL file and writes a per-row result report
+
+Usage:
+    python scripts/import_users.py users.csv
+    python scripts/import_users.py users.jsonl --report import_report.jsonl
+    python scripts/import_users.py export.txt --format csv
+
+CSV files need a header row. Columns/keys: email, password, first_name,
+last_name, and optionally role, department, phone.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database.connection import connect_to_mongo, close_mongo_connection
+from app.services.user_import import user_import_service, read_user_rows, IMPORT_FORMATS
+
+
+async def import_users(path: Path, import_format: str, report_path: Path):
+    """Import users from a file, streaming results to the report"""
+
+    print(f"📥 Importing users from {path} ({import_format})...")
+
+    await connect_to_mongo()
+
+    counts = {}
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as source, open(report_path, "w") as report:
+            async for result in user_import_service.import_users(read_user_rows(source, import_format)):
+                counts[result["status"]] = counts.get(result["status"], 0) + 1
+                report.write(json.dumps(result) + "\n")
+
+                total = sum(counts.values())
+                if total % 1000 == 0:
+                    print(f"   {total} rows processed")
+    finally:
+        user_import_service.shutdown()
+        await close_mongo_connection()
+
+    print(f"\n✅ Import finished: {sum(counts.values())} rows")
+    for status, count in sorted(counts.items()):
+        print(f"   {status}: {count}")
+    print(f"   Report written to {report_path}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args or args[0].startswith("--"):
+        print(__doc__)
+        sys.exit(1)
+
+    source_path = Path(args[0])
+    import_format = source_path.suffix.lstrip(".").lower()
+    report_path = source_path.with_name(f"{source_path.stem}_import_report.jsonl")
+
+    if "--format" in args:
+        import_format = args[args.index("--format") + 1].lower()
+    if "--report" in args:
+        report_path = Path(args[args.index("--report") + 1])
+
+    if import_format not in IMPORT_FORMATS:
+        print(f"Unsupported format '{import_format}', expected one of: {', '.join(IMPORT_FORMATS)}")
+        sys.exit(1)
+
+    asyncio.run(import_users(source_path, import_format, report_path))
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Query
-from app.services import analytics_service
+from app.services import analytics_service, sales_analytics_loader
 from app.api.dependencies import get_current_active_user, require_sales_access
-from typing import Optional
+from typing import Optional, List
 from datetime import date, datetime
 import logging
 
@@ -227,11 +227,17 @@ async def get_sales_trends(
 async def get_sales_forecast(
     months_ahead: int = Query(3, ge=1, le=12),
     metric: str = Query("revenue", regex="^(revenue|orders)$"),
+    granularity: str = Query("monthly", regex="^(monthly|daily)$"),
+    days_ahead: int = Query(14, ge=1, le=90),
+    dimension: str = Query("total", regex="^(total|sales_rep|product)$"),
+    keys: Optional[List[str]] = Query(None, description="Sales rep or product ids; all when omitted"),
     current_user=Depends(require_sales_access())
 ):
-    """Get sales forecast using AI/ML models"""
+    """Get sales forecast (trend plus seasonality), in total or per sales rep / product"""
     try:
-        forecast_data = await analytics_service.get_sales_forecast(months_ahead, metric)
+        forecast_data = await analytics_service.get_sales_forecast(
+            months_ahead, metric, granularity, dimension, keys, days_ahead
+        )
         return forecast_data
     except Exception as e:
         logger.error(f"Get sales forecast error: {e}")
@@ -241,6 +247,43 @@ async def get_sales_forecast(
         )
 
 
+@router.get("/targets/insights")
+async def get_target_insights(
+    target_amount: float = Query(..., gt=0),
+    current_user=Depends(require_sales_access())
+):
+    """Order pairs that reach a sales target, from the in-memory sales dataset"""
+    try:
+        return await sales_analytics_loader.get_target_insights(target_amount)
+    except Exception as e:
+        logger.error(f"Get target insights error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.get("/targets/monthly")
+async def get_monthly_target_achievement(
+    monthly_target: float = Query(..., gt=0),
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    current_user=Depends(require_sales_access())
+):
+    """Booked sales against a monthly target (default: current month), from the in-memory sales dataset"""
+    try:
+        today = date.today()
+        return await sales_analytics_loader.get_monthly_target_achievement(
+            monthly_target, year or today.year, month or today.month
+        )
+    except Exception as e:
+        logger.error(f"Get monthly target achievement error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
 @router.get("/kpis")
 async def get_sales_kpis(
     start_date: Optional[date] = None,
@@ -7,13 +7,16 @@ from app.models.payment import (
 from app.models.pagination import PaginationResponse
 from app.services.payment_service import payment_service
 from app.services.stripe_service import stripe_service
+from app.services.webhook_service import webhook_event_service
+from app.services.card_gateway import card_gateway, CardGatewayError
+from app.services.payment_reports_service import payment_reports_service
 from app.services.external_services import inventory_service
 from app.api.dependencies import (
     get_current_active_user, require_sales_access, require_sales_write, 
     get_token_from_request, require_sales_access_flexible
 )
 from typing import List, Optional, Union
-from datetime import date
+from datetime import date, timedelta
 import logging
 import stripe
 
@@ -158,6 +161,12 @@ async def create_card_payment(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except CardGatewayError as e:
+        logger.error(f"Card gateway error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Card gateway unavailable, please retry"
+        )
     except Exception as e:
         logger.error(f"Card payment creation error: {e}")
         raise HTTPException(
@@ -168,6 +177,19 @@ async def create_card_payment(
 
 
 
+@router.get("/card/gateway-metrics")
+async def get_card_gateway_metrics(current_user=Depends(require_sales_access())):
+    """Card gateway call counts, declines, errors and latency percentiles"""
+    try:
+        return card_gateway.metrics()
+    except Exception as e:
+        logger.error(f"Get card gateway metrics error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
 @router.get("/", response_model=PaginationResponse[PaymentResponse])
 async def get_payments(
     skip: int = Query(0, ge=0),
@@ -347,19 +369,20 @@ async def get_payments_by_customer(
 
 @router.get("/methods/summary")
 async def get_payment_methods_summary(
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
+    start_date: Optional[date] = Query(None, description="Defaults to 30 days before end_date"),
+    end_date: Optional[date] = Query(None, description="Defaults to today"),
     current_user=Depends(require_sales_access())
 ):
     """Get payment methods summary for reporting"""
     try:
-        # This would be implemented to return payment method statistics
-        # For now, return a simple structure
-        return {
-            "message": "Payment methods summary endpoint - to be implemented",
-            "start_date": start_date,
-            "end_date": end_date
-        }
+        end_date = end_date or date.today()
+        start_date = start_date or end_date - timedelta(days=29)
+        return await payment_reports_service.get_methods_summary(start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Get payment methods summary error: {e}")
         raise HTTPException(
@@ -385,6 +408,19 @@ async def get_stripe_config():
         )
 
 
+@router.get("/stripe/metrics")
+async def get_stripe_metrics(current_user=Depends(require_sales_access())):
+    """Stripe gateway call counts, retries, timeouts and latency percentiles per operation"""
+    try:
+        return stripe_service.get_metrics()
+    except Exception as e:
+        logger.error(f"Get Stripe metrics error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
 @router.post("/stripe/create-intent")
 async def create_stripe_payment_intent(
     intent_data: StripePaymentIntentCreate,
@@ -681,7 +717,11 @@ async def create_stripe_refund(
 
 @router.post("/stripe/webhook")
 async def stripe_webhook(request: Request):
-    """Handle Stripe webhook events (no authentication required)"""
+    """Receive Stripe webhook events (no authentication required)
+
+    The event is verified and queued, then acknowledged; processing happens
+    in the webhook consumer so Stripe never waits on payment updates.
+    """
     try:
         # Get raw body and signature
         payload = await request.body()
@@ -704,48 +744,10 @@ async def stripe_webhook(request: Request):
                 detail=str(e)
             )
         
-        # Handle the event
-        result = await stripe_service.handle_webhook_event(event)
-        
-        # Update payment status based on event
-        if result.get("payment_intent_id"):
-            try:
-                # Find payment by payment_intent_id
-                from app.database.connection import get_database
-                db = await get_database()
-                payment = await db.payments.find_one({
-                    "gateway_details.stripe_payment_intent_id": result["payment_intent_id"]
-                })
-                
-                if payment and result.get("status"):
-                    # Update payment status
-                    payment_id = str(payment["_id"])
-                    
-                    if result["status"] == "completed":
-                        await payment_service.update_payment_status(
-                            payment_id, PaymentStatus.COMPLETED, "stripe_webhook"
-                        )
-                    elif result["status"] == "failed":
-                        await payment_service.update_payment_status(
-                            payment_id, PaymentStatus.FAILED, "stripe_webhook"
-                        )
-                    elif result["status"] == "refunded":
-                        await payment_service.update_payment_status(
-                            payment_id, PaymentStatus.REFUNDED, "stripe_webhook"
-                        )
-                    elif result["status"] == "cancelled":
-                        await payment_service.update_payment_status(
-                            payment_id, PaymentStatus.CANCELLED, "stripe_webhook"
-                        )
-                    
-                    logger.info(f"✅ Payment status updated via webhook: {payment_id}")
-            except Exception as e:
-                logger.error(f"⚠️ Error updating payment from webhook: {e}")
-                # Don't raise exception - webhook was processed successfully
-        
-        logger.info(f"✅ Webhook processed: {result['event_type']}")
+        # Queue the event and acknowledge; the webhook consumer applies it
+        queued = await webhook_event_service.ingest(event, payload)
         
-        return {"received": True, "event_type": result["event_type"]}
+        return {"received": True, "event_type": event.type, "duplicate": not queued}
         
     except HTTPException:
         raise
@@ -759,42 +761,61 @@ async def stripe_webhook(request: Request):
         )
 
 
+@router.get("/stripe/webhook-events/stats")
+async def get_webhook_event_stats(current_user=Depends(require_sales_access())):
+    """Webhook queue depth by status"""
+    try:
+        return await webhook_event_service.get_stats()
+    except Exception as e:
+        logger.error(f"Get webhook event stats error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.post("/stripe/webhook-events/replay")
+async def replay_webhook_events(
+    event_ids: Optional[List[str]] = Query(None, description="Stripe event ids to replay"),
+    status_filter: str = Query("dead", alias="status", description="Replay every event in this status when no ids are given"),
+    current_user=Depends(require_sales_write())
+):
+    """Queue webhook events for processing again"""
+    try:
+        if not event_ids and status_filter not in ("dead", "processed"):
+            raise ValueError("Only dead or processed events can be replayed by status")
+        replayed = await webhook_event_service.replay(event_ids, status_filter)
+        return {"replayed": replayed}
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Replay webhook events error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
 # ==================== END STRIPE ENDPOINTS ====================
 
 @router.get("/daily-summary")
 async def get_daily_payments_summary(
     date_filter: Optional[date] = Query(None, description="Date for summary (defaults to today)"),
+    end_date: Optional[date] = Query(None, description="Summarise date_filter..end_date with per-day rows"),
     current_user=Depends(require_sales_access())
 ):
     """Get daily payments summary for reporting"""
     try:
         target_date = date_filter or date.today()
-        
-        # Get all payments for the date
-        payments = await payment_service.get_payments(
-            start_date=target_date,
-            end_date=target_date
-        )
-        
-        # Calculate summary
-        summary = {
-            "date": target_date,
-            "total_payments": len(payments),
-            "total_amount": sum(p.amount for p in payments),
-            "completed_payments": len([p for p in payments if p.status == PaymentStatus.COMPLETED]),
-            "completed_amount": sum(p.amount for p in payments if p.status == PaymentStatus.COMPLETED),
-            "by_method": {}
-        }
-        
-        # Group by payment method
-        for payment in payments:
-            method = payment.payment_method
-            if method not in summary["by_method"]:
-                summary["by_method"][method] = {"count": 0, "amount": 0}
-            summary["by_method"][method]["count"] += 1
-            summary["by_method"][method]["amount"] += payment.amount
-        
-        return summary
+        return await payment_reports_service.get_daily_summary(target_date, end_date)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Get daily payments summary error: {e}")
         raise HTTPException(
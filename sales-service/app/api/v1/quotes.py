@@ -40,6 +40,7 @@ async def create_quote(
 
 @router.get("/", response_model=List[QuoteResponse])
 async def get_quotes(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[QuoteStatus] = None,
@@ -52,6 +53,7 @@ async def get_quotes(
 ):
     """Get list of quotes with pagination and filters"""
     try:
+        token = await get_token_from_request(request)
         quotes = await quote_service.get_quotes(
             skip=skip,
             limit=limit,
@@ -60,7 +62,8 @@ async def get_quotes(
             sales_rep_id=sales_rep_id,
             start_date=start_date,
             end_date=end_date,
-            search=search
+            search=search,
+            token=token
         )
         return quotes
     except Exception as e:
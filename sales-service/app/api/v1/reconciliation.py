@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException, status, Depends
+from app.models import TargetSearchRequest, TargetSearchResponse
+from app.services import reconciliation_service
+from app.api.dependencies import require_sales_access
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/reconciliation", tags=["Reconciliation"])
+
+
+@router.post("/target-search", response_model=TargetSearchResponse)
+async def target_search(
+    search_request: TargetSearchRequest,
+    current_user=Depends(require_sales_access())
+):
+    """Find combinations of payments or open invoices that add up to a target amount"""
+    try:
+        if search_request.end_date < search_request.start_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="end_date must not be before start_date"
+            )
+        if search_request.min_items > search_request.max_items:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="min_items must not exceed max_items"
+            )
+        return await reconciliation_service.find_target_combinations(search_request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Target search error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
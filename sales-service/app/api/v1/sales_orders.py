@@ -1,15 +1,20 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, UploadFile, File
+from fastapi.responses import StreamingResponse
 from app.models import (
-    SalesOrderCreate, SalesOrderUpdate, SalesOrderResponse, OrderStatus, PaymentStatus
+    SalesOrderCreate, SalesOrderUpdate, SalesOrderResponse, OrderStatus, PaymentStatus,
+    BulkStatusUpdate, BulkStatusUpdateResponse
 )
 from app.models.pagination import PaginationResponse
 from app.services import sales_order_service
+from app.services.order_import_service import order_import_service, parse_rows, IMPORT_FORMATS
 from app.api.dependencies import (
     get_current_active_user, require_sales_access, require_sales_write, 
     get_token_from_request, require_sales_access_flexible
 )
 from typing import List, Optional
 from datetime import date
+import codecs
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -86,6 +91,7 @@ async def create_sales_order(
 
 @router.get("/", response_model=PaginationResponse[SalesOrderResponse])
 async def get_sales_orders(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[OrderStatus] = None,
@@ -101,6 +107,7 @@ async def get_sales_orders(
         logger.info(f"Getting sales orders for user: {current_user.get('email')}")
         
         # Get orders and total count
+        token = await get_token_from_request(request)
         orders = await sales_order_service.get_orders(
             skip=skip,
             limit=limit,
@@ -109,7 +116,8 @@ async def get_sales_orders(
             sales_rep_id=sales_rep_id,
             start_date=start_date,
             end_date=end_date,
-            search=search
+            search=search,
+            token=token
         )
         
         # Get total count for pagination
@@ -336,16 +344,19 @@ async def get_order_by_number(
 @router.get("/customer/{customer_id}/orders", response_model=List[SalesOrderResponse])
 async def get_customer_orders(
     customer_id: str,
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     current_user=Depends(require_sales_access())
 ):
     """Get orders for a specific customer"""
     try:
+        token = await get_token_from_request(request)
         orders = await sales_order_service.get_orders(
             skip=skip,
             limit=limit,
-            customer_id=customer_id
+            customer_id=customer_id,
+            token=token
         )
         return orders
     except Exception as e:
@@ -390,6 +401,88 @@ async def duplicate_order(
         )
 
 
+@router.post("/import")
+async def import_orders(
+    request: Request,
+    file: UploadFile = File(..., description="JSONL (one order per line) or CSV (one line item per row)"),
+    file_format: Optional[str] = Query(None, alias="format", description="jsonl or csv; defaults to the file extension"),
+    dry_run: bool = Query(False, description="Validate and price orders without writing them"),
+    current_user=Depends(require_sales_write())
+):
+    """Bulk import historical or offline POS orders.
+
+    Streams newline-delimited JSON events: "error" per failed row,
+    "progress" after each chunk and a final "done" summary.
+    """
+    user_id = current_user.get("id") or current_user.get("_id") or str(current_user.get("user_id", ""))
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User ID not available"
+        )
+
+    file_format = (file_format or (file.filename or "").rsplit(".", 1)[-1]).lower()
+    if file_format == "ndjson":
+        file_format = "jsonl"
+    if file_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported import format. Must be one of: {list(IMPORT_FORMATS)}"
+        )
+
+    token = await get_token_from_request(request)
+    lines = codecs.iterdecode(file.file, "utf-8-sig")
+
+    async def events():
+        try:
+            async for event in order_import_service.import_orders(
+                parse_rows(lines, file_format), user_id, token, dry_run=dry_run
+            ):
+                yield json.dumps(event, default=str) + "\n"
+        except Exception as e:
+            logger.error(f"Order import error: {e}")
+            yield json.dumps({"event": "failed", "error": "Import aborted: internal server error"}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@router.post("/bulk/status", response_model=BulkStatusUpdateResponse)
+async def bulk_update_order_status(
+    bulk_data: BulkStatusUpdate,
+    request: Request,
+    current_user=Depends(require_sales_write())
+):
+    """Move many orders to one status; returns a result per order.
+
+    Confirming fulfils stock and cancelling a confirmed/processing order
+    releases it, as the single-order endpoints do.
+    """
+    try:
+        user_id = current_user.get("id") or current_user.get("_id") or str(current_user.get("user_id", ""))
+        if not user_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User ID not available"
+            )
+        
+        token = await get_token_from_request(request)
+        return await sales_order_service.bulk_update_status(bulk_data.order_ids, bulk_data.status, user_id, token)
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Bulk update order status error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
 @router.patch("/{order_id}/status")
 async def update_order_status(
     order_id: str,
@@ -10,6 +10,20 @@ class Settings(BaseSettings):
     mongodb_url: str = "mongodb://localhost:27017"
     database_name: str = "sales_db"
     
+    # Connection pool and wire options (see app/database/connection.py)
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 0
+    mongodb_max_idle_time_ms: Optional[int] = None
+    mongodb_wait_queue_timeout_ms: Optional[int] = 5000
+    mongodb_server_selection_timeout_ms: int = 5000
+    mongodb_connect_timeout_ms: int = 10000
+    mongodb_compressors: str = "zstd,snappy,zlib"  # codecs whose module is missing are skipped
+    
+    # Analytics handle: heavy reads routed off the primary when a secondary is available
+    mongodb_analytics_read_preference: str = "secondaryPreferred"
+    mongodb_analytics_tags: str = "workload:analytics"  # "key:value,..."; any secondary if none match
+    mongodb_analytics_max_staleness_seconds: int = -1  # -1 = no limit, otherwise >= 90
+    
     # Service
     service_name: str = "sales-service"
     service_port: int = 8003
@@ -19,6 +33,10 @@ class Settings(BaseSettings):
     auth_service_url: str = "http://auth-service:8001"  # Use service name for Docker
     inventory_service_url: str = "http://inventory-service:8002"  # Use service name for Docker
     
+    # Sales rep directory cache (names resolved via auth-service batch lookup)
+    sales_rep_cache_ttl_seconds: int = 300
+    sales_rep_cache_max_entries: int = 10000
+    
     # JWT Settings (for auth verification)
     secret_key: str = "your-super-secret-key-change-this-in-production"
     algorithm: str = "HS256"
@@ -36,12 +54,72 @@ class Settings(BaseSettings):
     default_tax_rate: float = 0.15  # 15% default tax
     default_discount_limit: float = 0.20  # 20% max discount
     
+    # In-memory sales analytics dataset (streamed from sales_orders)
+    analytics_loader_batch_size: int = 2000
+    analytics_refresh_interval_seconds: int = 60
+    
+    # Sales forecasting (fitted models cached per orders watermark)
+    forecast_history_months: int = 36
+    forecast_history_days: int = 365
+    forecast_cache_max_models: int = 64
+    forecast_min_history_periods: int = 6  # periods from the first sale on
+    
+    # Index migrations (spec in app/database/indexes.py, applied version in schema_migrations)
+    index_build_mode: str = "background"  # background | blocking | off
+    index_build_lease_seconds: int = 300
+    
+    # Online data migrations (scripts/migrate_*.py)
+    migration_batch_size: int = 500
+    migration_pause_seconds: float = 0.05
+    
+    # Reconciliation (target search over payments/invoices)
+    reconciliation_max_candidates: int = 5000
+    
+    # Bulk order status transitions
+    bulk_status_write_batch: int = 1000  # operations per bulk_write
+    bulk_status_concurrency: int = 20  # concurrent inventory calls for stock side effects
+
+    # Bulk order import (scripts/import_orders.py, POST /sales-orders/import)
+    order_import_chunk_size: int = 500  # orders resolved, numbered and inserted together
+    order_import_lookup_concurrency: int = 20  # concurrent inventory product lookups
+    order_import_max_errors: int = 1000  # row errors reported in detail; the rest are only counted
+
+    # Payment summaries (closed days cached in process)
+    payment_summary_cache_ttl_seconds: int = 3600
+    payment_summary_cache_max_days: int = 1000
+    payment_summary_max_range_days: int = 366
+
     # Stripe Payment Gateway Settings
     stripe_secret_key: str = ""
     stripe_publishable_key: str = ""
     stripe_webhook_secret: str = ""
     stripe_api_version: str = "2023-10-16"
     stripe_currency: str = "usd"
+    stripe_api_base: str = ""  # e.g. http://localhost:12111 for scripts/fake_stripe_server.py
+    stripe_max_concurrency: int = 16  # worker threads (and pooled connections) for SDK calls
+    stripe_timeout_seconds: float = 10.0
+    stripe_max_retries: int = 2
+    stripe_retry_backoff_seconds: float = 0.25
+
+    # Card gateway used by process_card_payment (only the simulator is built in)
+    card_gateway: str = "simulator"
+    card_sim_latency: str = "lognormal"  # fixed | lognormal
+    card_sim_latency_ms: float = 250.0  # fixed delay, or the lognormal median
+    card_sim_latency_sigma: float = 0.5  # lognormal spread
+    card_sim_spike_rate: float = 0.01  # share of calls hit by a tail-latency spike
+    card_sim_spike_ms: float = 3000.0
+    card_sim_error_rate: float = 0.0  # gateway failures (no authorization decision)
+    card_sim_decline_rate: float = 0.05
+    card_sim_decline_codes: str = "card_declined,insufficient_funds,expired_card,incorrect_cvc,do_not_honor"
+    card_sim_seed: int = -1  # -1 = unseeded
+
+    # Stripe webhook consumer (events queued in webhook_events, processed in the background)
+    webhook_consumer_enabled: bool = True
+    webhook_batch_size: int = 50
+    webhook_concurrency: int = 8
+    webhook_poll_seconds: float = 2.0
+    webhook_lease_seconds: int = 60  # a claimed event is retried after this if its worker died
+    webhook_max_attempts: int = 8  # then the event is parked as "dead" until replayed
     
     # Logging
     log_level: str = "INFO"
@@ -1 +1,7 @@
-from .connection import get_database, connect_to_mongo, close_mongo_connection
+from .connection import get_database, get_analytics_database, connect_to_mongo, close_mongo_connection
+from .dates import (
+    DATE_FIELDS, PERIOD_GRANULARITIES, to_bson_date, normalize_dates, date_range,
+    period_fields, period_range, set_order_periods
+)
+from .indexes import INDEX_SPECS, RETIRED_INDEXES, IndexSpec
+from .schema_migrations import index_migrator
@@ -0,0 +1,91 @@
+from typing import Optional, Dict, Any, Union
+from datetime import datetime, date, time, timedelta, timezone
+
+# Business date fields per collection. They are stored as BSON dates (naive UTC
+# datetimes, midnight for calendar dates) so range filters and $dateToString work
+# on the field directly and can use its index.
+DATE_FIELDS = {
+    "sales_orders": ("order_date", "expected_delivery_date", "actual_delivery_date"),
+    "quotes": ("quote_date", "valid_until", "expiry_date", "expected_delivery_date"),
+    "invoices": ("invoice_date", "due_date"),
+    "payments": ("payment_date",),
+}
+
+DateLike = Union[datetime, date, str]
+
+
+def to_bson_date(value: Optional[DateLike]) -> Optional[datetime]:
+    """Convert a date, datetime or ISO string to the stored form; None stays None"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time.min)
+    raise TypeError(f"Not a date: {value!r}")
+
+
+def normalize_dates(document: Dict[str, Any], collection: str) -> Dict[str, Any]:
+    """Convert the collection's business date fields in a document or $set payload, in place"""
+    for field in DATE_FIELDS[collection]:
+        if field in document:
+            document[field] = to_bson_date(document[field])
+    return document
+
+
+def _day(value: DateLike) -> date:
+    value = to_bson_date(value)
+    return value.date()
+
+
+def date_range(start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> Dict[str, datetime]:
+    """Range filter covering whole days: [start 00:00, day after end 00:00)"""
+    query = {}
+    if start is not None:
+        query["$gte"] = datetime.combine(_day(start), time.min)
+    if end is not None:
+        query["$lt"] = datetime.combine(_day(end) + timedelta(days=1), time.min)
+    return query
+
+
+# Calendar buckets precomputed on orders under "period". Labels sort in
+# chronological order as strings, so grouping and sorting by them can walk
+# the matching compound index instead of evaluating date operators per row.
+PERIOD_GRANULARITIES = ("day", "week", "month", "quarter", "year")
+
+
+def period_fields(value: Optional[DateLike]) -> Optional[Dict[str, str]]:
+    """Calendar labels for a date: day, ISO week, month, quarter and year"""
+    if value is None or value == "":
+        return None
+    day = _day(value)
+    iso_year, iso_week, _ = day.isocalendar()
+    return {
+        "day": day.isoformat(),
+        "week": f"{iso_year}-W{iso_week:02d}",
+        "month": f"{day.year}-{day.month:02d}",
+        "quarter": f"{day.year}-Q{(day.month - 1) // 3 + 1}",
+        "year": str(day.year),
+    }
+
+
+def period_range(granularity: str, start: Optional[DateLike] = None,
+                 end: Optional[DateLike] = None) -> Dict[str, str]:
+    """Inclusive label range on period.<granularity> covering [start, end]"""
+    query = {}
+    if start is not None:
+        query["$gte"] = period_fields(start)[granularity]
+    if end is not None:
+        query["$lte"] = period_fields(end)[granularity]
+    return query
+
+
+def set_order_periods(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Refresh "period" on an order document or $set payload that carries order_date"""
+    if "order_date" in document:
+        document["period"] = period_fields(document["order_date"])
+    return document
@@ -0,0 +1,138 @@
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from dataclasses import dataclass
+from typing import Tuple, Dict, Any, Optional, List
+import logging
+
+from .dates import PERIOD_GRANULARITIES
+
+logger = logging.getLogger(__name__)
+
+# Order list queries always filter on deleted: False, so their indexes skip soft-deleted orders
+LIVE_ORDERS = {"deleted": False}
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """One index, named explicitly so it can be compared with what the server has"""
+    name: str
+    keys: Tuple[Tuple[str, int], ...]
+    unique: bool = False
+    partial: Optional[Dict[str, Any]] = None
+    note: str = ""
+
+    def model(self) -> IndexModel:
+        options: Dict[str, Any] = {"name": self.name}
+        if self.unique:
+            options["unique"] = True
+        if self.partial:
+            options["partialFilterExpression"] = self.partial
+        return IndexModel(list(self.keys), **options)
+
+
+def _index(name: str, *keys: Tuple[str, int], unique: bool = False,
+           partial: Optional[Dict[str, Any]] = None, note: str = "") -> IndexSpec:
+    return IndexSpec(name, tuple(keys), unique, partial, note)
+
+
+# Keys follow equality -> sort -> range; covering indexes carry the fields the
+# query reads after the filter so no document has to be fetched.
+INDEX_SPECS: Dict[str, List[IndexSpec]] = {
+    "customers": [
+        _index("email_1", ("email", ASCENDING), unique=True),
+        _index("customer_code_1", ("customer_code", ASCENDING), unique=True),
+        _index("phone_1", ("phone", ASCENDING)),
+        _index("status_created", ("status", ASCENDING), ("created_at", DESCENDING),
+               note="customer list filtered by status, newest first"),
+        _index("created_at_1", ("created_at", ASCENDING), note="unfiltered customer list"),
+    ],
+    "sales_orders": [
+        _index("order_number_1", ("order_number", ASCENDING), unique=True),
+        _index("live_order_date", ("order_date", DESCENDING), partial=LIVE_ORDERS,
+               note="order list, newest first"),
+        _index("live_status_date", ("status", ASCENDING), ("order_date", DESCENDING), partial=LIVE_ORDERS,
+               note="order list by status"),
+        _index("live_customer_date", ("customer_id", ASCENDING), ("order_date", DESCENDING), partial=LIVE_ORDERS,
+               note="order list by customer"),
+        _index("live_rep_date", ("sales_rep_id", ASCENDING), ("order_date", DESCENDING), partial=LIVE_ORDERS,
+               note="order list by sales rep"),
+        _index("booked_covering",
+               ("status", ASCENDING), ("order_date", ASCENDING),
+               ("total_amount", ASCENDING), ("customer_id", ASCENDING), ("sales_rep_id", ASCENDING),
+               note="status $in + order_date range reading amount, customer and rep (covered)"),
+        _index("rep_status_date", ("sales_rep_id", ASCENDING), ("status", ASCENDING), ("order_date", ASCENDING),
+               note="sales rep performance"),
+        _index("updated_at_1", ("updated_at", ASCENDING), note="analytics loader / forecast watermark"),
+        _index("import_ref_1", ("import_ref", ASCENDING), unique=True, partial={"import_ref": {"$exists": True}},
+               note="re-running an order import skips rows already loaded"),
+    ] + [
+        _index(f"period.{granularity}_1_status_1_order_date_1",
+               (f"period.{granularity}", ASCENDING), ("status", ASCENDING), ("order_date", ASCENDING),
+               note=f"revenue/trend grouping by {granularity}")
+        for granularity in PERIOD_GRANULARITIES
+    ],
+    "quotes": [
+        _index("quote_number_1", ("quote_number", ASCENDING), unique=True),
+        _index("quote_date_1", ("quote_date", ASCENDING), note="quote list and conversion funnel"),
+        _index("status_quote_date", ("status", ASCENDING), ("quote_date", DESCENDING),
+               note="funnel accepted count and quote list by status"),
+        _index("customer_quote_date", ("customer_id", ASCENDING), ("quote_date", DESCENDING)),
+        _index("rep_quote_date", ("sales_rep_id", ASCENDING), ("quote_date", DESCENDING)),
+        _index("valid_until_1", ("valid_until", ASCENDING)),
+    ],
+    "invoices": [
+        _index("invoice_number_1", ("invoice_number", ASCENDING), unique=True),
+        _index("order_id_1", ("order_id", ASCENDING)),
+        _index("invoice_date_1", ("invoice_date", ASCENDING), note="invoice list, newest first"),
+        _index("status_invoice_date", ("status", ASCENDING), ("invoice_date", DESCENDING)),
+        _index("payment_status_invoice_date", ("payment_status", ASCENDING), ("invoice_date", DESCENDING),
+               note="funnel paid count"),
+        _index("customer_invoice_date", ("customer_id", ASCENDING), ("invoice_date", DESCENDING)),
+        _index("open_balance", ("status", ASCENDING), ("invoice_date", ASCENDING), ("balance_due", ASCENDING),
+               partial={"balance_due": {"$gt": 0}}, note="reconciliation over open balances"),
+        _index("due_date_1", ("due_date", ASCENDING), note="overdue invoices"),
+    ],
+    "payments": [
+        _index("payment_number_1", ("payment_number", ASCENDING), unique=True),
+        _index("reference_number_1", ("reference_number", ASCENDING)),
+        _index("order_id_1", ("order_id", ASCENDING)),
+        _index("invoice_id_1", ("invoice_id", ASCENDING)),
+        _index("customer_created", ("customer_id", ASCENDING), ("created_at", DESCENDING)),
+        _index("created_at_1", ("created_at", ASCENDING), note="payment list, newest first"),
+        _index("status_payment_date", ("status", ASCENDING), ("payment_date", ASCENDING),
+               note="reconciliation over settled payments"),
+        _index("date_status_method",
+               ("payment_date", ASCENDING), ("status", ASCENDING), ("payment_method", ASCENDING),
+               ("amount", ASCENDING),
+               note="daily and per-method payment summaries (covered)"),
+        _index("payment_method_1", ("payment_method", ASCENDING)),
+        _index("gateway_details.stripe_payment_intent_id_1", ("gateway_details.stripe_payment_intent_id", ASCENDING),
+               note="webhook payment lookup"),
+    ],
+    # Event ids are the _id, so duplicate deliveries are rejected by the _id index
+    "webhook_events": [
+        _index("status_next_attempt", ("status", ASCENDING), ("next_attempt_at", ASCENDING),
+               note="consumer claims due events"),
+        _index("received_at_1", ("received_at", ASCENDING)),
+    ],
+    "sales_reports": [
+        _index("report_date_1", ("report_date", ASCENDING)),
+        _index("sales_rep_id_1", ("sales_rep_id", ASCENDING)),
+        _index("period_type_1", ("period_type", ASCENDING)),
+    ],
+}
+
+# Indexes created by earlier versions and now superseded by a spec entry
+# (prefix of a compound, or replaced by a partial/covering variant).
+# Single-field indexes keep the server's default "<field>_1" names so
+# existing ones are reused as-is.
+RETIRED_INDEXES: Dict[str, List[str]] = {
+    "customers": ["status_1"],
+    "sales_orders": [
+        "customer_id_1", "status_1", "order_date_1", "total_amount_1", "sales_rep_id_1",
+        "status_1_order_date_-1",
+    ],
+    "quotes": ["customer_id_1", "status_1", "created_at_1", "sales_rep_id_1"],
+    "invoices": ["customer_id_1", "status_1", "total_amount_1"],
+    "payments": ["payment_reference_1", "customer_id_1", "status_1", "payment_date_1"],
+}
+
@@ -6,7 +6,8 @@ from .customer import (
 from .sales_order import (
     SalesOrderCreate, SalesOrderUpdate, SalesOrderResponse, SalesOrderInDB,
     OrderLineItem, OrderLineItemCreate, OrderStatus, PaymentStatus,
-    ShippingMethod, OrderPriority
+    ShippingMethod, OrderPriority,
+    BulkStatusUpdate, BulkStatusResult, BulkStatusUpdateResponse, OrderImportRow
 )
 from .quote import (
     QuoteCreate, QuoteUpdate, QuoteResponse, QuoteInDB, QuoteStatus
@@ -25,3 +26,7 @@ from .payment import (
     CardType, TransactionType
 )
 from .pagination import PaginationResponse
+from .reconciliation import (
+    ReconciliationSource, TargetSearchRequest, TargetSearchItem,
+    TargetSearchMatch, TargetSearchResponse
+)
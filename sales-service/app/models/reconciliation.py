@@ -0,0 +1,50 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
+from datetime import datetime, date
+from enum import Enum
+
+
+class ReconciliationSource(str, Enum):
+    PAYMENTS = "payments"
+    INVOICES = "invoices"
+
+
+class TargetSearchRequest(BaseModel):
+    """Find payments or invoices whose amounts add up to a target (e.g. a bank deposit)"""
+    source: ReconciliationSource = ReconciliationSource.PAYMENTS
+    target_amount: float
+    start_date: date
+    end_date: date
+    customer_id: Optional[str] = None
+    min_items: int = Field(1, ge=1, le=10)
+    max_items: int = Field(4, ge=1, le=10)
+    tolerance: float = Field(0.0, ge=0)
+    max_results: int = Field(10, ge=1, le=100)
+    time_budget_ms: int = Field(2000, ge=100, le=10000)
+
+
+class TargetSearchItem(BaseModel):
+    id: str
+    number: Optional[str] = None
+    amount: float
+    date: Optional[Union[datetime, date, str]] = None
+    customer_id: Optional[str] = None
+    customer_name: Optional[str] = None
+    status: Optional[str] = None
+
+
+class TargetSearchMatch(BaseModel):
+    items: List[TargetSearchItem]
+    item_count: int
+    total_amount: float
+    difference: float
+
+
+class TargetSearchResponse(BaseModel):
+    source: ReconciliationSource
+    target_amount: float
+    candidates: int
+    truncated: bool = False  # more candidates in range than were searched
+    complete: bool = True    # False if the time budget ran out
+    methods: List[str] = []
+    matches: List[TargetSearchMatch] = []
@@ -189,3 +189,33 @@ class SalesOrderInDB(BaseModel):
 
     class Config:
         populate_by_name = True
+
+
+class BulkStatusUpdate(BaseModel):
+    """Move many orders to one status (e.g. a warehouse shipping run)"""
+    order_ids: List[str] = Field(..., min_length=1, max_length=5000)
+    status: OrderStatus
+
+
+class BulkStatusResult(BaseModel):
+    order_id: str
+    success: bool
+    previous_status: Optional[str] = None
+    error: Optional[str] = None
+    warnings: List[str] = []
+
+
+class BulkStatusUpdateResponse(BaseModel):
+    status: OrderStatus
+    requested: int
+    updated: int
+    failed: int
+    results: List[BulkStatusResult]
+
+
+class OrderImportRow(SalesOrderCreate):
+    """One order from an import file; import_ref makes re-importing a file safe"""
+    import_ref: Optional[str] = None
+    status: OrderStatus = OrderStatus.DRAFT
+    payment_status: PaymentStatus = PaymentStatus.PENDING
+    paid_amount: float = Field(0, ge=0)
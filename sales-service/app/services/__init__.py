@@ -1,10 +1,14 @@
 from .external_services import auth_service, inventory_service
+from .sales_rep_directory import sales_rep_directory, SalesRepDirectory
 from .customer_service import customer_service, CustomerService
 # ProductService removed - now handled by inventory service
 from .sales_order_service import sales_order_service, SalesOrderService
 from .quote_service import quote_service, QuoteService
 from .invoice_service import invoice_service, InvoiceService
 from .payment_service import payment_service, PaymentService
+from .forecast_service import sales_forecast_service, SalesForecastService
 from .analytics_service import analytics_service, AnalyticsService
 from .reports_service import reports_service, ReportsService
+from .analytics_loader import sales_analytics_loader, SalesAnalyticsLoader
+from .reconciliation_service import reconciliation_service, ReconciliationService
 """POS services removed"""
@@ -0,0 +1,295 @@
+# Analytics Loader - streams sales orders from MongoDB into column buffers
+# Documents are reduced to one row of compact arrays as they arrive and never kept
+
+from typing import List, Dict, Set, Tuple, Optional, Any
+from collections.abc import Sequence
+from array import array
+from dataclasses import asdict
+from datetime import datetime, date
+from sys import intern
+import asyncio
+import logging
+import time
+import numpy as np
+
+from app.database import get_database
+from app.config import settings
+from app.services.sales_analytics import SalesAnalyticsService, SalesTransaction, SalesTargetResult
+from app.services.sales_columns import SalesColumns, to_cents, UNIX_EPOCH_ORDINAL
+
+logger = logging.getLogger(__name__)
+
+# Orders that count as sales (same set the analytics aggregations use)
+BOOKED_ORDER_STATUSES = ("confirmed", "processing", "shipped", "delivered")
+
+ORDER_PROJECTION = {
+    "total_amount": 1,
+    "order_date": 1,
+    "customer_id": 1,
+    "sales_rep_id": 1,
+    "status": 1,
+    "line_items.product_id": 1,
+    "updated_at": 1
+}
+
+
+def _ordinal(value: Any) -> Optional[int]:
+    """Proleptic day ordinal of a stored order_date (datetime, date or ISO string); None if unusable"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if isinstance(value, (datetime, date)):
+        return value.toordinal()
+    return None
+
+
+def _target_result(result: SalesTargetResult) -> Dict[str, Any]:
+    """SalesTargetResult as plain JSON data; difference is None when nothing was found"""
+    return {
+        "found": result.found,
+        "transactions": [asdict(transaction) for transaction in result.transactions],
+        "total_amount": result.total_amount,
+        "difference": result.difference if result.found else None,
+        "target_achievement": result.target_achievement,
+    }
+
+
+class _Categories:
+    """String -> small int codes, in first-appearance order"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class SalesColumnBuffer:
+    """
+    Growable typed arrays with one row per order
+    Rows are keyed by order id, so reloading a changed order overwrites its row in place
+    instead of appending a duplicate.
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.row_of: Dict[str, int] = {}
+        self.amount_cents = array("q")
+        self.day_ordinal = array("i")
+        self.completed = array("b")
+        self.status_code = array("b")
+        self.salesperson_code = array("i")
+        self.customer_code = array("i")
+        self.product_ids: List[Tuple[str, ...]] = []
+        self.statuses = _Categories()
+        self.salespeople = _Categories()
+        self.customers = _Categories()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def put(self, doc: Dict[str, Any]) -> bool:
+        """Write one order document into its row; False if the row was already identical
+
+        Raises ValueError for an order without a usable order_date; the caller skips it.
+        """
+        order_id = str(doc["_id"])
+        day_ordinal = _ordinal(doc.get("order_date"))
+        if day_ordinal is None:
+            raise ValueError(f"Order {order_id} has no valid order_date")
+        status = doc.get("status") or ""
+        values = (
+            to_cents(doc.get("total_amount") or 0),
+            day_ordinal,
+            status in BOOKED_ORDER_STATUSES,
+            self.statuses.code(status),
+            self.salespeople.code(doc.get("sales_rep_id") or ""),
+            self.customers.code(doc.get("customer_id") or ""),
+        )
+        product_ids = tuple(
+            intern(item["product_id"]) for item in doc.get("line_items") or () if item.get("product_id")
+        )
+
+        row = self.row_of.get(order_id)
+        if row is None:
+            self.row_of[order_id] = len(self.ids)
+            self.ids.append(order_id)
+            self.amount_cents.append(values[0])
+            self.day_ordinal.append(values[1])
+            self.completed.append(values[2])
+            self.status_code.append(values[3])
+            self.salesperson_code.append(values[4])
+            self.customer_code.append(values[5])
+            self.product_ids.append(product_ids)
+            return True
+
+        if values == self._row_values(row) and product_ids == self.product_ids[row]:
+            return False
+        (self.amount_cents[row], self.day_ordinal[row], self.completed[row],
+         self.status_code[row], self.salesperson_code[row], self.customer_code[row]) = values
+        self.product_ids[row] = product_ids
+        return True
+
+    def _row_values(self, row: int) -> tuple:
+        return (
+            self.amount_cents[row], self.day_ordinal[row], bool(self.completed[row]),
+            self.status_code[row], self.salesperson_code[row], self.customer_code[row]
+        )
+
+    def to_columns(self) -> SalesColumns:
+        """Snapshot as SalesColumns; later puts do not affect it"""
+        # frombuffer().copy() is a memcpy and releases the buffer so the arrays can keep growing
+        def snapshot(buffer: array, dtype) -> np.ndarray:
+            return np.frombuffer(buffer, dtype=dtype).copy() if len(buffer) else np.empty(0, dtype=dtype)
+
+        columns = SalesColumns.from_arrays(
+            transactions=(),
+            amount_cents=snapshot(self.amount_cents, np.int64),
+            day_ordinal=snapshot(self.day_ordinal, np.int32),
+            completed=snapshot(self.completed, np.int8).astype(bool),
+            salesperson_ids=list(self.salespeople.values),
+            salesperson_code=snapshot(self.salesperson_code, np.int32),
+            customer_ids=list(self.customers.values),
+            customer_code=snapshot(self.customer_code, np.int32),
+        )
+        columns.transactions = RowTransactions(
+            columns, list(self.ids), list(self.product_ids),
+            list(self.statuses.values), snapshot(self.status_code, np.int8)
+        )
+        return columns
+
+
+class RowTransactions(Sequence):
+    """
+    Read-only sequence of SalesTransaction over a column snapshot
+    Transactions are built only when indexed, so results materialise just the rows they
+    return. Dates come back as midnight of the order day.
+    """
+
+    def __init__(self, columns: SalesColumns, ids: List[str], product_ids: List[Tuple[str, ...]],
+                 status_names: List[str], status_code: np.ndarray):
+        self.columns = columns
+        self.ids = ids
+        self.product_ids = product_ids
+        self.status_names = status_names
+        self.status_code = status_code
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        row = int(row)
+        columns = self.columns
+        return SalesTransaction(
+            id=self.ids[row],
+            amount=int(columns.amount_cents[row]) / 100,
+            date=datetime.fromordinal(int(columns.day[row].astype(np.int64)) + UNIX_EPOCH_ORDINAL),
+            customer_id=columns.customer_ids[columns.customer_code[row]],
+            product_ids=self.product_ids[row],
+            salesperson_id=columns.salesperson_ids[columns.salesperson_code[row]],
+            status="completed" if columns.completed[row] else self.status_names[self.status_code[row]]
+        )
+
+
+class SalesAnalyticsLoader:
+    """
+    Keeps a SalesAnalyticsService warm over the sales_orders collection
+    The first load streams every order in cursor batches with a narrow projection; later
+    loads fetch only orders with updated_at at or after the watermark and rewrite their
+    rows. Deleted orders are only dropped by a full reload.
+    """
+
+    def __init__(self):
+        self.buffer = SalesColumnBuffer()
+        self.watermark: Optional[datetime] = None
+        self.loaded_at: Optional[float] = None
+        # Ids of orders left out because their order_date is missing or unparseable
+        self.skipped_ids: Set[str] = set()
+        self._service: Optional[SalesAnalyticsService] = None
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, full: bool = False) -> int:
+        """Load new and changed orders into the buffer; returns the number of rows changed"""
+        async with self._lock:
+            if full:
+                self.buffer = SalesColumnBuffer()
+                self.watermark = None
+                self.skipped_ids = set()
+                self._service = None
+
+            db = get_database()
+            # $gte rather than $gt: orders written in the watermark's own millisecond are
+            # re-read, and unchanged rows are skipped by put()
+            query = {} if self.watermark is None else {"updated_at": {"$gte": self.watermark}}
+            cursor = db.sales_orders.find(query, ORDER_PROJECTION).batch_size(
+                settings.analytics_loader_batch_size
+            )
+
+            changed = 0
+            watermark = self.watermark
+            async for doc in cursor:
+                try:
+                    if self.buffer.put(doc):
+                        changed += 1
+                    self.skipped_ids.discard(str(doc["_id"]))
+                except ValueError as e:
+                    self.skipped_ids.add(str(doc["_id"]))
+                    logger.debug(f"Skipping order in analytics dataset: {e}")
+                updated_at = doc.get("updated_at")
+                if isinstance(updated_at, datetime) and (watermark is None or updated_at > watermark):
+                    watermark = updated_at
+
+            self.watermark = watermark
+            self.loaded_at = time.monotonic()
+            if changed or self._service is None:
+                self._service = SalesAnalyticsService.from_columns(self.buffer.to_columns())
+            if self.skipped_ids:
+                logger.warning(f"Sales analytics dataset skips {len(self.skipped_ids)} orders without a valid order_date")
+            logger.info(f"Sales analytics refresh: {changed} changed rows, {len(self.buffer)} total")
+            return changed
+
+    async def get_service(self) -> SalesAnalyticsService:
+        """Current analytics service, refreshed first if older than the refresh interval"""
+        stale = (
+            self.loaded_at is None
+            or time.monotonic() - self.loaded_at >= settings.analytics_refresh_interval_seconds
+        )
+        if stale:
+            await self.refresh()
+        return self._service
+
+    async def get_target_insights(self, target_amount: float) -> Dict[str, Any]:
+        """Order pairs reaching target_amount (exact, closest and per sales rep) over the warm dataset"""
+        insights = (await self.get_service()).get_sales_insights(target_amount)
+        return {
+            **insights,
+            "exact_matches": _target_result(insights["exact_matches"]),
+            "closest_matches": _target_result(insights["closest_matches"]),
+            "salesperson_performance": {
+                salesperson_id: [_target_result(result) for result in results]
+                for salesperson_id, results in insights["salesperson_performance"].items()
+            },
+            "skipped_orders": len(self.skipped_ids),
+        }
+
+    async def get_monthly_target_achievement(self, monthly_target: float, year: int, month: int) -> Dict[str, Any]:
+        """Booked sales against a monthly target, with the largest contributing order pairs"""
+        report = (await self.get_service()).analyze_monthly_target_achievement(monthly_target, year, month)
+        report["significant_combinations"] = [
+            {**combination, "transactions": [asdict(transaction) for transaction in combination["transactions"]]}
+            for combination in report["significant_combinations"]
+        ]
+        return report
+
+
+# Global instance
+sales_analytics_loader = SalesAnalyticsLoader()
@@ -1,4 +1,5 @@
-from app.database import get_database
+from app.database import get_analytics_database, date_range, period_range
+from app.services.forecast_service import sales_forecast_service
 from typing import List, Dict, Any, Optional
 from datetime import date, datetime, timedelta
 from bson import ObjectId
@@ -6,6 +7,25 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# API period name -> precomputed order field (see app.database.dates.period_fields)
+PERIOD_FIELDS = {
+    "daily": "period.day",
+    "weekly": "period.week",
+    "monthly": "period.month",
+    "quarterly": "period.quarter",
+    "yearly": "period.year",
+}
+
+
+def _period_match(period_field: str, start_date: date, end_date: date) -> Dict[str, Any]:
+    """Booked orders in [start_date, end_date], bounded on the period field so the
+    (period.<g>, status, order_date) index drives both the scan and its order"""
+    return {
+        period_field: period_range(period_field.split(".")[1], start_date, end_date),
+        "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]},
+        "order_date": date_range(start_date, end_date)
+    }
+
 
 class AnalyticsService:
     def __init__(self):
@@ -14,7 +34,7 @@ class AnalyticsService:
     async def get_sales_dashboard(self, start_date: date, end_date: date) -> Dict[str, Any]:
         """Get sales dashboard analytics"""
         try:
-            db = get_database()
+            db = get_analytics_database()
             
             # Get key metrics
             total_revenue = await self._get_total_revenue(start_date, end_date)
@@ -66,32 +86,18 @@ class AnalyticsService:
     async def get_revenue_analytics(self, period: str, start_date: date, end_date: date) -> Dict[str, Any]:
         """Get revenue analytics by period"""
         try:
-            db = get_database()
+            db = get_analytics_database()
             orders_collection = db.sales_orders
             
-            # Define grouping based on period
-            group_format = {
-                "daily": {"$dateToString": {"format": "%Y-%m-%d", "date": "$order_date"}},
-                "weekly": {"$dateToString": {"format": "%Y-W%U", "date": "$order_date"}},
-                "monthly": {"$dateToString": {"format": "%Y-%m", "date": "$order_date"}},
-                "quarterly": {"$concat": [
-                    {"$toString": {"$year": "$order_date"}},
-                    "-Q",
-                    {"$toString": {"$ceil": {"$divide": [{"$month": "$order_date"}, 3]}}}
-                ]},
-                "yearly": {"$dateToString": {"format": "%Y", "date": "$order_date"}}
-            }
+            period_field = PERIOD_FIELDS.get(period, PERIOD_FIELDS["monthly"])
             
             pipeline = [
-                {
-                    "$match": {
-                        "order_date": {"$gte": start_date, "$lte": end_date},
-                        "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]}
-                    }
-                },
+                {"$match": _period_match(period_field, start_date, end_date)},
+                # Index order: $group then sees each bucket's orders contiguously
+                {"$sort": {period_field: 1}},
                 {
                     "$group": {
-                        "_id": group_format.get(period, group_format["monthly"]),
+                        "_id": f"${period_field}",
                         "revenue": {"$sum": "$total_amount"},
                         "orders": {"$sum": 1},
                         "avg_order_value": {"$avg": "$total_amount"}
@@ -119,11 +125,11 @@ class AnalyticsService:
     async def get_sales_performance(self, sales_rep_id: Optional[str], start_date: date, end_date: date) -> Dict[str, Any]:
         """Get sales representative performance analytics"""
         try:
-            db = get_database()
+            db = get_analytics_database()
             orders_collection = db.sales_orders
             
             match_filter = {
-                "order_date": {"$gte": start_date, "$lte": end_date},
+                "order_date": date_range(start_date, end_date),
                 "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]}
             }
             
@@ -174,11 +180,11 @@ class AnalyticsService:
     async def get_customer_analytics(self, customer_id: Optional[str], start_date: date, end_date: date) -> Dict[str, Any]:
         """Get customer analytics"""
         try:
-            db = get_database()
+            db = get_analytics_database()
             orders_collection = db.sales_orders
             
             match_filter = {
-                "order_date": {"$gte": start_date, "$lte": end_date},
+                "order_date": date_range(start_date, end_date),
                 "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]}
             }
             
@@ -242,14 +248,14 @@ class AnalyticsService:
                                    start_date: date, end_date: date) -> Dict[str, Any]:
         """Get product sales analytics"""
         try:
-            db = get_database()
+            db = get_analytics_database()
             orders_collection = db.sales_orders
             
             # Unwind line items to analyze products
             pipeline = [
                 {
                     "$match": {
-                        "order_date": {"$gte": start_date, "$lte": end_date},
+                        "order_date": date_range(start_date, end_date),
                         "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]}
                     }
                 },
@@ -285,7 +291,7 @@ class AnalyticsService:
             if product_id:
                 pipeline[1] = {
                     "$match": {
-                        "order_date": {"$gte": start_date, "$lte": end_date},
+                        "order_date": date_range(start_date, end_date),
                         "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]},
                         "line_items.product_id": product_id
                     }
@@ -308,31 +314,31 @@ class AnalyticsService:
     async def get_conversion_funnel(self, start_date: date, end_date: date) -> Dict[str, Any]:
         """Get sales conversion funnel analytics"""
         try:
-            db = get_database()
+            db = get_analytics_database()
             quotes_collection = db.quotes
             orders_collection = db.sales_orders
             invoices_collection = db.invoices
             
             # Count quotes
             quotes_count = await quotes_collection.count_documents({
-                "quote_date": {"$gte": start_date, "$lte": end_date}
+                "quote_date": date_range(start_date, end_date)
             })
             
             # Count accepted quotes
             accepted_quotes = await quotes_collection.count_documents({
-                "quote_date": {"$gte": start_date, "$lte": end_date},
+                "quote_date": date_range(start_date, end_date),
                 "status": "accepted"
             })
             
             # Count orders
             orders_count = await orders_collection.count_documents({
-                "order_date": {"$gte": start_date, "$lte": end_date},
+                "order_date": date_range(start_date, end_date),
                 "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]}
             })
             
             # Count paid invoices
             paid_invoices = await invoices_collection.count_documents({
-                "invoice_date": {"$gte": start_date, "$lte": end_date},
+                "invoice_date": date_range(start_date, end_date),
                 "payment_status": "paid"
             })
             
@@ -366,7 +372,7 @@ class AnalyticsService:
     async def get_top_customers(self, limit: int, period: str) -> Dict[str, Any]:
         """Get top customers by revenue"""
         try:
-            db = get_database()
+            db = get_analytics_database()
             orders_collection = db.sales_orders
             
             # Calculate date range based on period
@@ -381,7 +387,7 @@ class AnalyticsService:
             pipeline = [
                 {
                     "$match": {
-                        "order_date": {"$gte": start_date, "$lte": end_date},
+                        "order_date": date_range(start_date, end_date),
                         "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]}
                     }
                 },
@@ -417,7 +423,7 @@ class AnalyticsService:
     async def get_top_products(self, limit: int, metric: str, period: str) -> Dict[str, Any]:
         """Get top products by revenue, quantity, or profit"""
         try:
-            db = get_database()
+            db = get_analytics_database()
             orders_collection = db.sales_orders
             
             # Calculate date range based on period
@@ -439,7 +445,7 @@ class AnalyticsService:
             pipeline = [
                 {
                     "$match": {
-                        "order_date": {"$gte": start_date, "$lte": end_date},
+                        "order_date": date_range(start_date, end_date),
                         "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]}
                     }
                 },
@@ -478,15 +484,10 @@ class AnalyticsService:
     async def get_sales_trends(self, metric: str, period: str, start_date: date, end_date: date) -> Dict[str, Any]:
         """Get sales trends over time"""
         try:
-            db = get_database()
+            db = get_analytics_database()
             orders_collection = db.sales_orders
             
-            # Define grouping format
-            group_formats = {
-                "daily": {"$dateToString": {"format": "%Y-%m-%d", "date": "$order_date"}},
-                "weekly": {"$dateToString": {"format": "%Y-W%U", "date": "$order_date"}},
-                "monthly": {"$dateToString": {"format": "%Y-%m", "date": "$order_date"}}
-            }
+            period_field = PERIOD_FIELDS.get(period, PERIOD_FIELDS["monthly"])
             
             # Define metric aggregation
             metric_field = {
@@ -497,7 +498,7 @@ class AnalyticsService:
             
             if metric == "customers":
                 group_stage = {
-                    "_id": group_formats.get(period, group_formats["monthly"]),
+                    "_id": f"${period_field}",
                     "value": {"$addToSet": metric_field}
                 }
                 project_stage = {
@@ -506,7 +507,7 @@ class AnalyticsService:
                 }
             else:
                 group_stage = {
-                    "_id": group_formats.get(period, group_formats["monthly"]),
+                    "_id": f"${period_field}",
                     "value": {"$sum": metric_field}
                 }
                 project_stage = {
@@ -515,12 +516,8 @@ class AnalyticsService:
                 }
             
             pipeline = [
-                {
-                    "$match": {
-                        "order_date": {"$gte": start_date, "$lte": end_date},
-                        "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]}
-                    }
-                },
+                {"$match": _period_match(period_field, start_date, end_date)},
+                {"$sort": {period_field: 1}},
                 {"$group": group_stage},
                 {"$project": project_stage},
                 {"$sort": {"period": 1}}
@@ -542,48 +539,13 @@ class AnalyticsService:
             logger.error(f"Error getting sales trends: {e}")
             return {}
 
-    async def get_sales_forecast(self, months_ahead: int, metric: str) -> Dict[str, Any]:
-        """Get sales forecast using simple trend analysis"""
+    async def get_sales_forecast(self, months_ahead: int, metric: str, granularity: str = "monthly",
+                                 dimension: str = "total", keys: Optional[List[str]] = None,
+                                 days_ahead: int = 14) -> Dict[str, Any]:
+        """Get sales forecast from the seasonal least-squares model"""
         try:
-            # This is a simplified forecast - in a real implementation,
-            # you would use more sophisticated ML models
-            
-            # Get historical data for the last 12 months
-            end_date = date.today()
-            start_date = end_date.replace(year=end_date.year - 1)
-            
-            historical_data = await self.get_sales_trends(metric, "monthly", start_date, end_date)
-            
-            if not historical_data.get("trends"):
-                return {"forecast": [], "method": "insufficient_data"}
-            
-            # Simple linear trend forecast
-            trends = historical_data["trends"]
-            values = [trend["value"] for trend in trends]
-            
-            # Calculate trend
-            if len(values) >= 2:
-                trend = (values[-1] - values[0]) / len(values)
-                last_value = values[-1]
-                
-                forecast = []
-                for i in range(1, months_ahead + 1):
-                    forecast_value = last_value + (trend * i)
-                    forecast_date = (end_date.replace(day=1) + timedelta(days=32 * i)).replace(day=1)
-                    forecast.append({
-                        "period": forecast_date.strftime("%Y-%m"),
-                        "value": max(0, forecast_value),  # Ensure non-negative
-                        "confidence": max(0.5, 1 - (i * 0.1))  # Decreasing confidence
-                    })
-                
-                return {
-                    "forecast": forecast,
-                    "method": "linear_trend",
-                    "historical_data": trends[-6:],  # Last 6 months
-                    "metric": metric
-                }
-            
-            return {"forecast": [], "method": "insufficient_data"}
+            horizon = days_ahead if granularity == "daily" else months_ahead
+            return await sales_forecast_service.forecast(metric, horizon, granularity, dimension, keys)
 
         except Exception as e:
             logger.error(f"Error getting sales forecast: {e}")
@@ -644,13 +606,13 @@ class AnalyticsService:
     async def _get_total_revenue(self, start_date: date, end_date: date) -> float:
         """Get total revenue for a period"""
         try:
-            db = get_database()
+            db = get_analytics_database()
             orders_collection = db.sales_orders
             
             pipeline = [
                 {
                     "$match": {
-                        "order_date": {"$gte": start_date, "$lte": end_date},
+                        "order_date": date_range(start_date, end_date),
                         "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]}
                     }
                 },
@@ -667,11 +629,11 @@ class AnalyticsService:
     async def _get_total_orders(self, start_date: date, end_date: date) -> int:
         """Get total orders for a period"""
         try:
-            db = get_database()
+            db = get_analytics_database()
             orders_collection = db.sales_orders
             
             count = await orders_collection.count_documents({
-                "order_date": {"$gte": start_date, "$lte": end_date},
+                "order_date": date_range(start_date, end_date),
                 "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]}
             })
             
@@ -684,13 +646,13 @@ class AnalyticsService:
     async def _get_total_customers(self, start_date: date, end_date: date) -> int:
         """Get total unique customers for a period"""
         try:
-            db = get_database()
+            db = get_analytics_database()
             orders_collection = db.sales_orders
             
             pipeline = [
                 {
                     "$match": {
-                        "order_date": {"$gte": start_date, "$lte": end_date},
+                        "order_date": date_range(start_date, end_date),
                         "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]}
                     }
                 },
@@ -708,13 +670,13 @@ class AnalyticsService:
     async def _get_top_products_by_revenue(self, limit: int, start_date: date, end_date: date) -> List[Dict]:
         """Get top products by revenue"""
         try:
-            db = get_database()
+            db = get_analytics_database()
             orders_collection = db.sales_orders
             
             pipeline = [
                 {
                     "$match": {
-                        "order_date": {"$gte": start_date, "$lte": end_date},
+                        "order_date": date_range(start_date, end_date),
                         "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]}
                     }
                 },
@@ -741,13 +703,13 @@ class AnalyticsService:
     async def _get_top_customers_by_revenue(self, limit: int, start_date: date, end_date: date) -> List[Dict]:
         """Get top customers by revenue"""
         try:
-            db = get_database()
+            db = get_analytics_database()
             orders_collection = db.sales_orders
             
             pipeline = [
                 {
                     "$match": {
-                        "order_date": {"$gte": start_date, "$lte": end_date},
+                        "order_date": date_range(start_date, end_date),
                         "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]}
                     }
                 },
@@ -773,13 +735,13 @@ class AnalyticsService:
     async def _get_daily_sales_trends(self, start_date: date, end_date: date) -> List[Dict]:
         """Get daily sales trends"""
         try:
-            db = get_database()
+            db = get_analytics_database()
             orders_collection = db.sales_orders
             
             pipeline = [
                 {
                     "$match": {
-                        "order_date": {"$gte": start_date, "$lte": end_date},
+                        "order_date": date_range(start_date, end_date),
                         "status": {"$in": ["confirmed", "processing", "shipped", "delivered"]}
                     }
                 },
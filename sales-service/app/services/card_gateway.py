@@ -0,0 +1,142 @@
+"""
+Card Gateway
+Interface between PaymentService.process_card_payment and a card processor.
+The built-in backend is a simulator with configurable latency (fixed or
+lognormal, plus rare tail spikes), gateway error rate and decline codes, so
+/payments/card can be load tested without a processor.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
+import asyncio
+import logging
+import math
+import random
+import time
+import uuid
+from app.config import settings
+from app.models.payment import CardPaymentDetails
+from app.services.gateway_metrics import OperationStats
+
+logger = logging.getLogger(__name__)
+
+
+class CardGatewayError(Exception):
+    """The gateway could not return an authorization decision"""
+
+
+@dataclass
+class CardAuthorization:
+    approved: bool
+    transaction_id: str
+    authorization_code: Optional[str] = None
+    decline_code: Optional[str] = None
+    gateway: str = ""
+    latency_ms: float = 0.0
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+class CardGateway(ABC):
+    """Base class for card processors"""
+
+    name = "base"
+
+    def __init__(self):
+        self.stats = OperationStats()
+
+    async def authorize(self, card_details: CardPaymentDetails, amount: float, currency: str) -> CardAuthorization:
+        """Authorize and capture `amount`, recording the call's latency and outcome"""
+        self.stats.calls += 1
+        started = time.perf_counter()
+        try:
+            authorization = await self._authorize(card_details, amount, currency)
+        except Exception:
+            self.stats.errors += 1
+            self.stats.latencies.append(time.perf_counter() - started)
+            raise
+        elapsed = time.perf_counter() - started
+        self.stats.latencies.append(elapsed)
+        if not authorization.approved:
+            self.stats.declines += 1
+        authorization.gateway = self.name
+        authorization.latency_ms = round(elapsed * 1000, 1)
+        return authorization
+
+    @abstractmethod
+    async def _authorize(self, card_details: CardPaymentDetails, amount: float, currency: str) -> CardAuthorization:
+        """Ask the processor for a decision; raise CardGatewayError when it gives none"""
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"gateway": self.name, **self.stats.snapshot()}
+
+
+class SimulatedCardGateway(CardGateway):
+    name = "simulator"
+
+    def __init__(self, latency: str = "lognormal", latency_ms: float = 250.0, latency_sigma: float = 0.5,
+                 spike_rate: float = 0.0, spike_ms: float = 0.0, error_rate: float = 0.0,
+                 decline_rate: float = 0.0, decline_codes: Optional[List[str]] = None,
+                 seed: Optional[int] = None):
+        super().__init__()
+        if latency not in ("fixed", "lognormal"):
+            raise ValueError(f"Unknown simulator latency distribution: {latency}")
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.spike_rate = spike_rate
+        self.spike_ms = spike_ms
+        self.error_rate = error_rate
+        self.decline_rate = decline_rate
+        self.decline_codes = decline_codes or ["card_declined"]
+        self._random = random.Random(seed)
+
+    def _delay(self) -> float:
+        if self.latency == "fixed":
+            delay_ms = self.latency_ms
+        else:
+            # latency_ms is the median: exp(mu) with mu = ln(median)
+            delay_ms = self._random.lognormvariate(math.log(max(self.latency_ms, 0.001)), self.latency_sigma)
+        if self._random.random() < self.spike_rate:
+            delay_ms += self.spike_ms
+        return delay_ms / 1000
+
+    async def _authorize(self, card_details: CardPaymentDetails, amount: float, currency: str) -> CardAuthorization:
+        await asyncio.sleep(self._delay())
+
+        if self._random.random() < self.error_rate:
+            raise CardGatewayError("Simulated gateway error")
+
+        transaction_id = f"TXN_{uuid.uuid4().hex[:12].upper()}"
+        if self._random.random() < self.decline_rate:
+            return CardAuthorization(
+                approved=False,
+                transaction_id=transaction_id,
+                decline_code=self._random.choice(self.decline_codes)
+            )
+        return CardAuthorization(
+            approved=True,
+            transaction_id=transaction_id,
+            authorization_code=f"AUTH_{self._random.randint(100000, 999999)}"
+        )
+
+
+def build_card_gateway() -> CardGateway:
+    """Gateway selected by settings.card_gateway"""
+    if settings.card_gateway == "simulator":
+        return SimulatedCardGateway(
+            latency=settings.card_sim_latency,
+            latency_ms=settings.card_sim_latency_ms,
+            latency_sigma=settings.card_sim_latency_sigma,
+            spike_rate=settings.card_sim_spike_rate,
+            spike_ms=settings.card_sim_spike_ms,
+            error_rate=settings.card_sim_error_rate,
+            decline_rate=settings.card_sim_decline_rate,
+            decline_codes=[code.strip() for code in settings.card_sim_decline_codes.split(",") if code.strip()],
+            seed=settings.card_sim_seed if settings.card_sim_seed >= 0 else None
+        )
+    raise ValueError(f"Unknown card gateway: {settings.card_gateway}")
+
+
+# Global instance
+card_gateway = build_card_gateway()
@@ -3,6 +3,7 @@ from app.models import (
     CustomerCreate, CustomerUpdate, CustomerResponse, CustomerInDB,
     CustomerStatus, CustomerType
 )
+from pymongo import ReturnDocument, UpdateOne
 from pymongo.errors import DuplicateKeyError
 from typing import Optional, List, Dict, Any
 from datetime import datetime
@@ -131,17 +132,14 @@ class CustomerService:
             update_data = {k: v for k, v in customer_update.dict(exclude_unset=True).items() if v is not None}
             update_data["updated_at"] = datetime.utcnow()
 
-            # Update customer
-            result = await customers_collection.update_one(
+            # Update and read back in one round trip
+            updated_customer = await customers_collection.find_one_and_update(
                 {"_id": ObjectId(customer_id)},
-                {"$set": update_data}
+                {"$set": update_data},
+                return_document=ReturnDocument.AFTER
             )
-
-            if result.modified_count > 0:
-                # Fetch updated customer
-                updated_customer = await customers_collection.find_one({"_id": ObjectId(customer_id)})
-                if updated_customer:
-                    return CustomerResponse(**updated_customer)
+            if updated_customer:
+                return CustomerResponse(**updated_customer)
             
             return None
 
@@ -264,6 +262,32 @@ class CustomerService:
             logger.error(f"Error updating customer stats: {e}")
             return False
 
+    async def bulk_update_customer_stats(self, order_totals: Dict[str, List[float]]) -> int:
+        """update_customer_stats for many orders at once: one $inc per customer in a single bulk_write"""
+        try:
+            if not order_totals:
+                return 0
+            db = get_database()
+            now = datetime.utcnow()
+            operations = [
+                UpdateOne(
+                    {"_id": ObjectId(customer_id)},
+                    {
+                        "$inc": {"total_orders": len(totals), "total_spent": sum(totals)},
+                        "$set": {"last_order_date": now, "updated_at": now}
+                    }
+                )
+                for customer_id, totals in order_totals.items() if ObjectId.is_valid(customer_id)
+            ]
+            if not operations:
+                return 0
+            result = await db.customers.bulk_write(operations, ordered=False)
+            return result.modified_count
+
+        except Exception as e:
+            logger.error(f"Error updating customer stats in bulk: {e}")
+            return 0
+
     async def update_credit_used(self, customer_id: str, amount: float, increase: bool = True) -> bool:
         """Update customer credit used amount"""
         try:
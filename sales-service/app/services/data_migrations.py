@@ -0,0 +1,170 @@
+from app.database import get_database, DATE_FIELDS, to_bson_date, period_fields
+from app.config import settings
+from pymongo import UpdateOne
+from abc import ABC, abstractmethod
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedMigration(ABC):
+    """Base for online, resumable data migrations over one collection.
+
+    Documents are visited in _id order, `batch_size` at a time, and each
+    batch is written with one unordered bulk_write. After every batch the
+    last _id is checkpointed in `data_migrations`, so an interrupted run
+    resumes where it stopped. Each update is guarded by the values it was
+    computed from; a document changed by the application in the meantime
+    is left alone rather than overwritten.
+    """
+
+    name: str = ""
+    collection: str = ""
+
+    @abstractmethod
+    def query(self) -> Dict[str, Any]:
+        """Filter selecting documents that still need migrating"""
+
+    def projection(self) -> Optional[Dict[str, Any]]:
+        return None
+
+    @abstractmethod
+    def convert(self, doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """$set payload for a document, or None to skip it"""
+
+    def guard(self, doc: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Extra filter conditions the document must still meet when it is written"""
+        return {field: doc.get(field) for field in changes if field in doc}
+
+    async def run(self, batch_size: Optional[int] = None, pause_seconds: Optional[float] = None,
+                  restart: bool = False) -> Dict[str, Any]:
+        db = get_database()
+        collection = db[self.collection]
+        checkpoints = db.data_migrations
+        batch_size = batch_size or settings.migration_batch_size
+        pause_seconds = settings.migration_pause_seconds if pause_seconds is None else pause_seconds
+
+        state = await checkpoints.find_one({"_id": self.name}) or {}
+        last_id = None if restart or state.get("completed") else state.get("last_id")
+        summary = {"migration": self.name, "scanned": 0, "updated": 0, "skipped": 0, "resumed_from": last_id}
+
+        while True:
+            query = self.query()
+            if last_id is not None:
+                query = {"$and": [query, {"_id": {"$gt": last_id}}]}
+            batch = await collection.find(query, self.projection()).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+            if not batch:
+                break
+
+            operations: List[UpdateOne] = []
+            for doc in batch:
+                changes = self.convert(doc)
+                if not changes:
+                    summary["skipped"] += 1
+                    continue
+                operations.append(UpdateOne({"_id": doc["_id"], **self.guard(doc, changes)}, {"$set": changes}))
+
+            if operations:
+                result = await collection.bulk_write(operations, ordered=False)
+                summary["updated"] += result.modified_count
+                summary["skipped"] += len(operations) - result.modified_count
+
+            summary["scanned"] += len(batch)
+            last_id = batch[-1]["_id"]
+            await checkpoints.update_one(
+                {"_id": self.name},
+                {"$set": {"last_id": last_id, "completed": False, "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+            if pause_seconds:
+                # Leave room for application traffic between batches
+                await asyncio.sleep(pause_seconds)
+
+        await checkpoints.update_one(
+            {"_id": self.name},
+            {"$set": {"last_id": None, "completed": True, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        logger.info(f"Migration {self.name}: {summary}")
+        return summary
+
+
+class NativeDatesMigration(BatchedMigration):
+    """Converts business dates stored as ISO strings to BSON dates"""
+
+    def __init__(self, collection: str):
+        self.collection = collection
+        self.name = f"native_dates:{collection}"
+        self.fields = DATE_FIELDS[collection]
+
+    def query(self) -> Dict[str, Any]:
+        return {"$or": [{field: {"$type": "string"}} for field in self.fields]}
+
+    def projection(self) -> Dict[str, Any]:
+        return {field: 1 for field in self.fields}
+
+    def convert(self, doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        changes = {}
+        for field in self.fields:
+            value = doc.get(field)
+            if not isinstance(value, str):
+                continue
+            try:
+                changes[field] = to_bson_date(value)
+            except ValueError:
+                logger.warning(f"Unparseable {field} on {self.collection} {doc['_id']}: {value!r}")
+        return changes
+
+
+class OrderPeriodsMigration(BatchedMigration):
+    """Backfills the precomputed calendar buckets ("period") on orders.
+
+    Run after the native dates migration: only orders whose order_date is
+    already a BSON date are picked up.
+    """
+
+    name = "order_periods"
+    collection = "sales_orders"
+
+    def query(self) -> Dict[str, Any]:
+        return {"order_date": {"$type": "date"}, "period": {"$exists": False}}
+
+    def projection(self) -> Dict[str, Any]:
+        return {"order_date": 1}
+
+    def convert(self, doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return {"period": period_fields(doc["order_date"])}
+
+    def guard(self, doc: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+        # An order saved meanwhile already carries its own period
+        return {"order_date": doc["order_date"], "period": {"$exists": False}}
+
+
+class OrderDeletedFlagMigration(BatchedMigration):
+    """Sets deleted: False on orders created before the flag was always written.
+
+    Order lists filter on deleted == False so the partial list indexes apply;
+    until this has run, older orders are missing from those lists.
+    """
+
+    name = "order_deleted_flag"
+    collection = "sales_orders"
+
+    def query(self) -> Dict[str, Any]:
+        return {"deleted": {"$exists": False}}
+
+    def projection(self) -> Dict[str, Any]:
+        return {"_id": 1}
+
+    def convert(self, doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return {"deleted": False}
+
+    def guard(self, doc: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+        return {"deleted": {"$exists": False}}
+
+
+def native_dates_migrations() -> List[NativeDatesMigration]:
+    return [NativeDatesMigration(collection) for collection in DATE_FIELDS]
@@ -1,6 +1,7 @@
 import httpx
 from app.config import settings
 from typing import Optional, Dict, Any, List
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -65,6 +66,31 @@ class AuthService:
             logger.error(f"Auth service error: {e}")
             return None
 
+    async def get_users_by_ids(self, user_ids: List[str], token: str) -> Optional[List[Dict[str, Any]]]:
+        """Get directory fields for many users in one request"""
+        try:
+            headers = {"Authorization": f"Bearer {token}"}
+
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await client.post(
+                    f"{self.auth_service_url}/api/v1/users/batch",
+                    headers=headers,
+                    json={"ids": user_ids}
+                )
+
+                if response.status_code == 200:
+                    return response.json()
+                else:
+                    logger.warning(f"Batch get users failed: {response.status_code}")
+                    return None
+
+        except httpx.RequestError as e:
+            logger.error(f"Auth service request error: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Auth service error: {e}")
+            return None
+
 
 class InventoryService:
     def __init__(self):
@@ -161,6 +187,35 @@ class InventoryService:
             logger.error(f"Inventory service error: {e}")
             return None
 
+    async def get_products_by_identifiers(self, identifiers: List[str], token: str,
+                                          concurrency: int = 20) -> Dict[str, Dict[str, Any]]:
+        """Resolve many product ids or SKUs over one pooled client; unresolved identifiers are left out"""
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        semaphore = asyncio.Semaphore(concurrency)
+        products: Dict[str, Dict[str, Any]] = {}
+
+        async def lookup(client: httpx.AsyncClient, identifier: str) -> None:
+            # Same order as create_order: id when it looks like an ObjectId, then SKU
+            paths = [f"/products/{identifier}"] if len(identifier) == 24 else []
+            paths.append(f"/products/sku/{identifier}")
+            async with semaphore:
+                for path in paths:
+                    try:
+                        response = await client.get(f"{self.inventory_service_url}{path}", headers=headers)
+                    except httpx.RequestError as e:
+                        logger.error(f"Inventory service request error: {e}")
+                        return
+                    if response.status_code == 200:
+                        products[identifier] = response.json()
+                        return
+
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                await asyncio.gather(*(lookup(client, identifier) for identifier in dict.fromkeys(identifiers)))
+        except Exception as e:
+            logger.error(f"Inventory service error: {e}")
+        return products
+
     async def get_product_stock(self, product_id: str, token: str) -> Optional[Dict[str, Any]]:
         """Get current stock level for a product"""
         try:
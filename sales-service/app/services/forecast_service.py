@@ -0,0 +1,227 @@
+from app.database import get_analytics_database
+from app.config import settings
+from app.services.sales_forecast import SeasonalForecastModel
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import date, datetime, timedelta
+import asyncio
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BOOKED_ORDER_STATUSES = ["confirmed", "processing", "shipped", "delivered"]
+
+# granularity -> (season length, precomputed order period field)
+GRANULARITIES = {
+    "monthly": (12, "period.month"),
+    "daily": (7, "period.day"),
+}
+
+# Series are keyed by this field; "total" is a single series over all orders
+DIMENSION_FIELDS = {
+    "total": None,
+    "sales_rep": "sales_rep_id",
+    "product": "line_items.product_id",
+}
+
+CONFIDENCE_LEVEL = 0.95
+
+
+def _add_months(month_start: date, months: int) -> date:
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _periods(granularity: str, today: date, horizon: int) -> Tuple[List[date], List[date]]:
+    """Complete history periods up to (not including) the current one, then horizon future periods"""
+    if granularity == "daily":
+        history = [today - timedelta(days=days) for days in range(settings.forecast_history_days, 0, -1)]
+        future = [today + timedelta(days=days) for days in range(horizon)]
+    else:
+        current = today.replace(day=1)
+        history = [_add_months(current, -months) for months in range(settings.forecast_history_months, 0, -1)]
+        future = [_add_months(current, months) for months in range(horizon)]
+    return history, future
+
+
+class _FittedForecast:
+    __slots__ = ("watermark", "model", "keys", "labels", "history")
+
+    def __init__(self, watermark, model, keys, labels, history):
+        self.watermark = watermark
+        self.model = model
+        self.keys = keys
+        self.labels = labels
+        self.history = history
+
+
+class SalesForecastService:
+    """Forecasts order revenue/counts per period, in total or per rep or product.
+
+    History is rolled up by one aggregation into a (periods x series) matrix,
+    trimmed to start at the first period with any sales, and all series are
+    fitted together. Fitted models are cached under the orders watermark
+    (latest updated_at plus document count); while it is unchanged a
+    request only evaluates the model for the horizon.
+    """
+
+    def __init__(self):
+        self._models: "OrderedDict[tuple, _FittedForecast]" = OrderedDict()
+
+    async def _watermark(self) -> tuple:
+        db = get_analytics_database()
+        latest = await db.sales_orders.find({}, {"updated_at": 1}).sort("updated_at", -1).limit(1).to_list(length=1)
+        count = await db.sales_orders.estimated_document_count()
+        return (latest[0].get("updated_at") if latest else None, count)
+
+    async def _rollup(self, metric: str, granularity: str, dimension: str, keys: Optional[List[str]],
+                      periods: List[date]) -> Tuple[List[str], np.ndarray]:
+        """Sum the metric per (series, period); returns series keys and a dense (periods x series) matrix"""
+        db = get_analytics_database()
+        _, period_field = GRANULARITIES[granularity]
+        field = DIMENSION_FIELDS[dimension]
+        end = periods[-1] + timedelta(days=1) if granularity == "daily" else _add_months(periods[-1], 1)
+
+        match: Dict[str, Any] = {
+            "order_date": {
+                "$gte": datetime.combine(periods[0], datetime.min.time()),
+                "$lt": datetime.combine(end, datetime.min.time())
+            },
+            "status": {"$in": BOOKED_ORDER_STATUSES}
+        }
+        if keys and field:
+            match[field] = {"$in": keys}
+
+        pipeline: List[Dict[str, Any]] = [{"$match": match}]
+        if dimension == "product":
+            pipeline.append({"$unwind": "$line_items"})
+            if keys:
+                pipeline.append({"$match": {field: {"$in": keys}}})
+            value = {
+                "$ifNull": [
+                    "$line_items.line_total",
+                    {"$multiply": ["$line_items.quantity", "$line_items.unit_price"]}
+                ]
+            }
+        else:
+            value = "$total_amount"
+
+        pipeline.append({
+            "$group": {
+                "_id": {
+                    "series": f"${field}" if field else None,
+                    "period": f"${period_field}"
+                },
+                "value": {"$sum": value if metric == "revenue" else 1}
+            }
+        })
+
+        labels = [self._label(period, granularity) for period in periods]
+        position = {label: i for i, label in enumerate(labels)}
+        # Requested keys keep their order (and a column) even without sales
+        initial_keys = (keys or []) if field else ["total"]
+        series_index: Dict[str, int] = {key: i for i, key in enumerate(initial_keys)}
+        cells: List[Tuple[int, int, float]] = []
+        async for row in db.sales_orders.aggregate(pipeline):
+            period = position.get(row["_id"]["period"])
+            if period is None:
+                continue
+            series = row["_id"]["series"] if field else "total"
+            if series is None:
+                continue
+            column = series_index.setdefault(series, len(series_index))
+            cells.append((period, column, row["value"]))
+
+        history = np.zeros((len(periods), len(series_index)))
+        if cells:
+            rows, columns, values = zip(*cells)
+            np.add.at(history, (list(rows), list(columns)), values)
+        return list(series_index), history
+
+    @staticmethod
+    def _label(period: date, granularity: str) -> str:
+        return period.isoformat() if granularity == "daily" else period.strftime("%Y-%m")
+
+    async def _get_model(self, metric: str, granularity: str, dimension: str,
+                         keys: Optional[List[str]], today: date) -> _FittedForecast:
+        history_periods, _ = _periods(granularity, today, 0)
+        cache_key = (metric, granularity, dimension, tuple(sorted(keys)) if keys else None, history_periods[-1])
+        watermark = await self._watermark()
+
+        fitted = self._models.get(cache_key)
+        if fitted is not None and fitted.watermark == watermark:
+            self._models.move_to_end(cache_key)
+            return fitted
+
+        series_keys, history = await self._rollup(metric, granularity, dimension, keys, history_periods)
+        labels = [self._label(period, granularity) for period in history_periods]
+        # Fit on real history only: empty periods before the batch's first sale would drag the trend to zero
+        active = np.flatnonzero(history.any(axis=1))
+        first = int(active[0]) if len(active) else len(history_periods)
+        history, labels = history[first:], labels[first:]
+
+        season_length, _ = GRANULARITIES[granularity]
+        # Fitting is CPU-bound numpy work; keep it off the event loop
+        model = await asyncio.to_thread(SeasonalForecastModel, history, season_length)
+
+        fitted = _FittedForecast(watermark, model, series_keys, labels, history)
+        self._models[cache_key] = fitted
+        self._models.move_to_end(cache_key)
+        while len(self._models) > settings.forecast_cache_max_models:
+            self._models.popitem(last=False)
+        return fitted
+
+    async def forecast(self, metric: str = "revenue", horizon: int = 3, granularity: str = "monthly",
+                       dimension: str = "total", keys: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Forecast the next `horizon` periods, starting with the current (incomplete) one"""
+        today = date.today()
+        fitted = await self._get_model(metric, granularity, dimension, keys, today)
+        model = fitted.model
+        _, future_periods = _periods(granularity, today, horizon)
+        future_labels = [self._label(period, granularity) for period in future_periods]
+
+        enough_history = len(fitted.history) >= max(settings.forecast_min_history_periods, 3)
+        method = model.method if enough_history else "insufficient_data"
+        result: Dict[str, Any] = {
+            "metric": metric,
+            "granularity": granularity,
+            "dimension": dimension,
+            "method": method,
+            "confidence_level": CONFIDENCE_LEVEL,
+        }
+
+        series = []
+        if method != "insufficient_data":
+            mean, lower, upper = model.predict(horizon)
+            # Revenue and order counts cannot go negative
+            mean, lower, upper = np.maximum(mean, 0), np.maximum(lower, 0), np.maximum(upper, 0)
+            for column, key in enumerate(fitted.keys):
+                series.append({
+                    "key": key,
+                    "forecast": [
+                        {
+                            "period": label,
+                            "value": float(mean[i, column]),
+                            "lower": float(lower[i, column]),
+                            "upper": float(upper[i, column])
+                        }
+                        for i, label in enumerate(future_labels)
+                    ],
+                    "historical_data": [
+                        {"period": label, "value": float(fitted.history[i, column])}
+                        for i, label in list(enumerate(fitted.labels))[-6:]
+                    ]
+                })
+
+        if dimension == "total":
+            total = series[0] if series else {"forecast": [], "historical_data": []}
+            result["forecast"] = total["forecast"]
+            result["historical_data"] = total["historical_data"]
+        else:
+            result["series"] = series
+        return result
+
+
+# Global instance
+sales_forecast_service = SalesForecastService()
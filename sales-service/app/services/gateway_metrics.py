@@ -0,0 +1,35 @@
+from collections import deque
+from typing import Dict, Any, Optional, Deque
+
+LATENCY_SAMPLES = 512
+
+
+class OperationStats:
+    """Call outcome counts and a rolling window of latencies for one operation"""
+
+    __slots__ = ("calls", "errors", "declines", "retries", "timeouts", "latencies")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.declines = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 1)
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "declines": self.declines,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "latency_ms": {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99)},
+        }
@@ -0,0 +1,168 @@
+from app.database import get_database, date_range
+from app.services.analytics_service import PERIOD_FIELDS, _period_match
+from app.services.forecast_service import BOOKED_ORDER_STATUSES
+from app.services.sales_order_service import sales_order_service
+from app.services.reconciliation_service import SETTLED_PAYMENT_STATUSES, OPEN_INVOICE_STATUSES
+from app.services.payment_reports_service import summary_pipeline
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+from datetime import date, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    """A query shape the service runs often, with representative parameters"""
+    name: str
+    collection: str
+    filter: Optional[Dict[str, Any]] = None
+    sort: Optional[Tuple[Tuple[str, int], ...]] = None
+    projection: Optional[Dict[str, Any]] = None
+    pipeline: Optional[List[Dict[str, Any]]] = None
+    # Expected to be answered from the index alone (no FETCH)
+    covered: bool = False
+
+    def explain_command(self) -> Dict[str, Any]:
+        if self.pipeline is not None:
+            return {"aggregate": self.collection, "pipeline": self.pipeline, "cursor": {}}
+        command: Dict[str, Any] = {"find": self.collection, "filter": self.filter or {}}
+        if self.sort:
+            command["sort"] = dict(self.sort)
+        if self.projection:
+            command["projection"] = self.projection
+        return command
+
+
+def hot_queries(today: Optional[date] = None) -> List[HotQuery]:
+    """Registered hot queries, built with the same helpers the services use"""
+    today = today or date.today()
+    start, end = today - timedelta(days=90), today
+    booked = {"order_date": date_range(start, end), "status": {"$in": BOOKED_ORDER_STATUSES}}
+    newest_orders = (("order_date", -1),)
+
+    return [
+        # Order lists (sales_order_service.get_orders / count_orders)
+        HotQuery("orders.list", "sales_orders", sales_order_service._build_filter_query(), newest_orders),
+        HotQuery("orders.list_by_status", "sales_orders",
+                 sales_order_service._build_filter_query(status="confirmed"), newest_orders),
+        HotQuery("orders.list_by_customer", "sales_orders",
+                 sales_order_service._build_filter_query(customer_id="sample"), newest_orders),
+        HotQuery("orders.list_by_date", "sales_orders",
+                 sales_order_service._build_filter_query(start_date=start, end_date=end), newest_orders),
+
+        # Order analytics (analytics_service)
+        HotQuery("analytics.total_revenue", "sales_orders", pipeline=[
+            {"$match": booked},
+            {"$group": {"_id": None, "total": {"$sum": "$total_amount"}}}
+        ], covered=True),
+        HotQuery("analytics.total_customers", "sales_orders", pipeline=[
+            {"$match": booked},
+            {"$group": {"_id": "$customer_id"}},
+            {"$count": "total"}
+        ], covered=True),
+        HotQuery("analytics.rep_performance", "sales_orders",
+                 {**booked, "sales_rep_id": "sample"}),
+        HotQuery("analytics.revenue_by_month", "sales_orders", pipeline=[
+            {"$match": _period_match(PERIOD_FIELDS["monthly"], start, end)},
+            {"$sort": {PERIOD_FIELDS["monthly"]: 1}},
+            {"$group": {"_id": f"${PERIOD_FIELDS['monthly']}", "revenue": {"$sum": "$total_amount"}}}
+        ]),
+        HotQuery("analytics.trends_by_week", "sales_orders", pipeline=[
+            {"$match": _period_match(PERIOD_FIELDS["weekly"], start, end)},
+            {"$sort": {PERIOD_FIELDS["weekly"]: 1}},
+            {"$group": {"_id": f"${PERIOD_FIELDS['weekly']}", "value": {"$sum": "$total_amount"}}}
+        ]),
+
+        # Conversion funnel
+        HotQuery("funnel.quotes", "quotes", {"quote_date": date_range(start, end)}),
+        HotQuery("funnel.accepted_quotes", "quotes", {"quote_date": date_range(start, end), "status": "accepted"}),
+        HotQuery("funnel.paid_invoices", "invoices",
+                 {"invoice_date": date_range(start, end), "payment_status": "paid"}),
+
+        # Quote / invoice / payment / customer lists
+        HotQuery("quotes.list_by_status", "quotes", {"status": "sent"}, (("quote_date", -1),)),
+        HotQuery("invoices.list", "invoices", {}, (("invoice_date", -1),)),
+        HotQuery("invoices.list_by_customer", "invoices", {"customer_id": "sample"}, (("invoice_date", -1),)),
+        HotQuery("payments.list", "payments", {}, (("created_at", -1),)),
+        HotQuery("payments.list_by_customer", "payments", {"customer_id": "sample"}, (("created_at", -1),)),
+        HotQuery("payments.daily_summary", "payments", pipeline=summary_pipeline(start, end), covered=True),
+        HotQuery("customers.list_by_status", "customers", {"status": "active"}, (("created_at", -1),)),
+
+        # Reconciliation candidate loads (reconciliation_service)
+        HotQuery("reconciliation.payments", "payments", {
+            "status": {"$in": SETTLED_PAYMENT_STATUSES},
+            "payment_date": date_range(start, end)
+        }, (("payment_date", 1),)),
+        HotQuery("reconciliation.invoices", "invoices", {
+            "status": {"$in": OPEN_INVOICE_STATUSES},
+            "balance_due": {"$gt": 0},
+            "invoice_date": date_range(start, end)
+        }, (("invoice_date", 1),)),
+    ]
+
+
+def _winning_plans(explain: Any) -> Iterator[Dict[str, Any]]:
+    """Every winningPlan in an explain result (find, aggregate, or sharded)"""
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "winningPlan" and isinstance(value, dict):
+                # Slot-based engine nests the classic-looking tree under queryPlan
+                yield value.get("queryPlan", value)
+            else:
+                yield from _winning_plans(value)
+    elif isinstance(explain, list):
+        for value in explain:
+            yield from _winning_plans(value)
+
+
+def _stages(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for key in ("inputStage", "thenStage", "elseStage", "outerStage", "innerStage"):
+        if isinstance(plan.get(key), dict):
+            yield from _stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+
+def analyze_explain(query: HotQuery, explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarise the plan: indexes used, collection scans, blocking sorts, fetches"""
+    stages = [stage for plan in _winning_plans(explain) for stage in _stages(plan)]
+    names = [stage.get("stage") for stage in stages]
+    indexes = sorted({stage["indexName"] for stage in stages if stage.get("indexName")})
+
+    issues = []
+    if "COLLSCAN" in names:
+        issues.append("COLLSCAN")
+    if "SORT" in names:
+        issues.append("in-memory SORT")
+    if query.covered and "FETCH" in names:
+        issues.append("not covered (FETCH)")
+    if not stages:
+        issues.append("no plan in explain output")
+
+    return {
+        "name": query.name,
+        "collection": query.collection,
+        "indexes": indexes,
+        "stages": names,
+        "issues": issues,
+    }
+
+
+async def advise(queries: Optional[List[HotQuery]] = None) -> List[Dict[str, Any]]:
+    """Explain each hot query (queryPlanner only, nothing is executed) and report plan problems"""
+    db = get_database()
+    reports = []
+    for query in queries or hot_queries():
+        try:
+            explain = await db.command({"explain": query.explain_command(), "verbosity": "queryPlanner"})
+            reports.append(analyze_explain(query, explain))
+        except Exception as e:
+            logger.error(f"Error explaining {query.name}: {e}")
+            reports.append({
+                "name": query.name, "collection": query.collection,
+                "indexes": [], "stages": [], "issues": [f"explain failed: {e}"]
+            })
+    return reports
@@ -1,16 +1,19 @@
-from app.database import get_database
+from app.database import get_database, to_bson_date, normalize_dates, date_range
 from app.models import (
     InvoiceCreate, InvoiceUpdate, InvoiceResponse, InvoiceInDB, InvoiceStatus,
     PaymentCreate, PaymentResponse, PaymentInDB, PaymentMethod, PaymentStatus
 )
+from app.models.sales_order import PaymentStatus as BalanceStatus
 from app.services.customer_service import customer_service
 from app.services.sales_order_service import sales_order_service
+from pymongo import ReturnDocument
 from pymongo.errors import DuplicateKeyError
 from typing import Optional, List, Dict, Any
 from datetime import datetime, date, timedelta
 from bson import ObjectId
 from app.config import settings
 import logging
+import uuid
 
 logger = logging.getLogger(__name__)
 
@@ -67,7 +70,9 @@ class InvoiceService:
             )
 
             # Insert invoice
-            result = await invoices_collection.insert_one(invoice_doc.dict(by_alias=True, exclude={"id"}))
+            result = await invoices_collection.insert_one(
+                normalize_dates(invoice_doc.dict(by_alias=True, exclude={"id"}), "invoices")
+            )
             
             # Fetch created invoice
             created_invoice = await invoices_collection.find_one({"_id": result.inserted_id})
@@ -116,27 +121,20 @@ class InvoiceService:
             db = get_database()
             invoices_collection = db.invoices
 
-            # Get existing invoice
-            existing_invoice = await self.get_invoice_by_id(invoice_id)
-            if not existing_invoice:
-                return None
-
             # Prepare update data
             update_data = {k: v for k, v in invoice_update.dict(exclude_unset=True).items() if v is not None}
+            normalize_dates(update_data, "invoices")
             update_data["updated_at"] = datetime.utcnow()
             update_data["updated_by"] = user_id
 
-            # Update invoice
-            result = await invoices_collection.update_one(
+            # Update and read back in one round trip
+            updated_invoice = await invoices_collection.find_one_and_update(
                 {"_id": ObjectId(invoice_id)},
-                {"$set": update_data}
+                {"$set": update_data},
+                return_document=ReturnDocument.AFTER
             )
-
-            if result.modified_count > 0:
-                # Fetch updated invoice
-                updated_invoice = await invoices_collection.find_one({"_id": ObjectId(invoice_id)})
-                if updated_invoice:
-                    return InvoiceResponse(**updated_invoice)
+            if updated_invoice:
+                return InvoiceResponse(**updated_invoice)
             
             return None
 
@@ -165,15 +163,11 @@ class InvoiceService:
                 filter_query["payment_status"] = payment_status
             if customer_id:
                 filter_query["customer_id"] = customer_id
-            if start_date and end_date:
-                filter_query["invoice_date"] = {"$gte": start_date, "$lte": end_date}
-            elif start_date:
-                filter_query["invoice_date"] = {"$gte": start_date}
-            elif end_date:
-                filter_query["invoice_date"] = {"$lte": end_date}
+            if start_date or end_date:
+                filter_query["invoice_date"] = date_range(start_date, end_date)
             if overdue_only:
-                filter_query["due_date"] = {"$lt": date.today()}
-                filter_query["payment_status"] = {"$ne": PaymentStatus.PAID}
+                filter_query["due_date"] = {"$lt": to_bson_date(date.today())}
+                filter_query["payment_status"] = {"$ne": BalanceStatus.PAID}
             if search:
                 filter_query["$or"] = [
                     {"invoice_number": {"$regex": search, "$options": "i"}},
@@ -211,15 +205,11 @@ class InvoiceService:
                 filter_query["payment_status"] = payment_status
             if customer_id:
                 filter_query["customer_id"] = customer_id
-            if start_date and end_date:
-                filter_query["invoice_date"] = {"$gte": start_date, "$lte": end_date}
-            elif start_date:
-                filter_query["invoice_date"] = {"$gte": start_date}
-            elif end_date:
-                filter_query["invoice_date"] = {"$lte": end_date}
+            if start_date or end_date:
+                filter_query["invoice_date"] = date_range(start_date, end_date)
             if overdue_only:
-                filter_query["due_date"] = {"$lt": date.today()}
-                filter_query["payment_status"] = {"$ne": PaymentStatus.PAID}
+                filter_query["due_date"] = {"$lt": to_bson_date(date.today())}
+                filter_query["payment_status"] = {"$ne": BalanceStatus.PAID}
             if search:
                 filter_query["$or"] = [
                     {"invoice_number": {"$regex": search, "$options": "i"}},
@@ -273,53 +263,70 @@ class InvoiceService:
                             user_id: str = None) -> bool:
         """Record a payment for an invoice"""
         try:
-            # Get invoice
-            invoice = await self.get_invoice_by_id(invoice_id)
-            if not invoice:
-                return False
-
             db = get_database()
             invoices_collection = db.invoices
             payments_collection = db.payments
 
-            # Create payment record
+            invoice = await invoices_collection.find_one(
+                {"_id": ObjectId(invoice_id)},
+                {"invoice_number": 1, "customer_id": 1, "customer_name": 1}
+            )
+            if not invoice:
+                return False
+
+            # Build and validate the payment row before anything is written
             payment_doc = PaymentInDB(
+                payment_number=self._generate_payment_number(),
                 invoice_id=invoice_id,
+                invoice_number=invoice.get("invoice_number"),
+                customer_id=invoice.get("customer_id"),
+                customer_name=invoice.get("customer_name"),
                 amount=amount,
                 payment_method=payment_method,
-                reference=reference,
+                status=PaymentStatus.COMPLETED,
+                processed_at=datetime.utcnow(),
+                reference_number=reference,
                 notes=notes,
-                payment_date=date.today(),
                 created_by=user_id
             )
 
             # Insert payment
-            payment_result = await payments_collection.insert_one(payment_doc.dict(by_alias=True, exclude={"id"}))
-
-            # Update invoice payment status
-            new_paid_amount = invoice.paid_amount + amount
-            new_balance_due = invoice.total_amount - new_paid_amount
-
-            payment_status = PaymentStatus.PENDING
-            if new_balance_due <= 0:
-                payment_status = PaymentStatus.PAID
-            elif new_paid_amount > 0:
-                payment_status = PaymentStatus.PARTIAL
-
-            result = await invoices_collection.update_one(
-                {"_id": ObjectId(invoice_id)},
-                {
-                    "$set": {
-                        "paid_amount": new_paid_amount,
-                        "balance_due": new_balance_due,
-                        "payment_status": payment_status,
-                        "updated_at": datetime.utcnow(),
-                        "updated_by": user_id
-                    }
-                }
+            payment_result = await payments_collection.insert_one(
+                normalize_dates(payment_doc.dict(by_alias=True, exclude={"id"}), "payments")
             )
 
-            return result.modified_count > 0 and payment_result.inserted_id
+            # Apply the payment to the stored totals server-side, so concurrent
+            # payments on the same invoice cannot overwrite each other
+            try:
+                updated = await invoices_collection.find_one_and_update(
+                    {"_id": ObjectId(invoice_id)},
+                    [
+                        {"$set": {"paid_amount": {"$add": [{"$ifNull": ["$paid_amount", 0]}, amount]}}},
+                        {"$set": {"balance_due": {"$subtract": ["$total_amount", "$paid_amount"]}}},
+                        {"$set": {
+                            "payment_status": {"$switch": {
+                                "branches": [
+                                    {"case": {"$lte": ["$balance_due", 0]}, "then": BalanceStatus.PAID.value},
+                                    {"case": {"$gt": ["$paid_amount", 0]}, "then": BalanceStatus.PARTIAL.value}
+                                ],
+                                "default": BalanceStatus.PENDING.value
+                            }},
+                            "updated_at": datetime.utcnow(),
+                            "updated_by": {"$literal": user_id}
+                        }}
+                    ],
+                    projection={"_id": 1},
+                    return_document=ReturnDocument.AFTER
+                )
+            except Exception as e:
+                logger.error(f"Error applying payment to invoice {invoice_id}: {e}")
+                updated = None
+            if not updated:
+                # Invoice gone or not updated: drop the payment so a retry cannot double count
+                await payments_collection.delete_one({"_id": payment_result.inserted_id})
+                return False
+
+            return payment_result.inserted_id
 
         except Exception as e:
             logger.error(f"Error recording payment: {e}")
@@ -398,6 +405,12 @@ class InvoiceService:
             logger.error(f"Error voiding invoice: {e}")
             return False
 
+    def _generate_payment_number(self) -> str:
+        """Generate unique payment number"""
+        timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+        random_suffix = str(uuid.uuid4())[:8].upper()
+        return f"PAY-{timestamp}-{random_suffix}"
+
     async def _generate_invoice_number(self) -> str:
         """Generate unique invoice number"""
         try:
@@ -0,0 +1,387 @@
+"""
+Bulk Order Import
+Loads historical orders and offline POS batches from JSONL or CSV without
+going through create_order once per order. Rows are processed in chunks:
+- customers resolved with one $in query per chunk (id, email or code)
+- products resolved once per run over a pooled inventory client
+- line and order totals computed for the whole chunk with NumPy
+- order numbers reserved in one block per chunk
+- orders written with an unordered insert_many
+Rows carrying an import_ref are skipped when that ref was already imported,
+so a file can be re-run after a partial failure. Imported orders do not
+touch inventory stock or customer stats.
+"""
+
+from app.database.connection import get_database
+from app.database.dates import normalize_dates, set_order_periods, to_bson_date
+from app.models import OrderImportRow, OrderLineItem, SalesOrderInDB
+from app.services.sales_order_service import sales_order_service
+from app.services.sales_rep_directory import sales_rep_directory
+from app.services.external_services import inventory_service
+from app.config import settings
+from pymongo.errors import BulkWriteError
+from typing import List, Dict, Any, Iterable, Iterator, AsyncIterator, Tuple, Optional
+from datetime import datetime, date
+from bson import ObjectId
+import numpy as np
+import csv
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("jsonl", "csv")
+
+# CSV: one line item per row; consecutive rows sharing an order_ref form one order
+CSV_ORDER_FIELDS = (
+    "customer_id", "order_date", "expected_delivery_date", "shipping_method", "priority", "sales_rep_id",
+    "subtotal_discount_percent", "subtotal_discount_amount", "shipping_cost", "payment_method",
+    "notes", "internal_notes", "status", "payment_status", "paid_amount",
+)
+CSV_LINE_FIELDS = ("product_id", "quantity", "unit_price", "discount_percent", "discount_amount")
+
+CUSTOMER_PROJECTION = {
+    "first_name": 1, "last_name": 1, "email": 1, "customer_code": 1,
+    "shipping_address": 1, "billing_address": 1,
+}
+
+# (row number, parsed order or the parse error)
+ParsedRow = Tuple[int, Any]
+
+
+def parse_jsonl(lines: Iterable[str]) -> Iterator[ParsedRow]:
+    """One order object per line"""
+    for row_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, ValueError(f"Invalid JSON: {e}")
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[ParsedRow]:
+    """Orders from line-item rows; an order is reported under the row number of its first line"""
+    reader = csv.DictReader(lines)
+    current_ref, current, first_row = None, None, 0
+    for row_number, row in enumerate(reader, 2):  # row 1 is the header
+        order_ref = (row.get("order_ref") or "").strip()
+        # Rows without an order_ref are single-line orders
+        if not order_ref or order_ref != current_ref:
+            if current is not None:
+                yield first_row, current
+            current_ref, first_row = order_ref, row_number
+            current = {field: row[field] for field in CSV_ORDER_FIELDS if row.get(field) not in (None, "")}
+            if order_ref:
+                current["import_ref"] = order_ref
+            current["line_items"] = []
+        line_item = {field: row[field] for field in CSV_LINE_FIELDS if row.get(field) not in (None, "")}
+        if row.get("line_notes"):
+            line_item["notes"] = row["line_notes"]
+        current["line_items"].append(line_item)
+    if current is not None:
+        yield first_row, current
+
+
+def parse_rows(lines: Iterable[str], file_format: str) -> Iterator[ParsedRow]:
+    if file_format == "jsonl":
+        return parse_jsonl(lines)
+    if file_format == "csv":
+        return parse_csv(lines)
+    raise ValueError(f"Unsupported import format: {file_format}. Must be one of: {list(IMPORT_FORMATS)}")
+
+
+def compute_order_totals(orders: List[OrderImportRow], products: Dict[str, Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Line and order totals for a chunk in one pass, with create_order's formulas"""
+    order_index, quantity, unit_price, discount_percent, discount_amount, tax_rate = [], [], [], [], [], []
+    for position, order in enumerate(orders):
+        for item in order.line_items:
+            product = products[item.product_id]
+            order_index.append(position)
+            quantity.append(item.quantity)
+            unit_price.append(item.unit_price if item.unit_price is not None else product.get("price", 0.0))
+            discount_percent.append(item.discount_percent)
+            discount_amount.append(item.discount_amount)
+            tax_rate.append(product.get("tax_rate") or settings.default_tax_rate)
+
+    order_index = np.array(order_index, dtype=np.int64)
+    unit_price = np.array(unit_price, dtype=np.float64)
+    discount_percent = np.array(discount_percent, dtype=np.float64)
+    tax_rate = np.array(tax_rate, dtype=np.float64)
+
+    line_subtotal = unit_price * np.array(quantity, dtype=np.float64)
+    line_discount = np.where(discount_percent > 0, line_subtotal * (discount_percent / 100),
+                             np.array(discount_amount, dtype=np.float64))
+    line_before_tax = line_subtotal - line_discount
+    line_tax = line_before_tax * tax_rate
+
+    count = len(orders)
+    subtotal = np.bincount(order_index, weights=line_subtotal, minlength=count)
+    tax = np.bincount(order_index, weights=line_tax, minlength=count)
+    order_discount_percent = np.array([order.subtotal_discount_percent for order in orders], dtype=np.float64)
+    order_discount = np.where(order_discount_percent > 0, subtotal * (order_discount_percent / 100),
+                              np.array([order.subtotal_discount_amount for order in orders], dtype=np.float64))
+    shipping = np.array([order.shipping_cost for order in orders], dtype=np.float64)
+
+    return {
+        "unit_price": unit_price,
+        "line_discount": line_discount,
+        "tax_rate": tax_rate,
+        "line_tax": line_tax,
+        "line_total": line_before_tax + line_tax,
+        "subtotal": subtotal,
+        "order_discount": order_discount,
+        "tax": tax,
+        "total": subtotal - order_discount + tax + shipping,
+    }
+
+
+class _ImportRun:
+    """Counters and lookup caches for one import"""
+
+    def __init__(self, user_id: str, token: Optional[str], dry_run: bool):
+        self.user_id = user_id
+        self.token = token
+        self.dry_run = dry_run
+        self.batch_id = f"IMP-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6].upper()}"
+        self.customers: Dict[str, Dict[str, Any]] = {}
+        self.products: Dict[str, Dict[str, Any]] = {}
+        self.unresolved_customers: set = set()
+        self.unresolved_products: set = set()
+        self.rows = 0
+        self.imported = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def fail(self, row_number: int, error: str) -> None:
+        self.failed += 1
+        if self.failed <= settings.order_import_max_errors:
+            self.errors.append({"event": "error", "row": row_number, "error": error})
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "batch_id": self.batch_id,
+            "dry_run": self.dry_run,
+            "rows": self.rows,
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "failed": self.failed,
+        }
+
+
+class OrderImportService:
+    async def import_orders(self, rows: Iterable[ParsedRow], user_id: str, token: Optional[str],
+                            dry_run: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Import parsed rows chunk by chunk.
+
+        Yields an "error" event per failed row (up to ORDER_IMPORT_MAX_ERRORS),
+        a "progress" event after each chunk and a final "done" summary. With
+        dry_run nothing is written and no order numbers are reserved.
+        """
+        run = _ImportRun(user_id, token, dry_run)
+        chunk: List[ParsedRow] = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= settings.order_import_chunk_size:
+                async for event in self._import_chunk(run, chunk):
+                    yield event
+                chunk = []
+        if chunk:
+            async for event in self._import_chunk(run, chunk):
+                yield event
+
+        logger.info(f"Order import {run.batch_id}: {run.summary()}")
+        yield {"event": "done", **run.summary()}
+
+    async def _import_chunk(self, run: _ImportRun, chunk: List[ParsedRow]) -> AsyncIterator[Dict[str, Any]]:
+        run.rows += len(chunk)
+        db = get_database()
+
+        valid: List[Tuple[int, OrderImportRow]] = []
+        for row_number, data in chunk:
+            if isinstance(data, Exception):
+                run.fail(row_number, str(data))
+                continue
+            try:
+                valid.append((row_number, OrderImportRow(**data)))
+            except Exception as e:
+                run.fail(row_number, f"Invalid order: {e}")
+
+        # Rows whose import_ref is already in the database were loaded by an earlier run
+        refs = [order.import_ref for _, order in valid if order.import_ref]
+        if refs:
+            existing = set()
+            async for order in db.sales_orders.find({"import_ref": {"$in": refs}}, {"import_ref": 1}):
+                existing.add(order["import_ref"])
+            if existing:
+                run.skipped += sum(1 for _, order in valid if order.import_ref in existing)
+                valid = [(row_number, order) for row_number, order in valid if order.import_ref not in existing]
+
+        await self._resolve_customers(run, db, {order.customer_id for _, order in valid})
+        await self._resolve_products(run, {item.product_id for _, order in valid for item in order.line_items})
+        rep_names = await sales_rep_directory.resolve([order.sales_rep_id for _, order in valid], run.token)
+
+        ready: List[Tuple[int, OrderImportRow, Dict[str, Any]]] = []
+        for row_number, order in valid:
+            customer = run.customers.get(order.customer_id)
+            if customer is None:
+                run.fail(row_number, f"Customer not found with identifier: {order.customer_id}")
+                continue
+            missing = [item.product_id for item in order.line_items if item.product_id not in run.products]
+            if missing:
+                run.fail(row_number, f"Product not found with identifier: {missing[0]}")
+                continue
+            ready.append((row_number, order, customer))
+
+        if ready:
+            documents, row_numbers = self._build_documents(run, ready, rep_names)
+            if documents and not run.dry_run:
+                numbers = await sales_order_service.allocate_order_numbers(len(documents))
+                for document, order_number in zip(documents, numbers):
+                    document["order_number"] = order_number
+                await self._insert(run, db, documents, row_numbers)
+            elif documents:
+                run.imported += len(documents)
+
+        for event in run.errors:
+            yield event
+        run.errors.clear()
+        yield {"event": "progress", **run.summary()}
+
+    async def _resolve_customers(self, run: _ImportRun, db, identifiers: set) -> None:
+        """Resolve ids, emails and customer codes with one query, in create_order's precedence"""
+        wanted = [identifier for identifier in identifiers
+                  if identifier not in run.customers and identifier not in run.unresolved_customers]
+        if not wanted:
+            return
+
+        object_ids = [ObjectId(identifier) for identifier in wanted if ObjectId.is_valid(identifier)]
+        emails = [identifier for identifier in wanted if "@" in identifier]
+        clauses: List[Dict[str, Any]] = [{"customer_code": {"$in": wanted}}]
+        if object_ids:
+            clauses.append({"_id": {"$in": object_ids}})
+        if emails:
+            clauses.append({"email": {"$in": emails}})
+
+        by_id, by_email, by_code = {}, {}, {}
+        async for customer in db.customers.find({"$or": clauses}, CUSTOMER_PROJECTION):
+            by_id[str(customer["_id"])] = customer
+            if customer.get("email"):
+                by_email[customer["email"]] = customer
+            if customer.get("customer_code"):
+                by_code[customer["customer_code"]] = customer
+
+        for identifier in wanted:
+            customer = by_id.get(identifier) or by_email.get(identifier) or by_code.get(identifier)
+            if customer is None:
+                run.unresolved_customers.add(identifier)
+            else:
+                run.customers[identifier] = customer
+
+    async def _resolve_products(self, run: _ImportRun, identifiers: set) -> None:
+        wanted = [identifier for identifier in identifiers
+                  if identifier not in run.products and identifier not in run.unresolved_products]
+        if not wanted:
+            return
+        found = await inventory_service.get_products_by_identifiers(
+            wanted, run.token, concurrency=settings.order_import_lookup_concurrency
+        )
+        run.products.update(found)
+        run.unresolved_products.update(identifier for identifier in wanted if identifier not in found)
+
+    def _build_documents(self, run: _ImportRun, ready: List[Tuple[int, OrderImportRow, Dict[str, Any]]],
+                         rep_names: Dict[str, str]) -> Tuple[List[Dict[str, Any]], List[int]]:
+        totals = compute_order_totals([order for _, order, _ in ready], run.products)
+        columns = {name: values.tolist() for name, values in totals.items()}
+
+        documents, row_numbers = [], []
+        line = 0
+        for position, (row_number, order, customer) in enumerate(ready):
+            first_line = line
+            line += len(order.line_items)
+            try:
+                line_items = []
+                for offset, item in enumerate(order.line_items):
+                    product = run.products[item.product_id]
+                    index = first_line + offset
+                    line_items.append(OrderLineItem(
+                        product_id=item.product_id,
+                        product_name=product.get("name", "Unknown Product"),
+                        product_sku=product.get("sku", ""),
+                        quantity=item.quantity,
+                        unit_price=columns["unit_price"][index],
+                        discount_percent=item.discount_percent,
+                        discount_amount=columns["line_discount"][index],
+                        tax_rate=columns["tax_rate"][index],
+                        tax_amount=columns["line_tax"][index],
+                        line_total=columns["line_total"][index],
+                        notes=item.notes
+                    ))
+
+                shipping_address = order.shipping_address or customer.get("shipping_address") \
+                    or customer.get("billing_address") or {}
+                total = columns["total"][position]
+                order_doc = SalesOrderInDB(
+                    order_number="",  # assigned from the reserved block at insert time
+                    customer_id=str(customer["_id"]),
+                    customer_name=f"{customer.get('first_name', '')} {customer.get('last_name', '')}".strip(),
+                    customer_email=customer.get("email", ""),
+                    order_date=to_bson_date(order.order_date or date.today()),
+                    expected_delivery_date=to_bson_date(order.expected_delivery_date),
+                    shipping_method=order.shipping_method,
+                    shipping_address={key: str(value) for key, value in shipping_address.items() if value is not None},
+                    priority=order.priority,
+                    sales_rep_id=order.sales_rep_id,
+                    sales_rep_name=rep_names.get(order.sales_rep_id) if order.sales_rep_id else None,
+                    line_items=line_items,
+                    subtotal=columns["subtotal"][position],
+                    subtotal_discount_percent=order.subtotal_discount_percent,
+                    subtotal_discount_amount=columns["order_discount"][position],
+                    tax_amount=columns["tax"][position],
+                    shipping_cost=order.shipping_cost,
+                    total_amount=total,
+                    payment_status=order.payment_status,
+                    payment_method=order.payment_method,
+                    paid_amount=order.paid_amount,
+                    balance_due=total - order.paid_amount,
+                    notes=order.notes,
+                    internal_notes=order.internal_notes,
+                    status=order.status,
+                    created_by=run.user_id
+                )
+            except Exception as e:
+                run.fail(row_number, f"Invalid order: {e}")
+                continue
+
+            document = order_doc.dict(by_alias=True, exclude={"id"})
+            normalize_dates(document, "sales_orders")
+            set_order_periods(document)
+            document["deleted"] = False
+            document["import_batch"] = run.batch_id
+            if order.import_ref:
+                document["import_ref"] = order.import_ref
+            documents.append(document)
+            row_numbers.append(row_number)
+        return documents, row_numbers
+
+    async def _insert(self, run: _ImportRun, db, documents: List[Dict[str, Any]], row_numbers: List[int]) -> None:
+        try:
+            result = await db.sales_orders.insert_many(documents, ordered=False)
+            run.imported += len(result.inserted_ids)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            for error in write_errors:
+                message = error.get("errmsg", "Write failed")
+                if error.get("code") == 11000 and "import_ref" in message:
+                    # Same ref twice in one file, or a concurrent import of it
+                    run.skipped += 1
+                else:
+                    run.fail(row_numbers[error["index"]], message)
+            run.imported += len(documents) - len(write_errors)
+
+
+# Global instance
+order_import_service = OrderImportService()
@@ -0,0 +1,165 @@
+from app.database import get_analytics_database, date_range
+from app.config import settings
+from app.models.payment import PaymentStatus
+from collections import OrderedDict, defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import date, datetime, timedelta
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# (status, payment_method) -> (count, amount) for one day
+DayCells = Dict[Tuple[str, str], Tuple[int, float]]
+
+
+def summary_pipeline(start: date, end: date) -> List[Dict[str, Any]]:
+    """Per-day payment counts and amounts by status and method.
+
+    Reads only payment_date, status, payment_method and amount, so it is
+    answered from the payments `date_status_method` index.
+    """
+    return [
+        {"$match": {"payment_date": date_range(start, end)}},
+        {"$group": {
+            "_id": {
+                "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$payment_date"}},
+                "status": "$status",
+                "method": "$payment_method",
+            },
+            "count": {"$sum": 1},
+            "amount": {"$sum": "$amount"},
+        }},
+    ]
+
+
+def _totals(cells: List[DayCells]) -> Dict[str, Any]:
+    by_method: Dict[str, Dict[str, Any]] = defaultdict(
+        lambda: {"count": 0, "amount": 0.0, "completed_count": 0, "completed_amount": 0.0}
+    )
+    by_status: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"count": 0, "amount": 0.0})
+    for day in cells:
+        for (status, method), (count, amount) in day.items():
+            by_status[status]["count"] += count
+            by_status[status]["amount"] += amount
+            by_method[method]["count"] += count
+            by_method[method]["amount"] += amount
+            if status == PaymentStatus.COMPLETED.value:
+                by_method[method]["completed_count"] += count
+                by_method[method]["completed_amount"] += amount
+
+    completed = by_status.get(PaymentStatus.COMPLETED.value, {"count": 0, "amount": 0.0})
+    return {
+        "total_payments": sum(row["count"] for row in by_status.values()),
+        "total_amount": round(sum(row["amount"] for row in by_status.values()), 2),
+        "completed_payments": completed["count"],
+        "completed_amount": round(completed["amount"], 2),
+        "by_method": {method: {**row, "amount": round(row["amount"], 2),
+                               "completed_amount": round(row["completed_amount"], 2)}
+                      for method, row in sorted(by_method.items())},
+        "by_status": {status: {**row, "amount": round(row["amount"], 2)}
+                      for status, row in sorted(by_status.items())},
+    }
+
+
+class PaymentReportsService:
+    """Payment totals aggregated in MongoDB, one row per (day, status, method).
+
+    Days before today (UTC) are closed: their rows are cached in process and
+    only the uncached span of a requested range is aggregated. Cached days
+    expire after a TTL so backdated entries still show up, and
+    invalidate() drops a day as soon as one of its payments changes here.
+    """
+
+    def __init__(self):
+        # day -> (cells, fetched_at)
+        self._closed_days: "OrderedDict[date, Tuple[DayCells, float]]" = OrderedDict()
+
+    def _cached(self, day: date, now: float) -> Optional[DayCells]:
+        entry = self._closed_days.get(day)
+        if entry is None or now - entry[1] >= settings.payment_summary_cache_ttl_seconds:
+            return None
+        self._closed_days.move_to_end(day)
+        return entry[0]
+
+    def _store(self, day: date, cells: DayCells, now: float) -> None:
+        self._closed_days[day] = (cells, now)
+        self._closed_days.move_to_end(day)
+        while len(self._closed_days) > settings.payment_summary_cache_max_days:
+            self._closed_days.popitem(last=False)
+
+    def invalidate(self, day: Optional[date] = None) -> None:
+        """Drop one cached day, or all of them"""
+        if day is None:
+            self._closed_days.clear()
+        else:
+            self._closed_days.pop(day, None)
+
+    async def _day_cells(self, start: date, end: date) -> Dict[date, DayCells]:
+        if end < start:
+            raise ValueError("end_date must not be before start_date")
+        if (end - start).days + 1 > settings.payment_summary_max_range_days:
+            raise ValueError(f"Date range is limited to {settings.payment_summary_max_range_days} days")
+
+        now = time.monotonic()
+        today = datetime.utcnow().date()
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        result: Dict[date, DayCells] = {}
+        missing = []
+        for day in days:
+            cells = self._cached(day, now) if day < today else None
+            if cells is None:
+                missing.append(day)
+            else:
+                result[day] = cells
+
+        if missing:
+            # One aggregation over the span of uncached days
+            fetched: Dict[date, DayCells] = {day: {} for day in missing}
+            db = get_analytics_database()
+            async for row in db.payments.aggregate(summary_pipeline(missing[0], missing[-1])):
+                day = date.fromisoformat(row["_id"]["day"])
+                if day in fetched:
+                    key = (row["_id"].get("status") or "unknown", row["_id"].get("method") or "unknown")
+                    fetched[day][key] = (row["count"], float(row["amount"] or 0))
+            for day, cells in fetched.items():
+                result[day] = cells
+                if day < today:
+                    self._store(day, cells, now)
+
+        return result
+
+    async def get_daily_summary(self, start: date, end: Optional[date] = None) -> Dict[str, Any]:
+        """Totals for one day, or a range with per-day rows"""
+        end = end or start
+        cells = await self._day_cells(start, end)
+        if start == end:
+            return {"date": start, **_totals([cells[start]])}
+        return {
+            "start_date": start,
+            "end_date": end,
+            **_totals(list(cells.values())),
+            "days": [{"date": day, **_totals([cells[day]])} for day in sorted(cells)],
+        }
+
+    async def get_methods_summary(self, start: date, end: date) -> Dict[str, Any]:
+        """Payment count, amount and share of total per method over a range"""
+        totals = _totals(list((await self._day_cells(start, end)).values()))
+        total_amount = totals["total_amount"]
+        methods = [
+            {"payment_method": method, **row,
+             "share": round(row["amount"] / total_amount, 4) if total_amount else 0.0}
+            for method, row in totals["by_method"].items()
+        ]
+        methods.sort(key=lambda row: row["amount"], reverse=True)
+        return {
+            "start_date": start,
+            "end_date": end,
+            "total_payments": totals["total_payments"],
+            "total_amount": total_amount,
+            "methods": methods,
+        }
+
+
+# Global instance
+payment_reports_service = PaymentReportsService()
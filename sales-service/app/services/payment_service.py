@@ -7,24 +7,31 @@ import asyncio
 from bson import ObjectId
 
 from app.database.connection import get_database
+from app.database.dates import normalize_dates, date_range
 from app.models.payment import (
     PaymentCreate, PaymentUpdate, PaymentResponse, PaymentInDB,
     RefundCreate, RefundResponse, PaymentStatus, PaymentMethod,
     TransactionType,
-    CardPaymentDetails, CashPaymentDetails, CashPaymentCreate
+    CashPaymentDetails, CashPaymentCreate
 )
 from app.models.sales_order import SalesOrderCreate, OrderLineItemCreate
 from app.services.sales_order_service import SalesOrderService
 from app.services.customer_service import CustomerService
+from app.services.card_gateway import card_gateway
+from app.services.payment_reports_service import payment_reports_service
 
 logger = logging.getLogger(__name__)
 
+# Statuses a completed/failed update must never overwrite
+TERMINAL_PAYMENT_STATUSES = [PaymentStatus.REFUNDED, PaymentStatus.CANCELLED]
+
 
 class PaymentService:
     def __init__(self):
         self.db = None
         self.payments_collection = None
         self.refunds_collection = None
+        self._transactions: Optional[bool] = None
         self.sales_order_service = SalesOrderService()
         self.customer_service = CustomerService()
 
@@ -49,12 +56,107 @@ class PaymentService:
 
     # POS transaction numbering removed
 
+    async def _supports_transactions(self) -> bool:
+        """Multi-document transactions need a replica set or mongos; checked once per process"""
+        if self._transactions is None:
+            try:
+                hello = await self.db.client.admin.command("hello")
+                self._transactions = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+            except Exception as e:
+                logger.warning(f"Could not determine transaction support: {e}")
+                self._transactions = False
+        return self._transactions
+
+    async def _settle(self, payment_doc: Dict[str, Any], order_id: str, order_update: List[Dict[str, Any]]) -> Any:
+        """Insert a payment and apply its order update as one unit.
+
+        Runs in a transaction where the deployment supports it; on a
+        standalone server the two writes are issued back to back, payment
+        first, so an order is never marked paid without its payment row.
+        If the order no longer exists the payment is not kept and
+        ValueError is raised.
+        """
+        order_filter = {"_id": ObjectId(order_id), "deleted": {"$ne": True}}
+        if await self._supports_transactions():
+            async with await self.db.client.start_session() as session:
+                async with session.start_transaction():
+                    result = await self.payments_collection.insert_one(payment_doc, session=session)
+                    update = await self.db.sales_orders.update_one(order_filter, order_update, session=session)
+                    if update.matched_count == 0:
+                        # Raising inside the block aborts the transaction, payment included
+                        raise ValueError(f"Order {order_id} not found")
+            return result.inserted_id
+
+        result = await self.payments_collection.insert_one(payment_doc)
+        update = await self.db.sales_orders.update_one(order_filter, order_update)
+        if update.matched_count == 0:
+            # Order deleted since it was read: take the payment back out
+            await self.payments_collection.delete_one({"_id": result.inserted_id})
+            raise ValueError(f"Order {order_id} not found")
+        return result.inserted_id
+
+    async def _find_customer_contact(self, customer_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Name and email fields of a customer; best-effort, None when missing or unreadable"""
+        if not customer_id or not ObjectId.is_valid(customer_id):
+            return None
+        try:
+            return await self.db.customers.find_one(
+                {"_id": ObjectId(customer_id)},
+                {"first_name": 1, "last_name": 1, "email": 1}
+            )
+        except Exception as e:
+            logger.warning(f"Could not fetch customer details: {e}")
+            return None
+
+    async def _fulfill_order_stock(self, order: Dict[str, Any], user_id: str, token: str) -> None:
+        """Reduce inventory for every line of a paid order, concurrently"""
+        from app.services.external_services import inventory_service
+
+        line_items = order.get("line_items") or []
+        order_id = str(order["_id"])
+        logger.info(f"🔄 Fulfilling stock for order {order_id} with {len(line_items)} items")
+        results = await asyncio.gather(*(
+            inventory_service.fulfill_stock(item["product_id"], item["quantity"], order_id, user_id, token)
+            for item in line_items
+        ), return_exceptions=True)
+
+        fulfilled_count = 0
+        for item, fulfilled in zip(line_items, results):
+            if isinstance(fulfilled, Exception):
+                logger.error(f"Failed to fulfill stock for item {item['product_id']}: {fulfilled}")
+            elif fulfilled:
+                fulfilled_count += 1
+            else:
+                logger.warning(f"⚠️ Failed to fulfill stock for product {item['product_id']}")
+        logger.info(f"✅ Stock fulfillment complete: {fulfilled_count}/{len(line_items)} items fulfilled")
+
     async def process_simple_cash_payment(self, payment_data: CashPaymentCreate, user_id: str, token: str = None) -> PaymentResponse:
-        """Process a simplified cash payment and update order status"""
+        """Process a simplified cash payment and update order status
+
+        The order and customer are read once, concurrently; the payment row
+        is built complete and written together with the order's payment
+        fields and draft -> confirmed transition (see _settle).
+        """
         try:
             logger.info(f"🔄 Starting simple cash payment processing for order {payment_data.order_id}")
             self._get_db()
             
+            order, customer = await asyncio.gather(
+                self.db.sales_orders.find_one(
+                    {"_id": ObjectId(payment_data.order_id), "deleted": {"$ne": True}},
+                    {"status": 1, "line_items.product_id": 1, "line_items.quantity": 1}
+                ),
+                self._find_customer_contact(payment_data.customer_id)
+            )
+            if not order:
+                raise ValueError(f"Order {payment_data.order_id} not found")
+            
+            customer_name = None
+            customer_email = None
+            if customer:
+                customer_name = f"{customer.get('first_name', '')} {customer.get('last_name', '')}".strip()
+                customer_email = customer.get("email")
+            
             # Calculate change
             change_given = payment_data.amount_tendered - payment_data.amount
             
@@ -69,123 +171,57 @@ class PaymentService:
             
             # Create payment record
             payment_number = self._generate_payment_number()
+            now = datetime.utcnow()
             
             payment_db = PaymentInDB(
                 payment_number=payment_number,
                 order_id=payment_data.order_id,
                 customer_id=payment_data.customer_id,
+                customer_name=customer_name,
+                customer_email=customer_email,
                 payment_method=PaymentMethod.CASH,
                 amount=payment_data.amount,
                 currency=payment_data.currency,
                 status=PaymentStatus.COMPLETED,  # Cash payments are immediately completed
                 transaction_type=TransactionType.PAYMENT,
                 cash_details=cash_details,
-                payment_date=datetime.utcnow(),
-                processed_at=datetime.utcnow(),
+                payment_date=now,
+                processed_at=now,
                 notes=payment_data.notes,
                 created_by=user_id
             )
             
-            # Insert payment
-            result = await self.payments_collection.insert_one(payment_db.dict(by_alias=True, exclude={"id"}))
-            payment_db.id = str(result.inserted_id)
-            
-            # Get additional customer info if customer_id provided
-            customer_name = None
-            customer_email = None
-            if payment_data.customer_id:
-                try:
-                    customer = await self.customer_service.get_customer_by_id(payment_data.customer_id)
-                    if customer:
-                        customer_name = f"{customer.first_name} {customer.last_name}".strip()
-                        customer_email = customer.email
-                except Exception as e:
-                    logger.warning(f"Could not fetch customer details: {e}")
+            # Order payment fields, balance and draft -> confirmed in one pipeline update
+            order_update = [{
+                "$set": {
+                    "payment_status": "paid",
+                    "paid_amount": payment_data.amount,
+                    "balance_due": {"$subtract": ["$total_amount", payment_data.amount]},
+                    "status": {"$cond": [{"$eq": ["$status", "draft"]}, "confirmed", "$status"]},
+                    "updated_at": now,
+                    "updated_by": {"$literal": user_id}
+                }
+            }]
             
-            # Update payment with customer info
-            if customer_name or customer_email:
-                await self.payments_collection.update_one(
-                    {"_id": ObjectId(payment_db.id)},
-                    {"$set": {
-                        "customer_name": customer_name,
-                        "customer_email": customer_email
-                    }}
-                )
+            inserted_id = await self._settle(
+                normalize_dates(payment_db.dict(by_alias=True, exclude={"id"}), "payments"),
+                payment_data.order_id,
+                order_update
+            )
+            payment_db.id = str(inserted_id)
+            logger.info(f"✅ Order {payment_data.order_id} marked paid with amount {payment_data.amount}")
             
-            # Update order status and payment status
-            try:
-                logger.info(f"Attempting to update order {payment_data.order_id} payment status to 'paid' with amount {payment_data.amount}")
-                success = await self.sales_order_service.update_payment_status(
-                    payment_data.order_id, 
-                    "paid", 
-                    payment_data.amount
-                )
-                if success:
-                    logger.info(f"✅ Order {payment_data.order_id} payment status updated to 'paid' with amount {payment_data.amount}")
-                    
-                    # Update order status from draft to confirmed after successful payment
-                    try:
-                        order = await self.sales_order_service.get_order_by_id(payment_data.order_id)
-                        if order and order.status == "draft":
-                            await self.sales_order_service.update_order_status(
-                                payment_data.order_id,
-                                "confirmed",
-                                user_id
-                            )
-                            logger.info(f"✅ Order {payment_data.order_id} status updated to 'confirmed'")
-                    except Exception as status_error:
-                        logger.error(f"Failed to update order status: {status_error}")
-                    
-                    # Now fulfill the stock for the order (reduce inventory)
-                    if token:  # Only if we have a token
-                        try:
-                            from app.services.external_services import inventory_service
-                            
-                            # Get the order details to fulfill stock
-                            order = await self.sales_order_service.get_order_by_id(payment_data.order_id)
-                            if order and order.line_items:
-                                logger.info(f"🔄 Fulfilling stock for order {payment_data.order_id} with {len(order.line_items)} items")
-                                fulfilled_count = 0
-                                for item in order.line_items:
-                                    try:
-                                        logger.info(f"Fulfilling stock for product {item.product_id}, quantity {item.quantity}")
-                                        fulfilled = await inventory_service.fulfill_stock(
-                                            item.product_id,
-                                            item.quantity,
-                                            payment_data.order_id,
-                                            user_id,
-                                            token
-                                        )
-                                        if fulfilled:
-                                            fulfilled_count += 1
-                                            logger.info(f"✅ Stock fulfilled for product {item.product_id}")
-                                        else:
-                                            logger.warning(f"⚠️ Failed to fulfill stock for product {item.product_id}")
-                                    except Exception as item_error:
-                                        logger.error(f"Failed to fulfill stock for item {item.product_id}: {item_error}")
-                                
-                                logger.info(f"✅ Stock fulfillment complete: {fulfilled_count}/{len(order.line_items)} items fulfilled")
-                        except Exception as fulfill_error:
-                            logger.error(f"Stock fulfillment error: {fulfill_error}")
-                            # Continue anyway - payment is successful
-                    else:
-                        logger.warning("⚠️ No token available for stock fulfillment - skipping inventory update")
-                else:
-                    logger.error(f"❌ Failed to update order {payment_data.order_id} payment status - method returned False")
-            except Exception as e:
-                logger.error(f"❌ Exception occurred while updating order payment status: {e}")
-                import traceback
-                logger.error(f"Full traceback: {traceback.format_exc()}")
-                # Don't fail the payment if order update fails, but log it
+            # Now fulfill the stock for the order (reduce inventory)
+            if token:
+                try:
+                    await self._fulfill_order_stock(order, user_id, token)
+                except Exception as fulfill_error:
+                    logger.error(f"Stock fulfillment error: {fulfill_error}")
+                    # Continue anyway - payment is successful
+            else:
+                logger.warning("⚠️ No token available for stock fulfillment - skipping inventory update")
             
-            # Convert to response model
-            # Exclude customer fields from dict since we're passing them explicitly
-            payment_dict = payment_db.dict(exclude={'customer_name', 'customer_email'})
-            payment_response = PaymentResponse(
-                **payment_dict,
-                customer_name=customer_name,
-                customer_email=customer_email
-            )
+            payment_response = PaymentResponse(**payment_db.dict())
             
             logger.info(f"Simple cash payment processed successfully: {payment_number}")
             return payment_response
@@ -232,7 +268,9 @@ class PaymentService:
             )
             
             # Insert payment
-            result = await self.payments_collection.insert_one(payment_db.dict(by_alias=True, exclude={"id"}))
+            result = await self.payments_collection.insert_one(
+                normalize_dates(payment_db.dict(by_alias=True, exclude={"id"}), "payments")
+            )
             payment_db.id = str(result.inserted_id)
             
             # Get additional customer info if customer_id provided
@@ -283,9 +321,17 @@ class PaymentService:
             # Create payment record
             payment_number = self._generate_payment_number()
             
-            # For demo purposes, we'll simulate card processing
-            # In a real implementation, you would integrate with a payment gateway
-            is_successful = await self._simulate_card_processing(payment_data.card_details, payment_data.amount)
+            authorization = await card_gateway.authorize(
+                payment_data.card_details, payment_data.amount, payment_data.currency
+            )
+            is_successful = authorization.approved
+            payment_data.card_details.transaction_id = authorization.transaction_id
+            payment_data.card_details.authorization_code = authorization.authorization_code
+            payment_data.card_details.gateway_response = {
+                "gateway": authorization.gateway,
+                "latency_ms": authorization.latency_ms,
+                "decline_code": authorization.decline_code,
+            }
             
             status = PaymentStatus.COMPLETED if is_successful else PaymentStatus.FAILED
             
@@ -309,10 +355,15 @@ class PaymentService:
             )
             
             if not is_successful:
-                raise ValueError("Card payment failed. Please try again or use a different payment method.")
+                raise ValueError(
+                    f"Card payment declined ({authorization.decline_code}). "
+                    "Please try again or use a different payment method."
+                )
             
             # Insert payment
-            result = await self.payments_collection.insert_one(payment_db.dict(by_alias=True, exclude={"id"}))
+            result = await self.payments_collection.insert_one(
+                normalize_dates(payment_db.dict(by_alias=True, exclude={"id"}), "payments")
+            )
             payment_db.id = str(result.inserted_id)
             
             # Get additional customer info if customer_id provided
@@ -351,23 +402,6 @@ class PaymentService:
             logger.error(f"Error processing card payment: {e}")
             raise
 
-    async def _simulate_card_processing(self, card_details: CardPaymentDetails, amount: float) -> bool:
-        """Simulate card payment processing (for demo purposes)"""
-        # In a real implementation, this would integrate with Stripe, Square, etc.
-        # For demo, we'll simulate a 95% success rate
-        import random
-        
-        # Add some realistic processing delay
-        await asyncio.sleep(1)
-        
-        # Generate a mock transaction ID
-        if card_details:
-            card_details.transaction_id = f"TXN_{uuid.uuid4().hex[:12].upper()}"
-            card_details.authorization_code = f"AUTH_{random.randint(100000, 999999)}"
-        
-        # 95% success rate for demo
-        return random.random() < 0.95
-
     async def create_payment(self, payment_data: PaymentCreate, user_id: str) -> PaymentResponse:
         """Create a new payment based on payment method"""
         try:
@@ -407,7 +441,9 @@ class PaymentService:
             )
             
             # Insert payment
-            result = await self.payments_collection.insert_one(payment_db.dict(by_alias=True, exclude={"id"}))
+            result = await self.payments_collection.insert_one(
+                normalize_dates(payment_db.dict(by_alias=True, exclude={"id"}), "payments")
+            )
             payment_db.id = str(result.inserted_id)
             
             # Convert to response model
@@ -465,12 +501,7 @@ class PaymentService:
             
             # Date range filter
             if start_date or end_date:
-                date_filter = {}
-                if start_date:
-                    date_filter["$gte"] = datetime.combine(start_date, datetime.min.time())
-                if end_date:
-                    date_filter["$lte"] = datetime.combine(end_date, datetime.max.time())
-                filter_query["payment_date"] = date_filter
+                filter_query["payment_date"] = date_range(start_date, end_date)
             
             # Search filter
             if search:
@@ -493,6 +524,29 @@ class PaymentService:
 
     # POS transaction processing removed
 
+    async def update_payment_status(self, payment_id: str, status: PaymentStatus, user_id: str) -> bool:
+        """Set a payment's status; False when it is missing, already in that status,
+        or refunded/cancelled and the new status is completed or failed"""
+        try:
+            self._get_db()
+            excluded = [status]
+            if status in (PaymentStatus.COMPLETED, PaymentStatus.FAILED):
+                # A late or retried success/failure must not undo a refund or cancellation
+                excluded += TERMINAL_PAYMENT_STATUSES
+            payment = await self.payments_collection.find_one_and_update(
+                {"_id": ObjectId(payment_id), "status": {"$nin": excluded}},
+                {"$set": {"status": status, "updated_at": datetime.utcnow(), "updated_by": user_id}},
+                projection={"payment_date": 1}
+            )
+            if payment is None:
+                return False
+            if isinstance(payment.get("payment_date"), datetime):
+                payment_reports_service.invalidate(payment["payment_date"].date())
+            return True
+        except Exception as e:
+            logger.error(f"Error updating payment status: {e}")
+            raise
+
     async def create_refund(self, refund_data: RefundCreate, user_id: str) -> RefundResponse:
         """Create a refund for a payment"""
         try:
@@ -560,6 +614,9 @@ class PaymentService:
                     {"$set": {"status": PaymentStatus.PARTIALLY_REFUNDED}}
                 )
             
+            if isinstance(payment.payment_date, datetime):
+                payment_reports_service.invalidate(payment.payment_date.date())
+            
             refund_response = RefundResponse(**refund_doc)
             logger.info(f"Refund created successfully: {refund_number}")
             return refund_response
@@ -596,12 +653,7 @@ class PaymentService:
             
             # Date range filter
             if start_date or end_date:
-                date_filter = {}
-                if start_date:
-                    date_filter["$gte"] = datetime.combine(start_date, datetime.min.time())
-                if end_date:
-                    date_filter["$lte"] = datetime.combine(end_date, datetime.max.time())
-                filter_query["payment_date"] = date_filter
+                filter_query["payment_date"] = date_range(start_date, end_date)
             
             # Search filter
             if search:
@@ -1,10 +1,12 @@
-from app.database import get_database
+from app.database import get_database, normalize_dates, date_range
 from app.models import (
     QuoteCreate, QuoteUpdate, QuoteResponse, QuoteInDB, QuoteStatus,
     OrderLineItem, SalesOrderCreate
 )
 from app.services.customer_service import customer_service
-from app.services.external_services import auth_service, inventory_service
+from app.services.sales_rep_directory import sales_rep_directory
+from app.services.external_services import inventory_service
+from pymongo import ReturnDocument
 from pymongo.errors import DuplicateKeyError
 from typing import Optional, List, Dict, Any
 from datetime import datetime, date, timedelta
@@ -30,13 +32,8 @@ class QuoteService:
             if not customer:
                 raise ValueError("Customer not found")
 
-            # Get user info for sales rep
-            user_info = None
-            sales_rep_name = None
-            if quote_data.sales_rep_id:
-                user_info = await auth_service.get_user_by_id(quote_data.sales_rep_id, token)
-                if user_info:
-                    sales_rep_name = f"{user_info.get('first_name', '')} {user_info.get('last_name', '')}".strip()
+            # Resolve sales rep name from the cached directory
+            sales_rep_name = await sales_rep_directory.get_name(quote_data.sales_rep_id, token)
 
             # Process line items
             processed_line_items = []
@@ -123,7 +120,9 @@ class QuoteService:
             )
 
             # Insert quote
-            result = await quotes_collection.insert_one(quote_doc.dict(by_alias=True, exclude={"id"}))
+            result = await quotes_collection.insert_one(
+                normalize_dates(quote_doc.dict(by_alias=True, exclude={"id"}), "quotes")
+            )
             
             # Fetch created quote
             created_quote = await quotes_collection.find_one({"_id": result.inserted_id})
@@ -172,13 +171,9 @@ class QuoteService:
             db = get_database()
             quotes_collection = db.quotes
 
-            # Get existing quote
-            existing_quote = await self.get_quote_by_id(quote_id)
-            if not existing_quote:
-                return None
-
             # Prepare update data
             update_data = {k: v for k, v in quote_update.dict(exclude_unset=True).items() if v is not None}
+            normalize_dates(update_data, "quotes")
             update_data["updated_at"] = datetime.utcnow()
             update_data["updated_by"] = user_id
 
@@ -188,17 +183,14 @@ class QuoteService:
                 # Implementation would go here
                 pass
 
-            # Update quote
-            result = await quotes_collection.update_one(
+            # Update and read back in one round trip
+            updated_quote = await quotes_collection.find_one_and_update(
                 {"_id": ObjectId(quote_id)},
-                {"$set": update_data}
+                {"$set": update_data},
+                return_document=ReturnDocument.AFTER
             )
-
-            if result.modified_count > 0:
-                # Fetch updated quote
-                updated_quote = await quotes_collection.find_one({"_id": ObjectId(quote_id)})
-                if updated_quote:
-                    return QuoteResponse(**updated_quote)
+            if updated_quote:
+                return QuoteResponse(**updated_quote)
             
             return None
 
@@ -212,8 +204,13 @@ class QuoteService:
                         sales_rep_id: Optional[str] = None,
                         start_date: Optional[date] = None,
                         end_date: Optional[date] = None,
-                        search: Optional[str] = None) -> List[QuoteResponse]:
-        """Get list of quotes with pagination and filters"""
+                        search: Optional[str] = None,
+                        token: Optional[str] = None) -> List[QuoteResponse]:
+        """Get list of quotes with pagination and filters
+
+        When a token is given, sales rep names are refreshed from the rep
+        directory in one bulk lookup for the whole page.
+        """
         try:
             db = get_database()
             quotes_collection = db.quotes
@@ -226,12 +223,8 @@ class QuoteService:
                 filter_query["customer_id"] = customer_id
             if sales_rep_id:
                 filter_query["sales_rep_id"] = sales_rep_id
-            if start_date and end_date:
-                filter_query["quote_date"] = {"$gte": start_date, "$lte": end_date}
-            elif start_date:
-                filter_query["quote_date"] = {"$gte": start_date}
-            elif end_date:
-                filter_query["quote_date"] = {"$lte": end_date}
+            if start_date or end_date:
+                filter_query["quote_date"] = date_range(start_date, end_date)
             if search:
                 filter_query["$or"] = [
                     {"quote_number": {"$regex": search, "$options": "i"}},
@@ -243,6 +236,15 @@ class QuoteService:
             cursor = quotes_collection.find(filter_query).skip(skip).limit(limit).sort("quote_date", -1)
             quotes = await cursor.to_list(length=limit)
 
+            if token:
+                rep_names = await sales_rep_directory.resolve(
+                    (quote.get("sales_rep_id") for quote in quotes), token
+                )
+                for quote in quotes:
+                    rep_id = quote.get("sales_rep_id")
+                    if rep_id in rep_names:
+                        quote["sales_rep_name"] = rep_names[rep_id]
+
             return [QuoteResponse(**quote) for quote in quotes]
 
         except Exception as e:
@@ -0,0 +1,133 @@
+from app.database import get_database, date_range
+from app.models import (
+    ReconciliationSource, TargetSearchRequest, TargetSearchItem,
+    TargetSearchMatch, TargetSearchResponse, InvoiceStatus
+)
+from app.models.payment import PaymentStatus
+from app.services.sales_columns import to_cents
+from app.services.target_search import TargetSearch
+from app.config import settings
+from typing import List, Dict, Any
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Payments that actually moved money
+SETTLED_PAYMENT_STATUSES = [PaymentStatus.COMPLETED, PaymentStatus.CAPTURED]
+# Invoices that can still receive money
+OPEN_INVOICE_STATUSES = [
+    InvoiceStatus.SENT, InvoiceStatus.VIEWED, InvoiceStatus.PARTIAL_PAID, InvoiceStatus.OVERDUE
+]
+
+
+class ReconciliationService:
+    """Matches a target amount against combinations of payments or open invoice balances"""
+
+    async def _load_payments(self, request: TargetSearchRequest, limit: int) -> List[Dict[str, Any]]:
+        db = get_database()
+        filter_query = {
+            "status": {"$in": SETTLED_PAYMENT_STATUSES},
+            "payment_date": date_range(request.start_date, request.end_date)
+        }
+        if request.customer_id:
+            filter_query["customer_id"] = request.customer_id
+
+        projection = {
+            "payment_number": 1, "amount": 1, "payment_date": 1,
+            "customer_id": 1, "customer_name": 1, "status": 1
+        }
+        cursor = db.payments.find(filter_query, projection).sort("payment_date", 1).limit(limit)
+        return [
+            {
+                "id": str(doc["_id"]),
+                "number": doc.get("payment_number"),
+                "amount": doc.get("amount", 0),
+                "date": doc.get("payment_date"),
+                "customer_id": doc.get("customer_id"),
+                "customer_name": doc.get("customer_name"),
+                "status": doc.get("status")
+            }
+            async for doc in cursor
+        ]
+
+    async def _load_invoices(self, request: TargetSearchRequest, limit: int) -> List[Dict[str, Any]]:
+        db = get_database()
+        filter_query = {
+            "status": {"$in": OPEN_INVOICE_STATUSES},
+            "balance_due": {"$gt": 0},
+            "invoice_date": date_range(request.start_date, request.end_date)
+        }
+        if request.customer_id:
+            filter_query["customer_id"] = request.customer_id
+
+        projection = {
+            "invoice_number": 1, "balance_due": 1, "invoice_date": 1,
+            "customer_id": 1, "customer_name": 1, "status": 1
+        }
+        cursor = db.invoices.find(filter_query, projection).sort("invoice_date", 1).limit(limit)
+        return [
+            {
+                "id": str(doc["_id"]),
+                "number": doc.get("invoice_number"),
+                # A deposit settles what is still owed, not the original total
+                "amount": doc.get("balance_due", 0),
+                "date": doc.get("invoice_date"),
+                "customer_id": doc.get("customer_id"),
+                "customer_name": doc.get("customer_name"),
+                "status": doc.get("status")
+            }
+            async for doc in cursor
+        ]
+
+    async def find_target_combinations(self, request: TargetSearchRequest) -> TargetSearchResponse:
+        """Find combinations of payments/invoices in the date range that add up to the target"""
+        limit = settings.reconciliation_max_candidates
+        if request.source == ReconciliationSource.INVOICES:
+            candidates = await self._load_invoices(request, limit + 1)
+        else:
+            candidates = await self._load_payments(request, limit + 1)
+
+        truncated = len(candidates) > limit
+        candidates = candidates[:limit]
+
+        amounts = [to_cents(candidate["amount"]) for candidate in candidates]
+        target = to_cents(request.target_amount)
+
+        def run_search():
+            # Built inside the worker so the time budget covers only the search itself
+            search = TargetSearch(amounts, time_budget=request.time_budget_ms / 1000)
+            return search.search(
+                target,
+                min_items=request.min_items,
+                max_items=request.max_items,
+                tolerance=to_cents(request.tolerance),
+                max_results=request.max_results
+            )
+
+        # CPU-bound; keep it off the event loop
+        result = await asyncio.to_thread(run_search)
+
+        matches = []
+        for combination in result.combinations:
+            total = sum(amounts[i] for i in combination)
+            matches.append(TargetSearchMatch(
+                items=[TargetSearchItem(**candidates[i]) for i in combination],
+                item_count=len(combination),
+                total_amount=total / 100,
+                difference=(total - target) / 100
+            ))
+
+        return TargetSearchResponse(
+            source=request.source,
+            target_amount=request.target_amount,
+            candidates=len(candidates),
+            truncated=truncated,
+            complete=result.complete,
+            methods=result.methods,
+            matches=matches
+        )
+
+
+# Global instance
+reconciliation_service = ReconciliationService()
@@ -163,10 +163,11 @@ class ReportsService:
     async def generate_aging_report(self, format: str, report_type: str, as_of_date: date) -> Any:
         """Generate aging report for receivables/payables"""
         try:
-            from app.database import get_database
+            from app.database import get_analytics_database, to_bson_date
             
-            db = get_database()
+            db = get_analytics_database()
             invoices_collection = db.invoices
+            as_of = to_bson_date(as_of_date)
             
             # Calculate aging buckets
             aging_buckets = {
@@ -181,7 +182,7 @@ class ReportsService:
             pipeline = [
                 {
                     "$match": {
-                        "due_date": {"$lte": as_of_date},
+                        "due_date": {"$lte": as_of},
                         "payment_status": {"$ne": "paid"}
                     }
                 },
@@ -194,7 +195,7 @@ class ReportsService:
                         "days_overdue": {
                             "$dateDiff": {
                                 "startDate": "$due_date",
-                                "endDate": as_of_date,
+                                "endDate": as_of,
                                 "unit": "day"
                             }
                         }
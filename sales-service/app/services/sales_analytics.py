@@ -5,6 +5,12 @@ from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
+from sys import intern
+import numpy as np
+
+from app.services.sales_columns import (
+    SalesColumns, PairIndex, to_cents, closest_pair, top_pairs_by_sum, disjoint_pairs_with_sum
+)
 
 class SalesTargetType(Enum):
     DAILY = "daily"
@@ -12,20 +18,27 @@ class SalesTargetType(Enum):
     MONTHLY = "monthly"
     QUARTERLY = "quarterly"
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SalesTransaction:
     id: str
     amount: float
     date: datetime
     customer_id: str
-    product_ids: List[str]
+    product_ids: Tuple[str, ...]
     salesperson_id: str
     status: str = "completed"
 
-@dataclass
+    def __post_init__(self):
+        # Customer/rep/product ids and statuses repeat across a year of rows; keep one copy each
+        object.__setattr__(self, "customer_id", intern(self.customer_id))
+        object.__setattr__(self, "salesperson_id", intern(self.salesperson_id))
+        object.__setattr__(self, "status", intern(self.status))
+        object.__setattr__(self, "product_ids", tuple(intern(p) for p in self.product_ids))
+
+@dataclass(frozen=True, slots=True)
 class SalesTargetResult:
     found: bool
-    transactions: List[SalesTransaction]
+    transactions: Tuple[SalesTransaction, ...]
     total_amount: float
     difference: float
     target_achievement: float
@@ -33,6 +46,38 @@ class SalesTargetResult:
 class SalesAnalyticsService:
     def __init__(self, sales_data: List[SalesTransaction]):
         self.sales_data = sales_data
+        self._columns: Optional[SalesColumns] = None
+
+    @property
+    def columns(self) -> SalesColumns:
+        """Columnar view of sales_data, built on first use"""
+        if self._columns is None:
+            self._columns = SalesColumns(self.sales_data)
+        return self._columns
+
+    @classmethod
+    def from_columns(cls, columns: SalesColumns) -> "SalesAnalyticsService":
+        """Service over prebuilt columns; sales_data is whatever sequence the columns wrap"""
+        service = cls(columns.transactions)
+        service._columns = columns
+        return service
+
+    def refresh(self):
+        """Rebuild the columnar view after sales_data changed"""
+        self._columns = None
+
+    def _pair_result(self, rows: np.ndarray, i: int, j: int, target_amount: float,
+                     difference: float = 0.0) -> SalesTargetResult:
+        total_cents = int(self.columns.amount_cents[rows[i]] + self.columns.amount_cents[rows[j]])
+        total_amount = total_cents / 100
+        target_achievement = (total_amount / target_amount) * 100 if target_amount > 0 else 0
+        return SalesTargetResult(
+            found=True,
+            transactions=(self.sales_data[rows[i]], self.sales_data[rows[j]]),
+            total_amount=total_amount,
+            difference=difference,
+            target_achievement=target_achievement
+        )
 
     def find_transactions_by_target_amount(self, target_amount: float) -> SalesTargetResult:
         """
@@ -40,30 +85,21 @@ class SalesAnalyticsService:
         Time Complexity: O(n)
         Space Complexity: O(n)
         """
+        # Keyed by integer cents: float complements like 0.3 - 0.1 never hash-match
+        columns = self.columns
+        rows = columns.select(columns.completed)
+        target_cents = to_cents(target_amount)
         amount_map = {}
-        
-        for transaction in self.sales_data:
-            if transaction.status != "completed":
-                continue
-                
-            complement = target_amount - transaction.amount
+
+        for position, amount_cents in enumerate(columns.amount_cents[rows].tolist()):
+            complement = target_cents - amount_cents
             if complement in amount_map:
-                complement_transaction = amount_map[complement]
-                total_amount = complement_transaction.amount + transaction.amount
-                target_achievement = (total_amount / target_amount) * 100 if target_amount > 0 else 0
-                
-                return SalesTargetResult(
-                    found=True,
-                    transactions=[complement_transaction, transaction],
-                    total_amount=total_amount,
-                    difference=0.0,
-                    target_achievement=target_achievement
-                )
-            amount_map[transaction.amount] = transaction
+                return self._pair_result(rows, amount_map[complement], position, target_amount)
+            amount_map[amount_cents] = position
 
         return SalesTargetResult(
             found=False,
-            transactions=[],
+            transactions=(),
             total_amount=0.0,
             difference=target_amount,
             target_achievement=0.0
@@ -72,72 +108,38 @@ class SalesAnalyticsService:
     def find_daily_sales_combinations(self, target_amount: float, date: datetime) -> List[SalesTargetResult]:
         """
         Find sales combinations for a specific date using Two Sum concept
+        Each transaction is used in at most one combination; earlier transactions pick first.
         """
-        daily_sales = [s for s in self.sales_data if s.date.date() == date.date() and s.status == "completed"]
-        results = []
-        used_transactions = set()
-        
-        for i, transaction1 in enumerate(daily_sales):
-            if transaction1.id in used_transactions:
-                continue
-                
-            for j, transaction2 in enumerate(daily_sales[i+1:], i+1):
-                if transaction2.id in used_transactions:
-                    continue
-                    
-                total_amount = transaction1.amount + transaction2.amount
-                if abs(total_amount - target_amount) < 0.01:
-                    target_achievement = (total_amount / target_amount) * 100 if target_amount > 0 else 0
-                    results.append(SalesTargetResult(
-                        found=True,
-                        transactions=[transaction1, transaction2],
-                        total_amount=total_amount,
-                        difference=0.0,
-                        target_achievement=target_achievement
-                    ))
-                    used_transactions.add(transaction1.id)
-                    used_transactions.add(transaction2.id)
-        
-        return results
+        columns = self.columns
+        day = np.datetime64(date.date() if isinstance(date, datetime) else date, "D")
+        rows = columns.select((columns.day == day) & columns.completed)
+
+        pairs = disjoint_pairs_with_sum(columns.amount_cents[rows], to_cents(target_amount))
+        return [self._pair_result(rows, i, j, target_amount) for i, j in pairs]
 
     def find_salesperson_performance_pairs(self, target_amount: float) -> Dict[str, List[SalesTargetResult]]:
         """
         Find salesperson pairs that achieved target amount
         """
-        salesperson_sales = {}
-        
-        # Group sales by salesperson
-        for transaction in self.sales_data:
-            if transaction.status != "completed":
-                continue
-                
-            if transaction.salesperson_id not in salesperson_sales:
-                salesperson_sales[transaction.salesperson_id] = []
-            salesperson_sales[transaction.salesperson_id].append(transaction)
-        
+        columns = self.columns
+        target_cents = to_cents(target_amount)
+        completed = columns.select(columns.completed)
+        codes = columns.salesperson_code[completed]
+
+        # Group completed rows by salesperson, keeping first-appearance order of salespeople
+        order = np.argsort(codes, kind="stable")
+        unique_codes, starts, counts = np.unique(codes[order], return_index=True, return_counts=True)
+        first_seen = np.argsort(order[starts], kind="stable")
+
         results = {}
-        
-        # Find combinations within each salesperson's sales
-        for salesperson_id, transactions in salesperson_sales.items():
-            if len(transactions) < 2:
+        for group in first_seen:
+            if counts[group] < 2:
                 continue
-                
-            combinations = []
-            for i in range(len(transactions)):
-                for j in range(i + 1, len(transactions)):
-                    total_amount = transactions[i].amount + transactions[j].amount
-                    if abs(total_amount - target_amount) < 0.01:
-                        target_achievement = (total_amount / target_amount) * 100 if target_amount > 0 else 0
-                        combinations.append(SalesTargetResult(
-                            found=True,
-                            transactions=[transactions[i], transactions[j]],
-                            total_amount=total_amount,
-                            difference=0.0,
-                            target_achievement=target_achievement
-                        ))
-            
-            if combinations:
-                results[salesperson_id] = combinations
+            rows = completed[order[starts[group]:starts[group] + counts[group]]]
+            pairs = PairIndex(columns.amount_cents[rows]).pairs_with_sum(target_cents)
+            if len(pairs):
+                salesperson_id = columns.salesperson_ids[unique_codes[group]]
+                results[salesperson_id] = [self._pair_result(rows, i, j, target_amount) for i, j in pairs]
         
         return results
 
@@ -146,29 +148,24 @@ class SalesAnalyticsService:
         Analyze how sales combinations contribute to monthly targets
         """
         # Filter sales for the specific month
-        monthly_sales = [
-            t for t in self.sales_data 
-            if t.date.year == year and t.date.month == month and t.status == "completed"
-        ]
+        columns = self.columns
+        month_start = np.datetime64(f"{year:04d}-{month:02d}", "M")
+        rows = columns.select((columns.month == month_start) & columns.completed)
+        amounts = columns.amount_cents[rows]
         
-        total_sales = sum(t.amount for t in monthly_sales)
+        total_sales = int(amounts.sum()) / 100
         target_achievement = (total_sales / monthly_target) * 100 if monthly_target > 0 else 0
         
-        # Find significant combinations that contributed to the target
+        # Top 5 combinations of at least 10% of target, largest first
+        top_pairs = top_pairs_by_sum(amounts, 5, minimum=int(np.ceil(monthly_target * 10)))
         significant_combinations = []
-        for i in range(len(monthly_sales)):
-            for j in range(i + 1, len(monthly_sales)):
-                combination_amount = monthly_sales[i].amount + monthly_sales[j].amount
-                if combination_amount >= monthly_target * 0.1:  # At least 10% of target
-                    target_achievement_contribution = (combination_amount / monthly_target) * 100
-                    significant_combinations.append({
-                        'transactions': [monthly_sales[i], monthly_sales[j]],
-                        'amount': combination_amount,
-                        'contribution_percentage': target_achievement_contribution
-                    })
-        
-        # Sort by contribution percentage
-        significant_combinations.sort(key=lambda x: x['contribution_percentage'], reverse=True)
+        for i, j in top_pairs:
+            combination_amount = int(amounts[i] + amounts[j]) / 100
+            significant_combinations.append({
+                'transactions': [self.sales_data[rows[i]], self.sales_data[rows[j]]],
+                'amount': combination_amount,
+                'contribution_percentage': (combination_amount / monthly_target) * 100 if monthly_target > 0 else 0
+            })
         
         return {
             'month': f"{year}-{month:02d}",
@@ -176,44 +173,30 @@ class SalesAnalyticsService:
             'target': monthly_target,
             'target_achievement': target_achievement,
             'target_met': total_sales >= monthly_target,
-            'significant_combinations': significant_combinations[:5],  # Top 5 combinations
-            'total_transactions': len(monthly_sales)
+            'significant_combinations': significant_combinations,
+            'total_transactions': len(rows)
         }
 
     def find_closest_target_achievement(self, target_amount: float) -> SalesTargetResult:
         """
         Find the closest sales combination to target amount
+        Time Complexity: O(n log n) - sort plus a vectorised searchsorted pass
         """
-        best_match = SalesTargetResult(
-            found=False,
-            transactions=[],
-            total_amount=0.0,
-            difference=float('inf'),
-            target_achievement=0.0
-        )
-
-        for i in range(len(self.sales_data)):
-            if self.sales_data[i].status != "completed":
-                continue
-                
-            for j in range(i + 1, len(self.sales_data)):
-                if self.sales_data[j].status != "completed":
-                    continue
-                    
-                total_amount = self.sales_data[i].amount + self.sales_data[j].amount
-                difference = abs(target_amount - total_amount)
-                
-                if difference < best_match.difference:
-                    target_achievement = (total_amount / target_amount) * 100 if target_amount > 0 else 0
-                    best_match = SalesTargetResult(
-                        found=True,
-                        transactions=[self.sales_data[i], self.sales_data[j]],
-                        total_amount=total_amount,
-                        difference=difference,
-                        target_achievement=target_achievement
-                    )
+        columns = self.columns
+        rows = columns.select(columns.completed)
+        match = closest_pair(columns.amount_cents[rows], to_cents(target_amount))
+        if match is None:
+            return SalesTargetResult(
+                found=False,
+                transactions=(),
+                total_amount=0.0,
+                difference=float('inf'),
+                target_achievement=0.0
+            )
 
-        return best_match
+        i, j, total_cents = match
+        difference = abs(to_cents(target_amount) - total_cents) / 100
+        return self._pair_result(rows, i, j, target_amount, difference)
 
     def get_sales_insights(self, target_amount: float) -> Dict[str, any]:
         """
@@ -229,8 +212,10 @@ class SalesAnalyticsService:
         salesperson_performance = self.find_salesperson_performance_pairs(target_amount)
         
         # Calculate overall statistics
-        total_sales = sum(t.amount for t in self.sales_data if t.status == "completed")
-        average_transaction = total_sales / len([t for t in self.sales_data if t.status == "completed"]) if self.sales_data else 0
+        columns = self.columns
+        completed_count = int(columns.completed.sum())
+        total_sales = int(columns.amount_cents[columns.completed].sum()) / 100
+        average_transaction = total_sales / completed_count if completed_count else 0
         
         return {
             'target_amount': target_amount,
@@ -239,7 +224,7 @@ class SalesAnalyticsService:
             'salesperson_performance': salesperson_performance,
             'total_sales': total_sales,
             'average_transaction': average_transaction,
-            'total_transactions': len([t for t in self.sales_data if t.status == "completed"]),
+            'total_transactions': completed_count,
             'target_achievement_rate': (total_sales / target_amount) * 100 if target_amount > 0 else 0
         }
 
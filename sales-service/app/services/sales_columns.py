@@ -0,0 +1,207 @@
+# Columnar sales store - NumPy backend for SalesAnalyticsService
+# Amounts are int64 cents, dates datetime64, rep/customer ids category codes
+
+from typing import List, Dict, Tuple, Optional, Sequence
+from datetime import date
+import numpy as np
+
+UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def to_cents(amount: float) -> int:
+    """Round a currency amount to integer cents"""
+    return int(round(amount * 100))
+
+
+class SalesColumns:
+    """
+    Column arrays over a list of SalesTransaction
+    Row i of every array describes transactions[i], so query results are row indices
+    that map straight back to the original objects.
+    """
+
+    def __init__(self, transactions: Sequence):
+        self.transactions = transactions
+        n = len(transactions)
+
+        # rint rounds half to even, the same as round() in to_cents
+        amounts = np.fromiter((t.amount for t in transactions), dtype=np.float64, count=n)
+        self.amount_cents = np.rint(amounts * 100).astype(np.int64)
+        # Via proleptic ordinals: much faster than NumPy's datetime object parsing
+        ordinals = np.fromiter((t.date.toordinal() for t in transactions), dtype=np.int64, count=n)
+        self.day = (ordinals - UNIX_EPOCH_ORDINAL).astype("datetime64[D]")
+        self.month = self.day.astype("datetime64[M]")
+        self.completed = np.fromiter((t.status == "completed" for t in transactions), dtype=bool, count=n)
+
+        self.salesperson_ids, self.salesperson_code = self._encode([t.salesperson_id for t in transactions])
+        self.customer_ids, self.customer_code = self._encode([t.customer_id for t in transactions])
+
+    @classmethod
+    def from_arrays(cls, transactions: Sequence, amount_cents: np.ndarray, day_ordinal: np.ndarray,
+                    completed: np.ndarray, salesperson_ids: List[str], salesperson_code: np.ndarray,
+                    customer_ids: List[str], customer_code: np.ndarray) -> "SalesColumns":
+        """Columns from prebuilt arrays (e.g. a streaming loader) without touching transactions"""
+        columns = cls.__new__(cls)
+        columns.transactions = transactions
+        columns.amount_cents = amount_cents
+        columns.day = (day_ordinal.astype(np.int64) - UNIX_EPOCH_ORDINAL).astype("datetime64[D]")
+        columns.month = columns.day.astype("datetime64[M]")
+        columns.completed = completed
+        columns.salesperson_ids, columns.salesperson_code = salesperson_ids, salesperson_code
+        columns.customer_ids, columns.customer_code = customer_ids, customer_code
+        return columns
+
+    @staticmethod
+    def _encode(values: List[str]) -> Tuple[List[str], np.ndarray]:
+        """Category-encode ids; codes follow first appearance"""
+        codes: Dict[str, int] = {}
+        encoded = np.fromiter((codes.setdefault(v, len(codes)) for v in values), dtype=np.int32, count=len(values))
+        return list(codes), encoded
+
+    def __len__(self) -> int:
+        return len(self.transactions)
+
+    def select(self, mask: np.ndarray) -> np.ndarray:
+        """Row indices (ascending) where mask holds"""
+        return np.flatnonzero(mask)
+
+
+class PairIndex:
+    """
+    Sorted (value, position) keys for exact-sum pair lookups with searchsorted
+    Positions are indices into the `values` array the index was built from; pairs
+    come back in row-major order (i ascending, then j ascending).
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self.n = len(values)
+        self.width = max(self.n, 1)
+        self.keys = np.sort(values * self.width + np.arange(self.n, dtype=np.int64))
+
+    def _ranges(self, total: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Per row i, the key range of partners j > i with values[j] == total - values[i]"""
+        wanted = (total - self.values) * self.width
+        lo = np.searchsorted(self.keys, wanted + np.arange(1, self.n + 1, dtype=np.int64))
+        hi = np.searchsorted(self.keys, wanted + self.width)
+        return lo, hi
+
+    def pairs_with_sum(self, total: int, limit: Optional[int] = None) -> np.ndarray:
+        """(k, 2) array of row pairs summing exactly to total, at most limit of them"""
+        lo, hi = self._ranges(total)
+        counts = hi - lo
+        if limit is not None:
+            # Keep whole rows until the limit is reached, then trim the last one
+            before = np.cumsum(counts) - counts
+            counts = np.clip(limit - before, 0, counts)
+        rows = np.repeat(np.arange(self.n, dtype=np.int64), counts)
+        if rows.size == 0:
+            return np.empty((0, 2), dtype=np.int64)
+        offsets = np.arange(rows.size, dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+        partners = self.keys[lo[rows] + offsets] % self.width
+        return np.stack([rows, partners], axis=1)
+
+    def first_pair_with_sums(self, totals: Sequence[int]) -> Optional[Tuple[int, int]]:
+        """Row-major first pair whose sum is any of totals"""
+        best = None
+        for total in totals:
+            lo, hi = self._ranges(total)
+            rows = np.flatnonzero(hi > lo)
+            if rows.size:
+                i = int(rows[0])
+                candidate = (i, int(self.keys[lo[i]] % self.width))
+                if best is None or candidate < best:
+                    best = candidate
+        return best
+
+
+def closest_pair(values: np.ndarray, target: int) -> Optional[Tuple[int, int, int]]:
+    """
+    Pair (i < j) whose sum is closest to target, as (i, j, sum); ties go to the row-major first
+    Time Complexity: O(n log n) - one sort plus one searchsorted pass for the best distance
+    """
+    n = len(values)
+    if n < 2:
+        return None
+    order = np.argsort(values, kind="stable")
+    sorted_values = values[order]
+
+    # For each value the best partner sits next to where its complement would be inserted;
+    # look two slots either side so an element is never forced to pair with itself
+    insert_at = np.searchsorted(sorted_values, target - sorted_values)
+    own_slot = np.arange(n)
+    best = None
+    for shift in (-2, -1, 0, 1):
+        partner = np.clip(insert_at + shift, 0, n - 1)
+        distance = np.abs(target - (sorted_values + sorted_values[partner]))
+        distance = np.where(partner == own_slot, np.iinfo(np.int64).max, distance)
+        shift_best = int(distance.min())
+        best = shift_best if best is None else min(best, shift_best)
+
+    index = PairIndex(values)
+    totals = [target - best, target + best] if best else [target]
+    i, j = index.first_pair_with_sums(totals)
+    return i, j, int(values[i] + values[j])
+
+
+def top_pairs_by_sum(values: np.ndarray, k: int, minimum: Optional[int] = None) -> np.ndarray:
+    """
+    The k pairs with the largest sums (>= minimum), largest first, ties in row-major order
+    The k-th largest pair sum is always formed within the k + 1 largest values, so only
+    those few sums are enumerated before exact-sum lookups fetch the pairs themselves.
+    """
+    n = len(values)
+    if n < 2 or k <= 0:
+        return np.empty((0, 2), dtype=np.int64)
+    top = np.sort(values)[::-1][:k + 1]
+    upper = np.triu_indices(len(top), 1)
+    candidate_sums = np.unique(top[upper[0]] + top[upper[1]])[::-1]
+
+    index = PairIndex(values)
+    found = []
+    remaining = k
+    for total in candidate_sums:
+        if remaining == 0 or (minimum is not None and total < minimum):
+            break
+        pairs = index.pairs_with_sum(int(total), remaining)
+        found.append(pairs)
+        remaining -= len(pairs)
+    return np.concatenate(found) if found else np.empty((0, 2), dtype=np.int64)
+
+
+def disjoint_pairs_with_sum(values: np.ndarray, target: int) -> List[Tuple[int, int]]:
+    """
+    Greedy disjoint pairing in row order: each unused row takes the first unused later
+    row that completes the target. Per value class this is FIFO matching, done in one
+    pass over the rows of the two complementary values.
+    """
+    order = np.argsort(values, kind="stable")
+    sorted_values = values[order]
+    unique_values, starts = np.unique(sorted_values, return_index=True)
+    ends = np.append(starts[1:], len(sorted_values))
+    rows_of = {int(v): order[s:e] for v, s, e in zip(unique_values, starts, ends)}
+
+    pairs = []
+    for value, rows in rows_of.items():
+        complement = target - value
+        if complement < value or complement not in rows_of:
+            continue
+        if complement == value:
+            # Consecutive occurrences pair up
+            pairs.extend((int(rows[m]), int(rows[m + 1])) for m in range(0, len(rows) - 1, 2))
+            continue
+        # Merge both classes by row; open rows wait for the other class
+        merged = sorted([(int(r), 0) for r in rows] + [(int(r), 1) for r in rows_of[complement]])
+        waiting: List[int] = []
+        waiting_side = None
+        head = 0
+        for row, side in merged:
+            if head < len(waiting) and side != waiting_side:
+                pairs.append((waiting[head], row))
+                head += 1
+            else:
+                if head == len(waiting):
+                    waiting, head, waiting_side = [], 0, side
+                waiting.append(row)
+    pairs.sort()
+    return pairs
@@ -0,0 +1,55 @@
+# Sales Forecast Engine - least-squares trend plus seasonality over period rollups
+# Many series (one per product / rep) share one design matrix and are fitted in a single solve
+
+from typing import Tuple
+import numpy as np
+
+# Two-sided 95% normal quantile for prediction intervals
+Z_95 = 1.959963984540054
+
+
+class SeasonalForecastModel:
+    """
+    y_t = level + slope * t + season[t mod L] + noise, fitted by ordinary least squares
+    history is a (periods, series) matrix; every column gets its own coefficients from one
+    lstsq call. Seasonality needs two full cycles, otherwise the model falls back to trend
+    only. After fitting, predict() costs O(horizon * series) and never touches the history.
+    """
+
+    def __init__(self, history: np.ndarray, season_length: int):
+        history = np.asarray(history, dtype=np.float64)
+        if history.ndim == 1:
+            history = history[:, None]
+        self.n_obs, self.n_series = history.shape
+        self.season_length = season_length
+        self.seasonal = self.n_obs >= 2 * season_length
+
+        if self.n_obs < 3:
+            self.method = "insufficient_data"
+            self.coef = None
+            return
+        self.method = "least_squares_seasonal" if self.seasonal else "least_squares_trend"
+
+        design = self._design(np.arange(self.n_obs))
+        self.coef, _, _, _ = np.linalg.lstsq(design, history, rcond=None)
+        residuals = history - design @ self.coef
+        dof = max(self.n_obs - design.shape[1], 1)
+        self.sigma = np.sqrt((residuals ** 2).sum(axis=0) / dof)
+        # Shared by every series: forecast variance is sigma^2 * (1 + x' (X'X)^-1 x)
+        self._xtx_inv = np.linalg.pinv(design.T @ design)
+
+    def _design(self, t: np.ndarray) -> np.ndarray:
+        """Columns: intercept, trend, and one dummy per season except the first"""
+        columns = [np.ones(len(t)), t.astype(np.float64)]
+        if self.seasonal:
+            phase = t % self.season_length
+            columns.extend((phase == season).astype(np.float64) for season in range(1, self.season_length))
+        return np.column_stack(columns)
+
+    def predict(self, horizon: int, z: float = Z_95) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(mean, lower, upper), each (horizon, series), for the periods after the history"""
+        design = self._design(np.arange(self.n_obs, self.n_obs + horizon))
+        mean = design @ self.coef
+        leverage = np.einsum("ij,jk,ik->i", design, self._xtx_inv, design)
+        half_width = z * np.sqrt(1 + leverage)[:, None] * self.sigma[None, :]
+        return mean, mean - half_width, mean + half_width
@@ -1,23 +1,51 @@
 from app.database.connection import get_database
+from app.database.dates import to_bson_date, normalize_dates, date_range, set_order_periods
 from app.models import (
     SalesOrderCreate, SalesOrderUpdate, SalesOrderResponse, SalesOrderInDB,
-    OrderLineItem, OrderLineItemCreate, OrderStatus, PaymentStatus
+    OrderLineItem, OrderLineItemCreate, OrderStatus, PaymentStatus,
+    BulkStatusResult, BulkStatusUpdateResponse
 )
 from app.services.customer_service import customer_service
-from app.services.external_services import inventory_service, auth_service
-from pymongo.errors import DuplicateKeyError
-from typing import Optional, List, Dict, Any
+from app.services.sales_rep_directory import sales_rep_directory
+from app.services.external_services import inventory_service
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+from collections import defaultdict
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, date
+import asyncio
 from bson import ObjectId
 from app.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Status changes allowed by bulk transitions
+ORDER_STATUS_TRANSITIONS: Dict[str, Tuple[str, ...]] = {
+    "draft": ("pending", "confirmed", "cancelled"),
+    "pending": ("draft", "confirmed", "cancelled"),
+    "confirmed": ("processing", "shipped", "cancelled"),
+    "processing": ("shipped", "cancelled"),
+    "shipped": ("delivered", "returned"),
+    "delivered": ("returned",),
+    "cancelled": (),
+    "returned": (),
+}
+
+# Stock was fulfilled for orders in these statuses, so cancelling releases it
+STOCK_HELD_STATUSES = ("confirmed", "processing")
+
+ORDER_NUMBER_COUNTER = "sales_order_number"
+
+BULK_STATUS_PROJECTION = {
+    "status": 1, "customer_id": 1, "total_amount": 1,
+    "line_items.product_id": 1, "line_items.quantity": 1,
+}
+
 
 class SalesOrderService:
     def __init__(self):
-        pass
+        self._order_counter_seeded = False
 
     async def create_order(self, order_data: SalesOrderCreate, user_id: str, token: str) -> SalesOrderResponse:
         """Create a new sales order"""
@@ -46,13 +74,8 @@ class SalesOrderService:
             if not customer:
                 raise ValueError(f"Customer not found with identifier: {order_data.customer_id}")
 
-            # Get user info for sales rep
-            user_info = None
-            sales_rep_name = None
-            if order_data.sales_rep_id:
-                user_info = await auth_service.get_user_by_id(order_data.sales_rep_id, token)
-                if user_info:
-                    sales_rep_name = f"{user_info.get('first_name', '')} {user_info.get('last_name', '')}".strip()
+            # Resolve sales rep name from the cached directory
+            sales_rep_name = await sales_rep_directory.get_name(order_data.sales_rep_id, token)
 
             # Process line items
             processed_line_items = []
@@ -137,8 +160,8 @@ class SalesOrderService:
                 customer_id=str(customer.id),  # Use string ID instead of the original input
                 customer_name=f"{customer.first_name} {customer.last_name}".strip(),
                 customer_email=customer.email,
-                order_date=order_data.order_date.isoformat() if isinstance(order_data.order_date, date) else order_data.order_date,
-                expected_delivery_date=order_data.expected_delivery_date.isoformat() if order_data.expected_delivery_date and isinstance(order_data.expected_delivery_date, date) else order_data.expected_delivery_date,
+                order_date=to_bson_date(order_data.order_date or date.today()),
+                expected_delivery_date=to_bson_date(order_data.expected_delivery_date),
                 shipping_method=order_data.shipping_method,
                 shipping_address=shipping_address,
                 priority=order_data.priority,
@@ -164,13 +187,10 @@ class SalesOrderService:
             # Insert order
             order_dict = order_doc.dict(by_alias=True, exclude={"id"})
             
-            # Convert date objects to ISO format strings for MongoDB storage
-            if 'order_date' in order_dict and isinstance(order_dict['order_date'], date):
-                order_dict['order_date'] = order_dict['order_date'].isoformat()
-            if 'expected_delivery_date' in order_dict and isinstance(order_dict['expected_delivery_date'], date):
-                order_dict['expected_delivery_date'] = order_dict['expected_delivery_date'].isoformat()
-            if 'actual_delivery_date' in order_dict and isinstance(order_dict['actual_delivery_date'], date):
-                order_dict['actual_delivery_date'] = order_dict['actual_delivery_date'].isoformat()
+            # Business dates are stored as BSON dates so range queries stay on the index
+            normalize_dates(order_dict, "sales_orders")
+            set_order_periods(order_dict)
+            order_dict["deleted"] = False
             
             result = await orders_collection.insert_one(order_dict)
             
@@ -228,13 +248,10 @@ class SalesOrderService:
             db = get_database()
             orders_collection = db.sales_orders  # Fixed: was db.orders, should be db.sales_orders
 
-            # Get existing order
-            existing_order = await self.get_order_by_id(order_id)
-            if not existing_order:
-                return None
-
             # Prepare update data
             update_data = {k: v for k, v in order_update.dict(exclude_unset=True).items() if v is not None}
+            normalize_dates(update_data, "sales_orders")
+            set_order_periods(update_data)
             update_data["updated_at"] = datetime.utcnow()
             update_data["updated_by"] = user_id
 
@@ -244,17 +261,14 @@ class SalesOrderService:
                 # (Similar logic to create_order)
                 pass
 
-            # Update order
-            result = await orders_collection.update_one(
-                {"_id": ObjectId(order_id)},
-                {"$set": update_data}
+            # Update and read back in one round trip
+            updated_order = await orders_collection.find_one_and_update(
+                {"_id": ObjectId(order_id), "deleted": {"$ne": True}},
+                {"$set": update_data},
+                return_document=ReturnDocument.AFTER
             )
-
-            if result.modified_count > 0:
-                # Fetch updated order
-                updated_order = await orders_collection.find_one({"_id": ObjectId(order_id)})
-                if updated_order:
-                    return SalesOrderResponse(**updated_order)
+            if updated_order:
+                return SalesOrderResponse(**updated_order)
             
             return None
 
@@ -304,30 +318,23 @@ class SalesOrderService:
             db = get_database()
             orders_collection = db.sales_orders
 
-            # Get existing order to calculate balance
-            existing_order = await self.get_order_by_id(order_id)
-            if not existing_order:
-                logger.error(f"❌ Order {order_id} not found for payment status update")
-                return False
-            
-            logger.info(f"📋 Found existing order: total_amount={existing_order.total_amount}, current_payment_status={existing_order.payment_status}")
-
-            # Update payment fields
-            update_data = {
-                "payment_status": payment_status,
-                "paid_amount": paid_amount,
-                "balance_due": existing_order.total_amount - paid_amount,
-                "updated_at": datetime.utcnow()
-            }
-
-            # Update order
-            logger.info(f"📝 Updating order with data: {update_data}")
+            # Pipeline update: balance_due is derived from the stored total in the same write
             result = await orders_collection.update_one(
-                {"_id": ObjectId(order_id)},
-                {"$set": update_data}
+                {"_id": ObjectId(order_id), "deleted": {"$ne": True}},
+                [{
+                    "$set": {
+                        "payment_status": {"$literal": payment_status},
+                        "paid_amount": paid_amount,
+                        "balance_due": {"$subtract": ["$total_amount", paid_amount]},
+                        "updated_at": datetime.utcnow()
+                    }
+                }]
             )
 
             logger.info(f"📊 Update result: matched_count={result.matched_count}, modified_count={result.modified_count}")
+            if result.matched_count == 0:
+                logger.error(f"❌ Order {order_id} not found for payment status update")
+                return False
             if result.modified_count > 0:
                 logger.info(f"✅ Order {order_id} payment status updated to '{payment_status}' with amount {paid_amount}")
                 return True
@@ -345,8 +352,13 @@ class SalesOrderService:
                         sales_rep_id: Optional[str] = None,
                         start_date: Optional[date] = None,
                         end_date: Optional[date] = None,
-                        search: Optional[str] = None) -> List[SalesOrderResponse]:
-        """Get list of orders with pagination and filters"""
+                        search: Optional[str] = None,
+                        token: Optional[str] = None) -> List[SalesOrderResponse]:
+        """Get list of orders with pagination and filters
+
+        When a token is given, sales rep names are refreshed from the rep
+        directory in one bulk lookup for the whole page.
+        """
         try:
             db = get_database()
             orders_collection = db.sales_orders
@@ -358,6 +370,15 @@ class SalesOrderService:
             cursor = orders_collection.find(filter_query).skip(skip).limit(limit).sort("order_date", -1)
             orders = await cursor.to_list(length=limit)
 
+            if token:
+                rep_names = await sales_rep_directory.resolve(
+                    (order.get("sales_rep_id") for order in orders), token
+                )
+                for order in orders:
+                    rep_id = order.get("sales_rep_id")
+                    if rep_id in rep_names:
+                        order["sales_rep_name"] = rep_names[rep_id]
+
             # Convert ObjectId to string for response
             result = []
             for order in orders:
@@ -400,8 +421,9 @@ class SalesOrderService:
                            end_date: Optional[date] = None,
                            search: Optional[str] = None) -> dict:
         """Build filter query for orders"""
-        # Exclude deleted orders by default
-        filter_query = {"deleted": {"$ne": True}}
+        # Exclude deleted orders by default; the equality form matches the
+        # partial list indexes (orders carry deleted: False from creation)
+        filter_query = {"deleted": False}
         
         if status:
             filter_query["status"] = status
@@ -409,12 +431,8 @@ class SalesOrderService:
             filter_query["customer_id"] = customer_id
         if sales_rep_id:
             filter_query["sales_rep_id"] = sales_rep_id
-        if start_date and end_date:
-            filter_query["order_date"] = {"$gte": start_date, "$lte": end_date}
-        elif start_date:
-            filter_query["order_date"] = {"$gte": start_date}
-        elif end_date:
-            filter_query["order_date"] = {"$lte": end_date}
+        if start_date or end_date:
+            filter_query["order_date"] = date_range(start_date, end_date)
         if search:
             filter_query["$or"] = [
                 {"order_number": {"$regex": search, "$options": "i"}},
@@ -568,23 +586,202 @@ class SalesOrderService:
             logger.error(f"Error deleting order {order_id}: {e}")
             return False
 
+    async def bulk_update_status(self, order_ids: List[str], new_status: OrderStatus, user_id: str,
+                                 token: Optional[str]) -> BulkStatusUpdateResponse:
+        """Move many orders to one status, one unordered bulk_write per batch.
+
+        Each order is checked against ORDER_STATUS_TRANSITIONS and its write is
+        guarded by the status it was read with, so an order changed in the
+        meantime is reported instead of overwritten. Stock and customer side
+        effects of the orders that moved run afterwards, concurrently.
+        """
+        db = get_database()
+        orders_collection = db.sales_orders
+        target = OrderStatus(new_status).value
+        # Stored dates keep milliseconds; the stamp identifies this call's writes
+        now = datetime.utcnow()
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+        requested = list(dict.fromkeys(order_ids))
+        results: Dict[str, BulkStatusResult] = {}
+        valid_ids = []
+        for order_id in requested:
+            if ObjectId.is_valid(order_id):
+                valid_ids.append(order_id)
+            else:
+                results[order_id] = BulkStatusResult(order_id=order_id, success=False, error="Invalid order id")
+
+        moved: List[Dict[str, Any]] = []
+        batch_size = settings.bulk_status_write_batch
+        for start in range(0, len(valid_ids), batch_size):
+            chunk = valid_ids[start:start + batch_size]
+            orders = {}
+            async for order in orders_collection.find(
+                {"_id": {"$in": [ObjectId(order_id) for order_id in chunk]}, "deleted": {"$ne": True}},
+                BULK_STATUS_PROJECTION
+            ):
+                orders[str(order["_id"])] = order
+
+            operations, pending = [], []
+            for order_id in chunk:
+                order = orders.get(order_id)
+                if order is None:
+                    results[order_id] = BulkStatusResult(order_id=order_id, success=False, error="Order not found")
+                    continue
+                current = order.get("status")
+                if target not in ORDER_STATUS_TRANSITIONS.get(current, ()):
+                    results[order_id] = BulkStatusResult(
+                        order_id=order_id, success=False, previous_status=current,
+                        error=f"Cannot change status from '{current}' to '{target}'"
+                    )
+                    continue
+                operations.append(UpdateOne(
+                    {"_id": order["_id"], "status": current},
+                    {"$set": {"status": target, "updated_at": now, "updated_by": user_id}}
+                ))
+                pending.append(order)
+
+            if not operations:
+                continue
+
+            write_errors: Dict[str, str] = {}
+            try:
+                modified = (await orders_collection.bulk_write(operations, ordered=False)).modified_count
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    write_errors[str(pending[error["index"]]["_id"])] = error.get("errmsg", "Write failed")
+                modified = e.details.get("nModified", 0)
+
+            if modified == len(pending):
+                applied = {str(order["_id"]) for order in pending}
+            else:
+                # Some guards did not match: find out which orders this call moved
+                applied = set()
+                async for order in orders_collection.find(
+                    {"_id": {"$in": [order["_id"] for order in pending]},
+                     "status": target, "updated_at": now, "updated_by": user_id},
+                    {"_id": 1}
+                ):
+                    applied.add(str(order["_id"]))
+
+            for order in pending:
+                order_id = str(order["_id"])
+                if order_id in applied:
+                    results[order_id] = BulkStatusResult(order_id=order_id, success=True,
+                                                         previous_status=order.get("status"))
+                    moved.append(order)
+                else:
+                    results[order_id] = BulkStatusResult(
+                        order_id=order_id, success=False, previous_status=order.get("status"),
+                        error=write_errors.get(order_id, "Order status changed concurrently; not updated")
+                    )
+
+        if moved:
+            await self._bulk_status_side_effects(moved, target, user_id, token, results)
+
+        ordered_results = [results[order_id] for order_id in requested]
+        updated = sum(1 for result in ordered_results if result.success)
+        logger.info(f"Bulk status '{target}': {updated}/{len(ordered_results)} orders updated")
+        return BulkStatusUpdateResponse(
+            status=target,
+            requested=len(ordered_results),
+            updated=updated,
+            failed=len(ordered_results) - updated,
+            results=ordered_results
+        )
+
+    async def _bulk_status_side_effects(self, orders: List[Dict[str, Any]], target: str, user_id: str,
+                                        token: Optional[str], results: Dict[str, BulkStatusResult]) -> None:
+        """Stock fulfilment/release and customer stats for orders a bulk transition moved"""
+        db = get_database()
+        if target == OrderStatus.CONFIRMED.value:
+            stock_orders, action = orders, "fulfil"
+        elif target == OrderStatus.CANCELLED.value:
+            stock_orders, action = [order for order in orders if order.get("status") in STOCK_HELD_STATUSES], "release"
+        else:
+            stock_orders, action = [], None
+
+        if stock_orders and not token:
+            for order in stock_orders:
+                results[str(order["_id"])].warnings.append(f"Stock not {action}ed: no auth token")
+            stock_orders = []
+
+        semaphore = asyncio.Semaphore(settings.bulk_status_concurrency)
+
+        async def adjust_stock(order: Dict[str, Any], item: Dict[str, Any]) -> bool:
+            async with semaphore:
+                try:
+                    if action == "fulfil":
+                        return await inventory_service.fulfill_stock(
+                            item["product_id"], item["quantity"], str(order["_id"]), user_id, token
+                        )
+                    return await inventory_service.release_stock(
+                        item["product_id"], item["quantity"], str(order["_id"]), token
+                    )
+                except Exception as e:
+                    logger.warning(f"Stock {action} error for product {item.get('product_id')}: {e}")
+                    return False
+
+        customer_totals: Dict[str, List[float]] = defaultdict(list)
+        if target == OrderStatus.CONFIRMED.value:
+            for order in orders:
+                if order.get("customer_id"):
+                    customer_totals[order["customer_id"]].append(order.get("total_amount", 0))
+
+        calls = [(order, item) for order in stock_orders for item in order.get("line_items") or []]
+        outcomes, _ = await asyncio.gather(
+            asyncio.gather(*(adjust_stock(order, item) for order, item in calls)),
+            customer_service.bulk_update_customer_stats(customer_totals)
+        )
+
+        fulfilled: Dict[str, List[str]] = defaultdict(list)
+        for (order, item), ok in zip(calls, outcomes):
+            if ok:
+                fulfilled[str(order["_id"])].append(item["product_id"])
+            else:
+                results[str(order["_id"])].warnings.append(f"Stock {action} failed for product {item['product_id']}")
+
+        if target == OrderStatus.CONFIRMED.value:
+            # Record fulfilled items, as confirm_order does
+            operations = [
+                UpdateOne({"_id": order["_id"]}, {"$set": {"stock_fulfilled_items": fulfilled.get(str(order["_id"]), [])}})
+                for order in orders
+            ]
+            batch_size = settings.bulk_status_write_batch
+            for start in range(0, len(operations), batch_size):
+                await db.sales_orders.bulk_write(operations[start:start + batch_size], ordered=False)
+
+    async def _seed_order_counter(self, db) -> None:
+        """Start the order number counter above the highest existing SO- number"""
+        if await db.counters.find_one({"_id": ORDER_NUMBER_COUNTER}) is None:
+            highest = 0
+            async for row in db.sales_orders.aggregate([
+                {"$match": {"order_number": {"$regex": r"^SO-\d+$"}}},
+                {"$group": {"_id": None, "max": {"$max": {"$toLong": {"$substrCP": ["$order_number", 3, 18]}}}}}
+            ]):
+                highest = row["max"] or 0
+            # $max keeps a concurrent seeder (or allocations already made) from moving it back
+            await db.counters.update_one({"_id": ORDER_NUMBER_COUNTER}, {"$max": {"seq": highest}}, upsert=True)
+        self._order_counter_seeded = True
+
+    async def allocate_order_numbers(self, count: int) -> List[str]:
+        """Reserve `count` consecutive order numbers with a single $inc"""
+        db = get_database()
+        if not self._order_counter_seeded:
+            await self._seed_order_counter(db)
+        counter = await db.counters.find_one_and_update(
+            {"_id": ORDER_NUMBER_COUNTER},
+            {"$inc": {"seq": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        last = counter["seq"]
+        return [f"SO-{number:05d}" for number in range(last - count + 1, last + 1)]
+
     async def _generate_order_number(self) -> str:
         """Generate unique order number"""
         try:
-            db = get_database()
-            orders_collection = db.sales_orders
-
-            # Get count of existing orders and increment
-            order_count = await orders_collection.count_documents({})
-            new_number = order_count + 1
-            
-            # Ensure uniqueness by checking if the generated number exists
-            while True:
-                order_number = f"SO-{new_number:05d}"
-                existing = await orders_collection.find_one({"order_number": order_number})
-                if not existing:
-                    return order_number
-                new_number += 1
+            return (await self.allocate_order_numbers(1))[0]
 
         except Exception as e:
             logger.error(f"Error generating order number: {e}")
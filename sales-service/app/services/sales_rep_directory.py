@@ -0,0 +1,93 @@
+from app.services.external_services import auth_service
+from app.config import settings
+from collections import OrderedDict
+from typing import Optional, List, Dict, Iterable, Tuple
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Matches the id limit of auth-service POST /users/batch
+BATCH_LOOKUP_LIMIT = 500
+
+
+class SalesRepDirectory:
+    """In-process cache of sales rep display names.
+
+    Names come from auth-service in bulk: every id that is missing or older
+    than the TTL is fetched in a single batch request, so resolving reps for
+    a whole page of orders costs at most one HTTP call. When auth-service is
+    unreachable, stale names keep being served.
+    """
+
+    def __init__(self):
+        # user_id -> (name or None if unknown, fetched_at)
+        self._entries: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+
+    @staticmethod
+    def _display_name(user: Dict) -> Optional[str]:
+        name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip()
+        return name or None
+
+    def _store(self, user_id: str, name: Optional[str], fetched_at: float) -> None:
+        self._entries[user_id] = (name, fetched_at)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > settings.sales_rep_cache_max_entries:
+            self._entries.popitem(last=False)
+
+    async def resolve(self, user_ids: Iterable[Optional[str]], token: Optional[str]) -> Dict[str, str]:
+        """Map user ids to display names, refreshing stale entries in bulk"""
+        wanted = [user_id for user_id in dict.fromkeys(user_ids) if user_id]
+        now = time.monotonic()
+        ttl = settings.sales_rep_cache_ttl_seconds
+
+        stale = [
+            user_id for user_id in wanted
+            if user_id not in self._entries or now - self._entries[user_id][1] >= ttl
+        ]
+        if stale and token:
+            await self._refresh(stale, token, now)
+
+        names = {}
+        for user_id in wanted:
+            entry = self._entries.get(user_id)
+            if entry and entry[0]:
+                names[user_id] = entry[0]
+        return names
+
+    async def get_name(self, user_id: Optional[str], token: Optional[str]) -> Optional[str]:
+        """Display name for a single user id"""
+        if not user_id:
+            return None
+        names = await self.resolve([user_id], token)
+        return names.get(user_id)
+
+    async def _refresh(self, user_ids: List[str], token: str, now: float) -> None:
+        for start in range(0, len(user_ids), BATCH_LOOKUP_LIMIT):
+            chunk = user_ids[start:start + BATCH_LOOKUP_LIMIT]
+            users = await auth_service.get_users_by_ids(chunk, token)
+            if users is None:
+                # Lookup failed: keep serving whatever we had
+                logger.warning(f"Sales rep lookup failed for {len(chunk)} ids")
+                continue
+
+            found = {}
+            for user in users:
+                user_id = user.get("id") or user.get("_id")
+                if user_id:
+                    found[user_id] = self._display_name(user)
+            # Ids auth-service did not return are cached as unknown too,
+            # so they are not re-requested on every call
+            for user_id in chunk:
+                self._store(user_id, found.get(user_id), now)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Drop one cached entry, or all of them"""
+        if user_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(user_id, None)
+
+
+# Global instance
+sales_rep_directory = SalesRepDirectory()
@@ -0,0 +1,107 @@
+"""
+Async Stripe Client
+Runs the synchronous Stripe SDK on a bounded thread pool so gateway round
+trips never block the event loop:
+- one pooled HTTP client (keep-alive sessions per worker thread)
+- per-call timeouts
+- retries of transient failures, reusing one idempotency key per operation
+- per-operation call counts, errors, retries and latency percentiles
+Point STRIPE_API_BASE at scripts/fake_stripe_server.py to run without Stripe.
+"""
+
+import stripe
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional
+import asyncio
+import functools
+import logging
+import random
+import time
+import uuid
+from app.config import settings
+from app.services.gateway_metrics import OperationStats
+
+logger = logging.getLogger(__name__)
+
+# Worth retrying: network failures, rate limiting and Stripe-side 5xx errors.
+# Card declines and invalid requests fail the same way every time.
+RETRYABLE_ERRORS = (
+    stripe.error.APIConnectionError,
+    stripe.error.RateLimitError,
+    stripe.error.APIError,
+)
+
+class AsyncStripeClient:
+    """Awaitable wrapper around the Stripe SDK's module-level resource calls"""
+
+    def __init__(self):
+        stripe.api_key = settings.stripe_secret_key
+        stripe.api_version = settings.stripe_api_version
+        if settings.stripe_api_base:
+            stripe.api_base = settings.stripe_api_base
+        # Retries are handled here, with our own idempotency keys and backoff
+        stripe.max_network_retries = 0
+        stripe.default_http_client = stripe.RequestsClient(timeout=settings.stripe_timeout_seconds)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.stripe_max_concurrency,
+            thread_name_prefix="stripe"
+        )
+        self._stats: Dict[str, OperationStats] = {}
+
+    async def call(self, operation: str, method: Callable[..., Any], *args,
+                   idempotent: bool = True, timeout: Optional[float] = None, **params) -> Any:
+        """
+        Run one SDK call off the event loop
+
+        Args:
+            operation: Metrics label, e.g. "payment_intent.create"
+            method: SDK callable, e.g. stripe.PaymentIntent.create
+            idempotent: Send an idempotency key (POST requests); it is kept across retries
+            timeout: Seconds to wait per attempt (default: STRIPE_TIMEOUT_SECONDS)
+        """
+        stats = self._stats.setdefault(operation, OperationStats())
+        timeout = timeout or settings.stripe_timeout_seconds
+        if idempotent and "idempotency_key" not in params:
+            params["idempotency_key"] = f"{operation}-{uuid.uuid4()}"
+
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            stats.calls += 1
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, functools.partial(method, *args, **params)),
+                    timeout
+                )
+                stats.latencies.append(time.perf_counter() - started)
+                return result
+            except (asyncio.TimeoutError, *RETRYABLE_ERRORS) as e:
+                stats.latencies.append(time.perf_counter() - started)
+                if isinstance(e, asyncio.TimeoutError):
+                    stats.timeouts += 1
+                if attempt >= settings.stripe_max_retries:
+                    stats.errors += 1
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise stripe.error.APIConnectionError(f"Stripe {operation} timed out after {timeout}s")
+                    raise
+                attempt += 1
+                stats.retries += 1
+                delay = settings.stripe_retry_backoff_seconds * (2 ** (attempt - 1)) * (1 + random.random())
+                logger.warning(f"⚠️ Stripe {operation} failed ({type(e).__name__}), retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            except Exception:
+                stats.latencies.append(time.perf_counter() - started)
+                stats.errors += 1
+                raise
+
+    def metrics(self) -> Dict[str, Any]:
+        return {operation: stats.snapshot() for operation, stats in sorted(self._stats.items())}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global instance
+stripe_client = AsyncStripeClient()
@@ -5,6 +5,7 @@ Handles all Stripe payment gateway operations including:
 - Customer management
 - Refund processing
 - Webhook event handling
+Gateway calls go through app.services.stripe_client so they never block the event loop.
 """
 
 import stripe
@@ -12,6 +13,7 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 import logging
 from app.config import settings
+from app.services.stripe_client import stripe_client
 from app.models.payment import (
     PaymentMethod, PaymentStatus, TransactionType,
     StripePaymentIntentCreate, PaymentGatewayDetails
@@ -19,9 +21,6 @@ from app.models.payment import (
 
 logger = logging.getLogger(__name__)
 
-# Initialize Stripe with API key
-stripe.api_key = settings.stripe_secret_key
-stripe.api_version = settings.stripe_api_version
 
 
 class StripeService:
@@ -33,9 +32,6 @@ class StripeService:
         self.webhook_secret = settings.stripe_webhook_secret
         self.default_currency = settings.stripe_currency
         
-        # Set Stripe API key
-        stripe.api_key = self.api_key
-        
         logger.info(f"Stripe service initialized with API version: {stripe.api_version}")
     
     async def create_payment_intent(
@@ -87,7 +83,7 @@ class StripeService:
                 intent_params["receipt_email"] = receipt_email
             
             # Create payment intent
-            payment_intent = stripe.PaymentIntent.create(**intent_params)
+            payment_intent = await stripe_client.call("payment_intent.create", stripe.PaymentIntent.create, **intent_params)
             
             logger.info(f"✅ Payment intent created: {payment_intent.id}")
             
@@ -129,8 +125,10 @@ class StripeService:
             logger.info(f"Retrieving payment intent: {payment_intent_id}")
             
             # Retrieve payment intent with expanded charges
-            payment_intent = stripe.PaymentIntent.retrieve(
+            payment_intent = await stripe_client.call(
+                "payment_intent.retrieve", stripe.PaymentIntent.retrieve,
                 payment_intent_id,
+                idempotent=False,
                 expand=['latest_charge']
             )
             
@@ -175,7 +173,8 @@ class StripeService:
         try:
             logger.info(f"Confirming payment intent: {payment_intent_id}")
             
-            payment_intent = stripe.PaymentIntent.confirm(
+            payment_intent = await stripe_client.call(
+                "payment_intent.confirm", stripe.PaymentIntent.confirm,
                 payment_intent_id,
                 expand=['latest_charge']
             )
@@ -227,7 +226,9 @@ class StripeService:
             if amount_to_capture:
                 capture_params["amount_to_capture"] = int(amount_to_capture * 100)
             
-            payment_intent = stripe.PaymentIntent.capture(payment_intent_id, **capture_params)
+            payment_intent = await stripe_client.call(
+                "payment_intent.capture", stripe.PaymentIntent.capture, payment_intent_id, **capture_params
+            )
             
             logger.info(f"✅ Payment captured: {payment_intent.id}")
             
@@ -255,7 +256,9 @@ class StripeService:
         try:
             logger.info(f"Cancelling payment intent: {payment_intent_id}")
             
-            payment_intent = stripe.PaymentIntent.cancel(payment_intent_id)
+            payment_intent = await stripe_client.call(
+                "payment_intent.cancel", stripe.PaymentIntent.cancel, payment_intent_id
+            )
             
             logger.info(f"✅ Payment intent cancelled: {payment_intent.id}")
             
@@ -302,7 +305,7 @@ class StripeService:
             if metadata:
                 refund_params["metadata"] = metadata
             
-            refund = stripe.Refund.create(**refund_params)
+            refund = await stripe_client.call("refund.create", stripe.Refund.create, **refund_params)
             
             logger.info(f"✅ Refund created: {refund.id} - Amount: ${refund.amount / 100}")
             
@@ -354,7 +357,7 @@ class StripeService:
             if metadata:
                 customer_params["metadata"] = metadata
             
-            customer = stripe.Customer.create(**customer_params)
+            customer = await stripe_client.call("customer.create", stripe.Customer.create, **customer_params)
             
             logger.info(f"✅ Stripe customer created: {customer.id}")
             
@@ -380,7 +383,9 @@ class StripeService:
             Dict containing customer details
         """
         try:
-            customer = stripe.Customer.retrieve(customer_id)
+            customer = await stripe_client.call(
+                "customer.retrieve", stripe.Customer.retrieve, customer_id, idempotent=False
+            )
             
             return {
                 "customer_id": customer.id,
@@ -463,6 +468,7 @@ class StripeService:
             elif event_type == "charge.refunded":
                 result["action"] = "refund_processed"
                 result["charge_id"] = event_data.id
+                result["payment_intent_id"] = getattr(event_data, "payment_intent", None)
                 result["amount_refunded"] = event_data.amount_refunded / 100
                 result["status"] = "refunded"
                 
@@ -506,6 +512,10 @@ class StripeService:
     def get_publishable_key(self) -> str:
         """Get Stripe publishable key for frontend"""
         return self.publishable_key
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-operation gateway call counts, retries, timeouts and latency percentiles"""
+        return stripe_client.metrics()
 
 
 # Singleton instance
@@ -0,0 +1,194 @@
+# Target Search Engine - which 1..k amounts add up to a target
+# All arithmetic is on integer cents, so matches are exact (no float drift)
+
+from typing import List, Tuple, Optional, Sequence, Iterator
+from dataclasses import dataclass, field
+from bisect import bisect_left, bisect_right
+import time
+import numpy as np
+
+# Pair-sum tables above this size fall back to nested search under the time budget
+MAX_PAIR_TABLE = 2_000_000
+# Subset-sum DP is used for sums up to this many cents ($10,000)
+MAX_DP_TARGET = 1_000_000
+
+
+class SearchBudgetExceeded(Exception):
+    pass
+
+
+@dataclass
+class TargetSearchResult:
+    # Each combination is a tuple of indices into the input amounts, ascending
+    combinations: List[Tuple[int, ...]] = field(default_factory=list)
+    # False when the time budget ran out before the search space was covered
+    complete: bool = True
+    methods: List[str] = field(default_factory=list)
+
+
+class TargetSearch:
+    """
+    Finds combinations of amounts (in cents) whose sum lies within tolerance of a target
+    - k = 1, 2: binary search over the sorted amounts
+    - k = 3, 4: meet-in-the-middle over a sorted pair-sum table
+    - k > 4: bounded subset-sum DP when the target is small and amounts positive
+    Smaller combinations are returned first; the search stops at max_results or when
+    the time budget is spent.
+    """
+
+    def __init__(self, amounts: Sequence[int], time_budget: float = 2.0):
+        self.order = sorted(range(len(amounts)), key=lambda i: amounts[i])
+        self.values = [int(amounts[i]) for i in self.order]
+        self.deadline = time.monotonic() + time_budget
+        self._ticks = 0
+        self._pair_sums: Optional[np.ndarray] = None
+        self._pair_left: Optional[np.ndarray] = None
+        self._pair_right: Optional[np.ndarray] = None
+
+    def _check_budget(self):
+        self._ticks += 1
+        if self._ticks & 0x3FF == 0 and time.monotonic() > self.deadline:
+            raise SearchBudgetExceeded()
+
+    def _original(self, positions: Sequence[int]) -> Tuple[int, ...]:
+        return tuple(sorted(self.order[p] for p in positions))
+
+    def _window(self, low: int, high: int, start: int) -> range:
+        """Sorted positions >= start whose value lies in [low, high]"""
+        return range(max(start, bisect_left(self.values, low)), bisect_right(self.values, high))
+
+    def search(self, target: int, min_items: int = 1, max_items: int = 4, tolerance: int = 0,
+               max_results: int = 10) -> TargetSearchResult:
+        result = TargetSearchResult()
+        low, high = target - tolerance, target + tolerance
+        n = len(self.values)
+
+        def collect(method: str, found: Iterator[Tuple[int, ...]]) -> bool:
+            """Append results; True once max_results is reached"""
+            result.methods.append(method)
+            for positions in found:
+                result.combinations.append(self._original(positions))
+                if len(result.combinations) >= max_results:
+                    return True
+            return False
+
+        try:
+            for k in range(max(1, min_items), min(max_items, 4, n) + 1):
+                if k <= 2:
+                    done = collect("sorted", self._search_small(k, low, high))
+                else:
+                    done = collect("meet_in_the_middle", self._search_mitm(k, low, high))
+                if done:
+                    return result
+
+            if max_items > 4 and n > 4:
+                if 0 < high <= MAX_DP_TARGET and self.values[0] > 0:
+                    collect("subset_sum_dp", self._search_dp(max(5, min_items), max_items, low, high))
+                else:
+                    # Beyond four items without a small positive target the space is too large
+                    result.complete = False
+        except SearchBudgetExceeded:
+            result.complete = False
+        return result
+
+    def _search_small(self, k: int, low: int, high: int) -> Iterator[Tuple[int, ...]]:
+        if k == 1:
+            for p in self._window(low, high, 0):
+                yield (p,)
+            return
+        for p in range(len(self.values)):
+            self._check_budget()
+            v = self.values[p]
+            for q in self._window(low - v, high - v, p + 1):
+                yield (p, q)
+
+    def _build_pair_table(self) -> bool:
+        n = len(self.values)
+        if n * (n - 1) // 2 > MAX_PAIR_TABLE:
+            return False
+        if self._pair_sums is None:
+            values = np.asarray(self.values, dtype=np.int64)
+            left, right = np.triu_indices(n, 1)
+            sums = values[left] + values[right]
+            order = np.argsort(sums, kind="stable")
+            self._pair_sums = sums[order]
+            self._pair_left = left[order].astype(np.int32)
+            self._pair_right = right[order].astype(np.int32)
+        return True
+
+    def _search_mitm(self, k: int, low: int, high: int) -> Iterator[Tuple[int, ...]]:
+        if not self._build_pair_table():
+            yield from self._search_nested(k, low, high)
+            return
+
+        sums, lefts, rights = self._pair_sums, self._pair_left, self._pair_right
+        if k == 3:
+            # One item plus one pair, the item below the pair so each triple appears once
+            values = np.asarray(self.values, dtype=np.int64)
+            starts = np.searchsorted(sums, low - values, side="left")
+            ends = np.searchsorted(sums, high - values, side="right")
+            for p in np.flatnonzero(ends > starts):
+                self._check_budget()
+                lo, hi = starts[p], ends[p]
+                for c in np.flatnonzero(lefts[lo:hi] > p) + lo:
+                    yield (int(p), int(lefts[c]), int(rights[c]))
+            return
+
+        # k == 4: two pairs (a, b) and (c, d) with b < c, so each quadruple appears once
+        starts = np.searchsorted(sums, low - sums, side="left")
+        ends = np.searchsorted(sums, high - sums, side="right")
+        for first in np.flatnonzero(ends > starts):
+            self._check_budget()
+            lo, hi = starts[first], ends[first]
+            b = rights[first]
+            for c in np.flatnonzero(lefts[lo:hi] > b) + lo:
+                yield (int(lefts[first]), int(b), int(lefts[c]), int(rights[c]))
+
+    def _search_nested(self, k: int, low: int, high: int) -> Iterator[Tuple[int, ...]]:
+        """Plain recursive search with sorted-window pruning for tables too large to build"""
+        n = len(self.values)
+
+        def extend(prefix: Tuple[int, ...], start: int, total: int, left: int):
+            if left == 1:
+                for p in self._window(low - total, high - total, start):
+                    yield prefix + (p,)
+                return
+            for p in range(start, n - left + 1):
+                self._check_budget()
+                v = self.values[p]
+                # Remaining items are at least v each; sorted order lets us stop early
+                if total + v * left > high and v >= 0:
+                    break
+                yield from extend(prefix + (p,), p + 1, total + v, left - 1)
+
+        yield from extend((), 0, 0, k)
+
+    def _search_dp(self, min_k: int, max_k: int, low: int, high: int) -> Iterator[Tuple[int, ...]]:
+        """
+        Subset-sum DP over reachable totals (a Python int used as a bitset)
+        parent[s] is the first item that reached s; walking parents back reconstructs a
+        subset of distinct items. Yields at most one subset per reachable total in the
+        window, keeping those with min_k..max_k items.
+        """
+        mask = (1 << (high + 1)) - 1
+        reachable = 1
+        parent = {}
+        for p, v in enumerate(self.values):
+            self._check_budget()
+            newly = ((reachable << v) & mask) & ~reachable
+            reachable |= newly
+            while newly:
+                lowest = newly & -newly
+                parent[lowest.bit_length() - 1] = p
+                newly ^= lowest
+
+        for total in range(max(low, 1), high + 1):
+            if not reachable >> total & 1:
+                continue
+            positions = []
+            while total:
+                p = parent[total]
+                positions.append(p)
+                total -= self.values[p]
+            if min_k <= len(positions) <= max_k:
+                yield tuple(sorted(positions))
@@ -0,0 +1,230 @@
+"""
+Stripe Webhook Queue
+Webhooks are stored in `webhook_events` (keyed by Stripe event id, so
+redeliveries are dropped) and acknowledged straight away. A background
+consumer claims due events in batches, applies them with bounded
+concurrency (in delivery order per payment intent) and retries failures
+with backoff; events that keep failing are parked as "dead" until replayed.
+"""
+
+import stripe
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from collections import defaultdict
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import json
+import logging
+import os
+import socket
+from app.config import settings
+from app.database.connection import get_database
+from app.models.payment import PaymentStatus
+from app.services.payment_service import payment_service
+from app.services.stripe_service import stripe_service
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_USER = "stripe_webhook"
+
+# handle_webhook_event result status -> payment status
+PAYMENT_STATUS_UPDATES = {
+    "completed": PaymentStatus.COMPLETED,
+    "failed": PaymentStatus.FAILED,
+    "refunded": PaymentStatus.REFUNDED,
+    "cancelled": PaymentStatus.CANCELLED,
+}
+
+EVENT_STATUSES = ["pending", "processing", "processed", "dead"]
+
+
+class WebhookEventService:
+    def __init__(self):
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    async def ingest(self, event: stripe.Event, payload: bytes) -> bool:
+        """Queue a verified event; False when it was already received"""
+        db = get_database()
+        now = datetime.utcnow()
+        try:
+            await db.webhook_events.insert_one({
+                "_id": event.id,
+                "type": event.type,
+                "payload": json.loads(payload),
+                "status": "pending",
+                "attempts": 0,
+                "received_at": now,
+                "next_attempt_at": now,
+            })
+        except DuplicateKeyError:
+            logger.info(f"Duplicate webhook event ignored: {event.id}")
+            return False
+        self._wakeup.set()
+        return True
+
+    async def start(self) -> None:
+        if settings.webhook_consumer_enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._consume())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _consume(self) -> None:
+        logger.info("Webhook consumer started")
+        while True:
+            try:
+                processed = await self.process_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error consuming webhook events: {e}")
+                processed = 0
+            if processed < settings.webhook_batch_size:
+                # Queue drained: sleep until the next ingest or poll interval
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.webhook_poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _claim(self, db) -> List[Dict[str, Any]]:
+        """Lease up to one batch of due events to this worker.
+
+        A claimed event's next_attempt_at is pushed out by the lease, so an
+        event whose worker died becomes due again on its own.
+        """
+        now = datetime.utcnow()
+        claimed = []
+        for _ in range(settings.webhook_batch_size):
+            event = await db.webhook_events.find_one_and_update(
+                {"status": {"$in": ["pending", "processing"]}, "next_attempt_at": {"$lte": now}},
+                {
+                    "$set": {"status": "processing", "owner": self.owner,
+                             "next_attempt_at": now + timedelta(seconds=settings.webhook_lease_seconds)},
+                    "$inc": {"attempts": 1}
+                },
+                sort=[("next_attempt_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if event is None:
+                break
+            claimed.append(event)
+        return claimed
+
+    async def process_batch(self) -> int:
+        """Claim and apply one batch of due events; returns how many were claimed"""
+        db = get_database()
+        events = await self._claim(db)
+        if not events:
+            return 0
+
+        results = {}
+        for event in events:
+            try:
+                results[event["_id"]] = await stripe_service.handle_webhook_event(
+                    stripe.Event.construct_from(event["payload"], stripe.api_key)
+                )
+            except Exception as e:
+                results[event["_id"]] = e
+
+        # One lookup for every payment the batch touches
+        intent_ids = list({
+            result["payment_intent_id"] for result in results.values()
+            if isinstance(result, dict) and result.get("payment_intent_id")
+        })
+        payments = {}
+        if intent_ids:
+            async for payment in db.payments.find(
+                {"gateway_details.stripe_payment_intent_id": {"$in": intent_ids}},
+                {"gateway_details.stripe_payment_intent_id": 1}
+            ):
+                payments[payment["gateway_details"]["stripe_payment_intent_id"]] = str(payment["_id"])
+
+        # Events for the same payment intent are applied one after another in
+        # the order Stripe delivered them; different intents run concurrently
+        chains: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for event in sorted(events, key=lambda event: event["received_at"]):
+            result = results[event["_id"]]
+            intent_id = result.get("payment_intent_id") if isinstance(result, dict) else None
+            chains[intent_id or event["_id"]].append(event)
+
+        semaphore = asyncio.Semaphore(settings.webhook_concurrency)
+
+        async def apply(chain: List[Dict[str, Any]]) -> None:
+            async with semaphore:
+                for event in chain:
+                    await self._apply(db, event, results[event["_id"]], payments)
+
+        await asyncio.gather(*(apply(chain) for chain in chains.values()))
+        logger.info(f"Processed {len(events)} webhook events")
+        return len(events)
+
+    async def _apply(self, db, event: Dict[str, Any], result: Any, payments: Dict[str, str]) -> None:
+        try:
+            if isinstance(result, Exception):
+                raise result
+            payment_id = payments.get(result.get("payment_intent_id"))
+            new_status = PAYMENT_STATUS_UPDATES.get(result.get("status"))
+            outcome = "ignored"
+            if payment_id and new_status:
+                updated = await payment_service.update_payment_status(payment_id, new_status, WEBHOOK_USER)
+                outcome = f"payment {payment_id} -> {new_status.value}" if updated else "unchanged"
+            elif new_status:
+                # Payment not recorded yet; /stripe/confirm will store it with the final status
+                outcome = "no matching payment"
+
+            await db.webhook_events.update_one(
+                {"_id": event["_id"], "owner": self.owner},
+                {"$set": {"status": "processed", "processed_at": datetime.utcnow(), "outcome": outcome},
+                 "$unset": {"owner": "", "error": ""}}
+            )
+        except Exception as e:
+            attempts = event.get("attempts", 1)
+            dead = attempts >= settings.webhook_max_attempts
+            delay = min(settings.webhook_poll_seconds * (2 ** attempts), 3600)
+            logger.error(f"Error processing webhook event {event['_id']} (attempt {attempts}): {e}")
+            await db.webhook_events.update_one(
+                {"_id": event["_id"], "owner": self.owner},
+                {"$set": {"status": "dead" if dead else "pending", "error": str(e),
+                          "next_attempt_at": datetime.utcnow() + timedelta(seconds=delay)},
+                 "$unset": {"owner": ""}}
+            )
+
+    async def replay(self, event_ids: Optional[List[str]] = None, status: str = "dead") -> int:
+        """Queue events again: the given ids, or every event in `status`"""
+        db = get_database()
+        query: Dict[str, Any] = {"_id": {"$in": event_ids}} if event_ids else {"status": status}
+        result = await db.webhook_events.update_many(
+            query,
+            {"$set": {"status": "pending", "attempts": 0, "next_attempt_at": datetime.utcnow()},
+             "$unset": {"owner": "", "error": ""}}
+        )
+        if result.modified_count:
+            self._wakeup.set()
+        return result.modified_count
+
+    async def get_stats(self) -> Dict[str, Any]:
+        db = get_database()
+        counts = {status: 0 for status in EVENT_STATUSES}
+        async for row in db.webhook_events.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            counts[row["_id"]] = row["count"]
+        oldest = await db.webhook_events.find_one(
+            {"status": "pending"}, {"received_at": 1}, sort=[("next_attempt_at", 1)]
+        )
+        return {
+            "counts": counts,
+            "oldest_pending_received_at": oldest["received_at"] if oldest else None,
+            "consumer_running": bool(self._task and not self._task.done()),
+        }
+
+
+# Global instance
+webhook_event_service = WebhookEventService()
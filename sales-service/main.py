@@ -8,7 +8,10 @@ import logging
 import uvicorn
 
 from app.config import settings
-from app.database.connection import connect_to_mongo, close_mongo_connection
+from app.database.connection import connect_to_mongo, close_mongo_connection, get_database
+from app.database.schema_migrations import index_migrator
+from app.services.stripe_client import stripe_client
+from app.services.webhook_service import webhook_event_service
 from app.api.v1 import (
     customers_router,
     inventory_products_router,
@@ -18,6 +21,7 @@ from app.api.v1 import (
     payments_router,
     analytics_router,
     reports_router,
+    reconciliation_router,
     # pos_router  # Removed - using sales orders as POS
 )# Configure logging
 logging.basicConfig(
@@ -36,10 +40,19 @@ async def lifespan(app: FastAPI):
     await connect_to_mongo()
     logger.info("Connected to MongoDB")
     
+    # Bring indexes up to the current spec (skipped when already applied)
+    await index_migrator.startup(get_database())
+    
+    # Apply queued Stripe webhook events in the background
+    await webhook_event_service.start()
+    
     yield
     
     # Cleanup
     logger.info("Shutting down Sales Service...")
+    await webhook_event_service.stop()
+    await index_migrator.shutdown()
+    stripe_client.shutdown()
     await close_mongo_connection()
 
 
@@ -115,6 +128,21 @@ async def health_check():
     return {"status": "healthy", "service": settings.service_name}
 
 
+# Readiness probe: database reachable; index migration progress is reported, not awaited
+@app.get("/ready")
+async def readiness_check():
+    indexes = index_migrator.state()
+    try:
+        await get_database().command("ping")
+    except Exception as e:
+        logger.error(f"Readiness check failed: {e}")
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "service": settings.service_name, "indexes": indexes}
+        )
+    return {"status": "ready", "service": settings.service_name, "indexes": indexes}
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -165,6 +193,7 @@ app.include_router(invoices_router, prefix="/api/v1")
 app.include_router(payments_router, prefix="/api/v1")
 app.include_router(analytics_router, prefix="/api/v1")
 app.include_router(reports_router, prefix="/api/v1")
+app.include_router(reconciliation_router, prefix="/api/v1")
 # app.include_router(pos_router, prefix="/api/v1")  # Removed - using sales orders as POS
 
 
@@ -0,0 +1,105 @@
+"""
+Memory Benchmark for Sales Analytics Records
+Reports bytes per transaction for the previous plain-dataclass record, the
+slotted/interned SalesTransaction, and a row in the analytics column buffer
+
+Usage:
+    python scripts/benchmark_record_memory.py
+    python scripts/benchmark_record_memory.py --records 500000
+"""
+
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.sales_analytics import SalesTransaction
+from app.services.analytics_loader import SalesColumnBuffer
+
+
+@dataclass
+class LegacySalesTransaction:
+    """SalesTransaction as it was: per-instance __dict__ and a product_ids list"""
+    id: str
+    amount: float
+    date: datetime
+    customer_id: str
+    product_ids: List[str]
+    salesperson_id: str
+    status: str = "completed"
+
+
+def make_documents(count: int, seed: int = 7):
+    """Order-like documents; every string is a fresh object, as when decoded from BSON"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        yield {
+            "_id": f"{i:024x}",
+            "total_amount": round(rng.uniform(5, 5000), 2),
+            "order_date": start + timedelta(minutes=rng.randrange(525600)),
+            "customer_id": f"customer-{rng.randrange(2000)}",
+            "sales_rep_id": f"rep-{rng.randrange(50)}",
+            "status": b"delivered".decode(),
+            "line_items": [{"product_id": f"product-{rng.randrange(1000)}"} for _ in range(rng.randint(1, 5))],
+        }
+
+
+def build_records(record_type, documents):
+    return [
+        record_type(
+            doc["_id"], doc["total_amount"], doc["order_date"], doc["customer_id"],
+            [item["product_id"] for item in doc["line_items"]], doc["sales_rep_id"], doc["status"]
+        )
+        for doc in documents
+    ]
+
+
+def build_buffer(documents):
+    buffer = SalesColumnBuffer()
+    for doc in documents:
+        buffer.put(doc)
+    return buffer
+
+
+def measure(build, count: int) -> float:
+    """Bytes per record retained by whatever build() returns (inputs are freed first)"""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = build(make_documents(count))
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del result
+    return retained / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per sales record, before and after")
+    parser.add_argument("--records", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"📏 Measuring {args.records:,} records...\n")
+    results = [
+        ("LegacySalesTransaction (dataclass, list)", measure(lambda docs: build_records(LegacySalesTransaction, docs), args.records)),
+        ("SalesTransaction (slots, interned, tuple)", measure(lambda docs: build_records(SalesTransaction, docs), args.records)),
+        ("SalesColumnBuffer row", measure(build_buffer, args.records)),
+    ]
+
+    legacy = results[0][1]
+    for name, per_record in results:
+        ratio = f"{legacy / per_record:.1f}x smaller" if per_record != legacy else "baseline"
+        print(f"{name:<45} {per_record:>8.0f} bytes/record  ({ratio})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Fake Stripe API for local runs and load tests
+Serves the handful of endpoints StripeService uses, with optional latency and
+injected failures, so the gateway client's timeouts, retries and idempotency
+keys can be exercised without a Stripe account.
+
+Point the service at it with STRIPE_API_BASE=http://localhost:12111
+
+Usage:
+    python scripts/fake_stripe_server.py
+    python scripts/fake_stripe_server.py --latency-ms 300 --failure-rate 0.1
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+
+class FakeStripe:
+    """In-memory payment intents, refunds and customers"""
+
+    def __init__(self, latency_ms, failure_rate):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.objects = {}
+        self.idempotent_responses = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _new_id(prefix):
+        return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+    def _payment_intent(self, params):
+        intent_id = self._new_id("pi")
+        return {
+            "id": intent_id,
+            "object": "payment_intent",
+            "amount": int(params.get("amount", 0)),
+            "amount_received": 0,
+            "currency": params.get("currency", "usd"),
+            "customer": params.get("customer"),
+            "description": params.get("description"),
+            "metadata": {},
+            "status": "requires_payment_method",
+            "client_secret": f"{intent_id}_secret_{uuid.uuid4().hex[:12]}",
+            "next_action": None,
+            "latest_charge": None,
+            "cancellation_reason": None,
+            "created": int(time.time()),
+        }
+
+    def _charge(self, intent):
+        return {
+            "id": self._new_id("ch"),
+            "object": "charge",
+            "amount": intent["amount"],
+            "currency": intent["currency"],
+            "status": "succeeded",
+            "paid": True,
+            "payment_method": self._new_id("pm"),
+            "receipt_url": None,
+            "created": int(time.time()),
+        }
+
+    def handle(self, method, path, params):
+        """Return (status, body) for one API request"""
+        parts = [part for part in path.split("/") if part][1:]  # drop "v1"
+        if not parts:
+            return 404, _error("invalid_request_error", f"Unrecognized request URL ({path})")
+        resource, rest = parts[0], parts[1:]
+
+        with self.lock:
+            if resource == "payment_intents":
+                if method == "POST" and not rest:
+                    intent = self._payment_intent(params)
+                    self.objects[intent["id"]] = intent
+                    return 200, intent
+                intent = self.objects.get(rest[0]) if rest else None
+                if intent is None:
+                    return 404, _error("invalid_request_error", f"No such payment_intent: '{rest[0] if rest else ''}'")
+                action = rest[1] if len(rest) > 1 else None
+                if method == "GET" and action is None:
+                    return 200, intent
+                if action == "confirm":
+                    charge = self._charge(intent)
+                    intent.update(status="succeeded", amount_received=intent["amount"], latest_charge=charge)
+                    return 200, intent
+                if action == "capture":
+                    intent.update(status="succeeded",
+                                  amount_received=int(params.get("amount_to_capture", intent["amount"])))
+                    return 200, intent
+                if action == "cancel":
+                    intent.update(status="canceled", cancellation_reason=params.get("cancellation_reason"))
+                    return 200, intent
+
+            elif resource == "refunds" and method == "POST":
+                intent = self.objects.get(params.get("payment_intent"))
+                if intent is None:
+                    return 400, _error("invalid_request_error", "No such payment_intent")
+                refund = {
+                    "id": self._new_id("re"),
+                    "object": "refund",
+                    "amount": int(params.get("amount", intent["amount_received"] or intent["amount"])),
+                    "currency": intent["currency"],
+                    "payment_intent": intent["id"],
+                    "reason": params.get("reason"),
+                    "status": "succeeded",
+                    "created": int(time.time()),
+                }
+                self.objects[refund["id"]] = refund
+                return 200, refund
+
+            elif resource == "customers":
+                if method == "POST" and not rest:
+                    customer = {
+                        "id": self._new_id("cus"),
+                        "object": "customer",
+                        "email": params.get("email"),
+                        "name": params.get("name"),
+                        "phone": params.get("phone"),
+                        "metadata": {},
+                        "created": int(time.time()),
+                    }
+                    self.objects[customer["id"]] = customer
+                    return 200, customer
+                if method == "GET" and rest and rest[0] in self.objects:
+                    return 200, self.objects[rest[0]]
+                return 404, _error("invalid_request_error", "No such customer")
+
+        return 404, _error("invalid_request_error", f"Unrecognized request URL ({method} {path})")
+
+
+def _error(error_type, message):
+    return {"error": {"type": error_type, "message": message}}
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        def _respond(self, status, body, headers=None):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("Request-Id", f"req_{uuid.uuid4().hex[:14]}")
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _dispatch(self, method):
+            url = urlparse(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length).decode() if length else url.query
+            params = dict(parse_qsl(body))
+
+            if fake.latency_ms:
+                time.sleep(fake.latency_ms / 1000 * random.uniform(0.5, 1.5))
+
+            key = self.headers.get("Idempotency-Key")
+            if key and key in fake.idempotent_responses:
+                status, response = fake.idempotent_responses[key]
+                return self._respond(status, response, {"Idempotent-Replayed": "true"})
+
+            if random.random() < fake.failure_rate:
+                # Transient failure before anything is stored; a retry with the same key succeeds
+                return self._respond(500, _error("api_error", "Injected failure"))
+
+            status, response = fake.handle(method, url.path, params)
+            if key and method == "POST":
+                fake.idempotent_responses[key] = (status, response)
+            self._respond(status, response)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_DELETE(self):
+            self._dispatch("DELETE")
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Stripe API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=12111)
+    parser.add_argument("--latency-ms", type=int, default=0, help="Mean added latency per request")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with a 500")
+    args = parser.parse_args()
+
+    if not 0 <= args.failure_rate < 1:
+        print("❌ --failure-rate must be in [0, 1)")
+        sys.exit(1)
+
+    fake = FakeStripe(args.latency_ms, args.failure_rate)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(fake))
+    print(f"✅ Fake Stripe listening on http://{args.host}:{args.port} "
+          f"(latency {args.latency_ms}ms, failure rate {args.failure_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️  Stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
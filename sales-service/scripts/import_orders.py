@@ -0,0 +1,93 @@
+"""
+Bulk Order Import for Sales Service
+Loads historical orders or offline POS batches straight into sales_orders,
+using the same pipeline as POST /api/v1/sales-orders/import:
+  - jsonl: one order per line (SalesOrderCreate fields, plus optional
+    import_ref, status, payment_status, paid_amount)
+  - csv: one line item per row; consecutive rows with the same order_ref
+    form one order
+Rows with an import_ref that was already imported are skipped, so a file
+can be re-run after a failure. Product lookups go to inventory-service
+and need a bearer token (--token or IMPORT_TOKEN).
+
+Usage:
+    python scripts/import_orders.py orders.jsonl --user-id <user id>
+    python scripts/import_orders.py pos_batch.csv --user-id <user id> --dry-run
+    python scripts/import_orders.py orders.jsonl --user-id <user id> --errors errors.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database.connection import connect_to_mongo, close_mongo_connection
+from app.services.order_import_service import order_import_service, parse_rows, IMPORT_FORMATS
+
+
+async def run_import(path, file_format, user_id, token, dry_run, errors_path):
+    await connect_to_mongo()
+    errors_file = open(errors_path, "w", encoding="utf-8") if errors_path else None
+    summary = None
+    try:
+        mode = " (dry run)" if dry_run else ""
+        print(f"🔄 Importing {path} as {file_format}{mode}...")
+        with open(path, encoding="utf-8-sig", newline="") as lines:
+            async for event in order_import_service.import_orders(
+                parse_rows(lines, file_format), user_id, token, dry_run=dry_run
+            ):
+                if event["event"] == "error":
+                    if errors_file:
+                        errors_file.write(json.dumps(event) + "\n")
+                    else:
+                        print(f"   ⚠️  row {event['row']}: {event['error']}")
+                elif event["event"] == "progress":
+                    print(f"   📊 rows {event['rows']}: imported {event['imported']}, "
+                          f"skipped {event['skipped']}, failed {event['failed']}")
+                elif event["event"] == "done":
+                    summary = event
+    finally:
+        if errors_file:
+            errors_file.close()
+        await close_mongo_connection()
+
+    print(f"✅ Batch {summary['batch_id']}: imported {summary['imported']}, "
+          f"skipped {summary['skipped']}, failed {summary['failed']} of {summary['rows']} rows")
+    return summary["failed"] == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import sales orders from JSONL or CSV")
+    parser.add_argument("path", help="Import file")
+    parser.add_argument("--format", choices=list(IMPORT_FORMATS), default=None,
+                        help="File format (default: from the file extension)")
+    parser.add_argument("--user-id", required=True, help="Recorded as created_by on imported orders")
+    parser.add_argument("--token", default=os.environ.get("IMPORT_TOKEN"),
+                        help="Bearer token for inventory-service product lookups")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and price orders without writing")
+    parser.add_argument("--errors", default=None, help="Write row errors to this JSONL file instead of stdout")
+    args = parser.parse_args()
+
+    file_format = args.format or Path(args.path).suffix.lstrip(".").lower().replace("ndjson", "jsonl")
+    if file_format not in IMPORT_FORMATS:
+        print(f"❌ Cannot tell the format of {args.path}; pass --format {'/'.join(IMPORT_FORMATS)}")
+        sys.exit(1)
+    if not args.token:
+        print("⚠️  No token: product lookups will fail unless inventory-service allows anonymous reads")
+
+    try:
+        ok = asyncio.run(run_import(args.path, file_format, args.user_id, args.token, args.dry_run, args.errors))
+    except Exception as e:
+        print(f"\n❌ Import failed: {str(e)}")
+        sys.exit(1)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
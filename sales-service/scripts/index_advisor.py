@@ -0,0 +1,62 @@
+"""
+Index Advisor for Sales Service
+Explains the registered hot queries (app/services/index_advisor.py) against the
+configured database and reports collection scans, in-memory sorts and covering
+indexes that still fetch documents. Only the query planner runs; no query is
+executed.
+
+Usage:
+    python scripts/index_advisor.py
+    python scripts/index_advisor.py --query orders.list --query analytics.total_revenue
+    python scripts/index_advisor.py --strict    # exit 1 when any query has issues
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database.connection import connect_to_mongo, close_mongo_connection
+from app.services.index_advisor import advise, hot_queries
+
+
+async def run(names):
+    await connect_to_mongo()
+    try:
+        queries = [query for query in hot_queries() if not names or query.name in names]
+        reports = await advise(queries)
+    finally:
+        await close_mongo_connection()
+
+    for report in reports:
+        status = "⚠️ " if report["issues"] else "✅"
+        indexes = ", ".join(report["indexes"]) or "-"
+        print(f"{status} {report['name']:<32} {report['collection']:<14} index: {indexes}")
+        for issue in report["issues"]:
+            print(f"      {issue}  (plan: {' <- '.join(report['stages'])})")
+
+    flagged = sum(1 for report in reports if report["issues"])
+    print(f"\n📊 {len(reports)} queries explained, {flagged} with issues")
+    return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Explain hot queries and report COLLSCANs and in-memory sorts")
+    parser.add_argument("--query", action="append", help="Hot query name to explain (repeatable; default: all)")
+    parser.add_argument("--strict", action="store_true", help="Exit with status 1 if any query has issues")
+    args = parser.parse_args()
+
+    try:
+        flagged = asyncio.run(run(args.query))
+    except Exception as e:
+        print(f"\n❌ Index advisor failed: {str(e)}")
+        sys.exit(1)
+    if args.strict and flagged:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
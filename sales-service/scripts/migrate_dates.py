@@ -0,0 +1,56 @@
+"""
+Native Date Migration for Sales Service
+Converts order, quote, invoice and payment dates stored as ISO strings to BSON
+dates, in batches, while the service keeps running. Safe to interrupt and rerun:
+progress is checkpointed per collection in `data_migrations`.
+
+Usage:
+    python scripts/migrate_dates.py
+    python scripts/migrate_dates.py --collection sales_orders --batch-size 1000
+    python scripts/migrate_dates.py --restart
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import DATE_FIELDS
+from app.database.connection import connect_to_mongo, close_mongo_connection
+from app.services.data_migrations import NativeDatesMigration
+
+
+async def migrate(collections, batch_size, pause_seconds, restart):
+    await connect_to_mongo()
+    try:
+        for collection in collections:
+            print(f"🔄 Converting string dates in {collection}...")
+            summary = await NativeDatesMigration(collection).run(batch_size, pause_seconds, restart)
+            resumed = f" (resumed after {summary['resumed_from']})" if summary["resumed_from"] else ""
+            print(f"   ✅ scanned {summary['scanned']}, converted {summary['updated']}, "
+                  f"skipped {summary['skipped']}{resumed}")
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert string business dates to BSON dates")
+    parser.add_argument("--collection", choices=sorted(DATE_FIELDS), action="append",
+                        help="Collection to migrate (repeatable; default: all)")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--pause", type=float, default=None, help="Seconds to wait between batches")
+    parser.add_argument("--restart", action="store_true", help="Ignore saved progress and start over")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(migrate(args.collection or list(DATE_FIELDS), args.batch_size, args.pause, args.restart))
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Index Migration for Sales Service
+Applies the index spec in app/database/indexes.py and records its hash in
+`schema_migrations`, exactly as the service does at startup. Useful as a
+deploy step with INDEX_BUILD_MODE=off on the workers.
+
+Usage:
+    python scripts/migrate_indexes.py
+    python scripts/migrate_indexes.py --status
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database.connection import connect_to_mongo, close_mongo_connection, get_database
+from app.database.schema_migrations import index_migrator, MIGRATION_ID
+
+
+async def migrate(status_only):
+    await connect_to_mongo()
+    try:
+        db = get_database()
+        if status_only:
+            record = await db.schema_migrations.find_one({"_id": MIGRATION_ID}) or {}
+            applied = record.get("applied_hash")
+            marker = "✅" if applied == index_migrator.spec_hash else "⚠️ "
+            print(f"{marker} spec {index_migrator.spec_hash}, applied {applied or '-'} "
+                  f"({record.get('status', 'never run')})")
+            return True
+
+        print(f"🔄 Migrating indexes to spec {index_migrator.spec_hash}...")
+        await index_migrator.run(db)
+        state = index_migrator.state()
+        if state["status"] != "ready":
+            print(f"❌ {state['status']}: {state['error']}")
+            return False
+        print(f"   ✅ {state['progress']} indexes in place")
+        return True
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the index spec and record it in schema_migrations")
+    parser.add_argument("--status", action="store_true", help="Only show the applied and current spec hash")
+    args = parser.parse_args()
+
+    try:
+        ok = asyncio.run(migrate(args.status))
+    except Exception as e:
+        print(f"\n❌ Index migration failed: {str(e)}")
+        sys.exit(1)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Order Backfills for Sales Service
+Brings existing orders up to the current document shape so they match the
+indexes the order list and analytics queries rely on:
+  - deleted_flag: write deleted: False on orders that predate the flag
+  - periods: precomputed calendar buckets (day, ISO week, month, quarter, year)
+Run after scripts/migrate_dates.py. Safe to interrupt and rerun: progress is
+checkpointed in `data_migrations`.
+
+Usage:
+    python scripts/migrate_orders.py
+    python scripts/migrate_orders.py --only periods --batch-size 1000 --pause 0.1
+    python scripts/migrate_orders.py --restart
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database.connection import connect_to_mongo, close_mongo_connection
+from app.services.data_migrations import OrderDeletedFlagMigration, OrderPeriodsMigration
+
+BACKFILLS = {
+    "deleted_flag": ("Backfilling order deleted flag", OrderDeletedFlagMigration),
+    "periods": ("Backfilling order period fields", OrderPeriodsMigration),
+}
+
+
+async def migrate(names, batch_size, pause_seconds, restart):
+    await connect_to_mongo()
+    try:
+        for name in names:
+            title, migration = BACKFILLS[name]
+            print(f"🔄 {title}...")
+            summary = await migration().run(batch_size, pause_seconds, restart)
+            resumed = f" (resumed after {summary['resumed_from']})" if summary["resumed_from"] else ""
+            print(f"   ✅ scanned {summary['scanned']}, updated {summary['updated']}, "
+                  f"skipped {summary['skipped']}{resumed}")
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill derived fields on existing sales orders")
+    parser.add_argument("--only", choices=list(BACKFILLS), action="append",
+                        help="Backfill to run (repeatable; default: all, in order)")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--pause", type=float, default=None, help="Seconds to wait between batches")
+    parser.add_argument("--restart", action="store_true", help="Ignore saved progress and start over")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(migrate(args.only or list(BACKFILLS), args.batch_size, args.pause, args.restart))
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ import random
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.database.connection import connect_to_mongo, get_database
+from app.database.dates import period_fields
 from bson import ObjectId
 
 
@@ -320,6 +321,7 @@ async def seed_demo_data():
                 "customer_name": customer.get("company_name", f"{customer.get('first_name', '')} {customer.get('last_name', '')}"),
                 "customer_email": customer["email"],
                 "order_date": created_date,
+                "period": period_fields(created_date),
                 "expected_delivery_date": created_date + timedelta(days=random.randint(3, 10)) if selected_status not in ["cancelled", "delivered"] else None,
                 "actual_delivery_date": created_date + timedelta(days=random.randint(3, 7)) if selected_status == "delivered" else None,
                 "line_items": items,
@@ -348,6 +350,7 @@ async def seed_demo_data():
                 "internal_notes": None,
                 "shipping_address": shipping_addr,
                 "billing_address": customer.get("billing_address", shipping_addr),
+                "deleted": False,
                 "created_by": "system",
                 "created_at": created_date,
                 "updated_at": datetime.utcnow()